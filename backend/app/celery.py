@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import redis
+from celery import Celery
+from kombu import Queue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Scrape queues; a username always lands on the same one, which keeps its tasks on the nodes
+# consuming that shard. Point nodes at subsets with `celery -A app.celery worker -Q scrape.0,scrape.1`.
+# Several processes still drain one queue, so exclusivity comes from username_lock
+SCRAPE_QUEUE_SHARDS = int(os.getenv("SCRAPE_QUEUE_SHARDS", "4"))
+CONTROL_QUEUE = "scrape.control"
+# Hard limit for one username; a task still unacknowledged after the visibility timeout is
+# handed to another worker, so the timeout must comfortably exceed it
+SCRAPE_TASK_TIME_LIMIT = int(os.getenv("SCRAPE_TASK_TIME_LIMIT", "300"))
+SCRAPE_VISIBILITY_TIMEOUT = int(os.getenv("SCRAPE_VISIBILITY_TIMEOUT", str(SCRAPE_TASK_TIME_LIMIT * 3)))
+# Seconds between beat-scheduled refreshes of every stored profile; 0 disables them
+SCRAPE_REFRESH_INTERVAL = float(os.getenv("SCRAPE_REFRESH_INTERVAL", "3600"))
+
+
+# Drops a lock only if it still holds our token, so an expired lock re-taken by another worker survives
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_lock_client: Optional[redis.Redis] = None
+_lock_client_lock = threading.Lock()
+
+
+def _get_lock_client() -> redis.Redis:
+    global _lock_client
+    with _lock_client_lock:
+        if _lock_client is None:
+            _lock_client = redis.Redis.from_url(REDIS_URL)
+        return _lock_client
+
+
+@contextmanager
+def username_lock(username: str, ttl: float = SCRAPE_TASK_TIME_LIMIT) -> Iterator[bool]:
+    """SET NX PX lock on a username across every worker; yields whether it was acquired
+
+    The TTL matches the task hard limit, so a worker killed mid-scrape cannot hold it forever.
+    """
+    client = _get_lock_client()
+    key = f"scrape:lock:{username.strip().lower()}"
+    token = uuid.uuid4().hex
+    try:
+        acquired = bool(client.set(key, token, nx=True, px=int(ttl * 1000)))
+    except redis.RedisError as e:
+        # Scraping unlocked beats failing every task while Redis is unreachable
+        logger.warning(f"Scrape lock unavailable for {username}, scraping without it: {e}")
+        yield True
+        return
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                client.eval(_RELEASE_LOCK, 1, key, token)
+            except redis.RedisError as e:
+                logger.warning(f"Could not release scrape lock for {username}: {e}")
+
+
+def shard_queue(username: str) -> str:
+    """Queue owning username"""
+    return f"scrape.{zlib.crc32(username.strip().lower().encode()) % SCRAPE_QUEUE_SHARDS}"
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """Scrapes go to their username's shard, everything else to the control queue"""
+    if name == 'scrape.profile':
+        username = (kwargs or {}).get('username') or args[1]
+        return {'queue': shard_queue(username)}
+    return {'queue': CONTROL_QUEUE}
+
+
+app = Celery('instascrape', broker=REDIS_URL, include=['app.tasks'])
+app.conf.update(
+    task_serializer='json',
+    accept_content=['json'],
+    # Job progress lives in the job store; task results are not needed
+    task_ignore_result=True,
+    # Acknowledge after the scrape, so a task on a worker that dies is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_time_limit=SCRAPE_TASK_TIME_LIMIT,
+    task_soft_time_limit=max(1, SCRAPE_TASK_TIME_LIMIT - 30),
+    broker_transport_options={'visibility_timeout': SCRAPE_VISIBILITY_TIMEOUT},
+    # One reserved task per process: a slow profile never holds others hostage
+    worker_prefetch_multiplier=1,
+    task_queues=[Queue(CONTROL_QUEUE)] + [Queue(f"scrape.{shard}") for shard in range(SCRAPE_QUEUE_SHARDS)],
+    task_default_queue=CONTROL_QUEUE,
+    task_routes=(route_task,),
+    beat_schedule={
+        'refresh-all-profiles': {
+            'task': 'scrape.refresh_all',
+            'schedule': SCRAPE_REFRESH_INTERVAL,
+        },
+    } if SCRAPE_REFRESH_INTERVAL > 0 else {},
+)
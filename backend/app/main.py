@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 
 from app.database import engine, Base
 from app.routers import profiles, scraper
-from app.models import profile, post
+from app.models import profile, post, post_cursor
 
 # Load environment variables
 load_dotenv()
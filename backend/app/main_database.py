@@ -1,12 +1,17 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 import os
 import json
 import asyncio
 from sqlalchemy.orm import Session
 from scraper.advanced_production_scraper import AdvancedProductionScraper
+from scraper.endpoint_stats import get_endpoint_tracker
+from scraper.extractor_chain import extractor_chain_stats
+from scraper.proxy_pool import get_proxy_pool
+from scraper.scraper_pool import ScraperPoolExhausted, get_scraper_pool, scraper_pool_stats
+from scraper.parse_executor import get_parse_executor
 from database import get_db, engine, Base
 from models.profile import Profile as ProfileModel
 
@@ -37,6 +42,14 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def get_scraper() -> Iterator[AdvancedProductionScraper]:
+    """Check out a warm pooled scraper for the duration of the request"""
+    try:
+        with get_scraper_pool(AdvancedProductionScraper).checkout() as scraper:
+            yield scraper
+    except ScraperPoolExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 class Profile(BaseModel):
     id: int
     username: str
@@ -134,15 +147,14 @@ async def get_all_profiles(db: Session = Depends(get_db)):
     ]
 
 @app.post("/api/scraper/profile")
-async def scrape_single_profile(request: dict, db: Session = Depends(get_db)):
+def scrape_single_profile(request: dict, db: Session = Depends(get_db),
+                          scraper: AdvancedProductionScraper = Depends(get_scraper)):
     """Scrape a single Instagram profile and store it"""
     username = request.get("username", "").strip()
     
     if not username:
         raise HTTPException(status_code=400, detail="Username cannot be empty")
     
-    scraper = AdvancedProductionScraper()
-    
     try:
         # Scrape the profile
         profile_data = scraper.scrape_profile(username)
@@ -191,6 +203,33 @@ async def scrape_single_profile(request: dict, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scraping profile: {str(e)}")
 
+@app.get("/api/scraper/endpoints")
+async def get_endpoint_stats():
+    """Per-endpoint success rate and latency, in the order they will be tried"""
+    stats = AdvancedProductionScraper.endpoint_stats()
+    order = get_endpoint_tracker().rank(list(stats))
+    return {"order": order, "endpoints": stats}
+
+@app.get("/api/scraper/extractors")
+async def get_extractor_stats():
+    """Hit rate and cost of each extraction strategy, per scraper chain"""
+    return extractor_chain_stats()
+
+@app.get("/api/scraper/proxies")
+async def get_proxy_stats():
+    """Health score inputs and quarantine state of each outbound proxy"""
+    return get_proxy_pool().snapshot()
+
+@app.get("/api/scraper/pool")
+async def get_scraper_pool_stats():
+    """Size and checkout counters of the pooled scraper instances"""
+    return scraper_pool_stats()
+
+@app.get("/api/scraper/parsing")
+async def get_parse_stats():
+    """Parse executor queue depth, worker time and event-loop time saved"""
+    return get_parse_executor().stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
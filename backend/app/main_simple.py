@@ -1,11 +1,15 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 import os
 import json
 import asyncio
 from scraper.playwright_scraper import InstagramScraper
+from scraper.browser_pool import get_browser_pool, close_browser_pool
+from scraper.advanced_production_scraper import AdvancedProductionScraper
+from scraper.scraper_pool import ScraperPoolExhausted, get_scraper_pool
+from scraper.parse_executor import get_parse_executor, shutdown_parse_executor
 
 # Simple in-memory storage for demo purposes
 profiles_db = []
@@ -34,6 +38,14 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def get_scraper() -> Iterator[AdvancedProductionScraper]:
+    """Check out a warm pooled scraper for the duration of the request"""
+    try:
+        with get_scraper_pool(AdvancedProductionScraper).checkout() as scraper:
+            yield scraper
+    except ScraperPoolExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 class Profile(BaseModel):
     id: int
     username: str
@@ -73,6 +85,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared browser pool and parse workers"""
+    await close_browser_pool()
+    shutdown_parse_executor()
+
 @app.get("/")
 async def root():
     return {"message": "Instagram Analytics API", "status": "running"}
@@ -184,8 +202,8 @@ async def scrape_single_profile(request: dict):
         raise HTTPException(status_code=400, detail="Username cannot be empty")
     
     try:
-        # Use the async scraper directly
-        async with InstagramScraper() as scraper:
+        # Use the async scraper on the shared warm browser pool
+        async with InstagramScraper(pool=get_browser_pool()) as scraper:
             profile_data = await scraper.scrape_profile(username)
         
         if not profile_data:
@@ -237,15 +255,13 @@ async def scrape_single_profile(request: dict):
         raise HTTPException(status_code=500, detail=f"Error scraping profile: {str(e)}")
 
 @app.post("/api/scraper/profiles/sync")
-async def scrape_profiles_sync(request: dict):
+def scrape_profiles_sync(request: dict, scraper: AdvancedProductionScraper = Depends(get_scraper)):
     """Scrape multiple Instagram profiles using real scraper"""
     usernames = request.get("usernames", [])
     
     if not usernames:
         raise HTTPException(status_code=400, detail="No usernames provided")
     
-        scraper = AdvancedProductionScraper()
-    
     success_count = 0
     failed_count = 0
     results = []
@@ -315,6 +331,11 @@ async def get_scraper_status():
         "note": "Real Instagram data scraping enabled"
     }
 
+@app.get("/api/scraper/parsing")
+async def get_parse_stats():
+    """Parse executor queue depth, worker time and event-loop time saved"""
+    return get_parse_executor().stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -193,6 +193,7 @@ async def get_status():
     return {
         "usernames": websocket_manager.usernames,
         "poll_interval": websocket_manager.poll_interval,
+        "polling": await websocket_manager.poll_scheduler.stats_async(websocket_manager.usernames),
         "active_connections": len(websocket_manager.active_connections),
         "redis_connected": websocket_manager.redis_client is not None
     }
@@ -1,4 +1,5 @@
 from .profile import Profile
 from .post import Post
+from .post_cursor import PostCursor
 
-__all__ = ["Profile", "Post"]
+__all__ = ["Profile", "Post", "PostCursor"]
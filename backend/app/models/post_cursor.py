@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+class PostCursor(Base):
+    __tablename__ = "post_cursors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(Integer, ForeignKey("profiles.id"), unique=True, nullable=False)
+    instagram_user_id = Column(String(64), nullable=True)  # Saves the profile lookup on later runs
+    newest_shortcode = Column(String(64), nullable=True)   # Newest post already stored
+    newest_taken_at = Column(Integer, default=0)           # Its unix timestamp
+    backfill_cursor = Column(String(255), nullable=True)   # Where the next backfill page starts
+    backfill_complete = Column(Integer, default=0)         # 1 once the oldest post is stored
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationship with profile
+    profile = relationship("Profile", back_populates="post_cursor")
+
+    def __repr__(self):
+        return f"<PostCursor(profile_id={self.profile_id}, newest='{self.newest_shortcode}')>"
@@ -22,6 +22,7 @@ class Profile(Base):
 
     # Relationship with posts
     posts = relationship("Post", back_populates="profile", cascade="all, delete-orphan")
+    post_cursor = relationship("PostCursor", back_populates="profile", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Profile(username='{self.username}', followers={self.followers_count})>"
@@ -0,0 +1,113 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.profile import Profile
+from app.models.post import Post
+from app.models.post_cursor import PostCursor
+from app.scraper.post_timeline import (
+    PostTimelineClient, TimelineUnavailable, collect_new_posts, backfill_posts, TIMELINE_BACKFILL_PAGES
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Ingest posts for every profile a background scrape stores
+INGEST_POSTS = os.getenv("SCRAPE_INGEST_POSTS", "0") == "1"
+
+_client: Optional[PostTimelineClient] = None
+
+
+def get_timeline_client() -> PostTimelineClient:
+    """Process-wide timeline client"""
+    global _client
+    if _client is None:
+        _client = PostTimelineClient()
+    return _client
+
+
+def _store_posts(db: Session, profile: Profile, posts: List[Dict]) -> int:
+    """Insert posts not stored yet and refresh the counts of those that are; returns inserts"""
+    if not posts:
+        return 0
+    urls = [post['url'] for post in posts]
+    existing = {
+        row.post_url: row
+        for row in db.query(Post).filter(Post.profile_id == profile.id, Post.post_url.in_(urls))
+    }
+    inserted = 0
+    for post in posts:
+        row = existing.get(post['url'])
+        if row is None:
+            row = Post(profile_id=profile.id, post_url=post['url'])
+            db.add(row)
+            existing[post['url']] = row
+            inserted += 1
+        row.caption = post['caption']
+        row.likes_count = post['likes']
+        row.comments_count = post['comments']
+        row.views_count = post['views']
+        row.post_type = post['post_type']
+        if post['taken_at']:
+            row.post_date = datetime.fromtimestamp(post['taken_at'], tz=timezone.utc)
+    return inserted
+
+
+def ingest_profile_posts(db: Session, profile: Profile, backfill_pages: int = 0,
+                         client: Optional[PostTimelineClient] = None) -> Dict:
+    """Store posts newer than the profile's checkpoint, then optionally walk older pages
+
+    The first run stores the newest page and remembers where it ended; later runs fetch
+    only up to the checkpoint, and backfill runs continue from the remembered cursor.
+    """
+    client = client or get_timeline_client()
+    cursor = profile.post_cursor
+    if cursor is None:
+        cursor = PostCursor(profile_id=profile.id, newest_taken_at=0, backfill_complete=0)
+        db.add(cursor)
+    first_run = cursor.newest_shortcode is None
+    result = {'username': profile.username, 'new_posts': 0, 'backfilled_posts': 0}
+
+    try:
+        user_id, first_page = client.first_page(profile.username, cursor.instagram_user_id)
+        if not user_id:
+            db.rollback()
+            result['error'] = 'profile not found'
+            return result
+        cursor.instagram_user_id = user_id
+
+        def fetch_older(page_cursor: str):
+            return client.page(user_id, page_cursor)
+
+        new_posts, page_cursor = collect_new_posts(
+            first_page, fetch_older, cursor.newest_shortcode, cursor.newest_taken_at or 0
+        )
+    except TimelineUnavailable as e:
+        db.rollback()
+        logger.warning(f"Post timeline for {profile.username} unavailable: {e}")
+        result['error'] = str(e)
+        return result
+
+    result['new_posts'] = _store_posts(db, profile, new_posts)
+    if new_posts:
+        newest = max(new_posts, key=lambda post: post['taken_at'])
+        cursor.newest_shortcode = newest['shortcode']
+        cursor.newest_taken_at = newest['taken_at']
+    if first_run:
+        # Everything older than the first page is left to backfill
+        cursor.backfill_cursor = page_cursor
+        cursor.backfill_complete = 0 if page_cursor else 1
+
+    if backfill_pages > 0 and not cursor.backfill_complete and cursor.backfill_cursor:
+        older, next_cursor = backfill_posts(fetch_older, cursor.backfill_cursor, min(backfill_pages, TIMELINE_BACKFILL_PAGES))
+        result['backfilled_posts'] = _store_posts(db, profile, older)
+        cursor.backfill_cursor = next_cursor
+        cursor.backfill_complete = 0 if next_cursor else 1
+
+    db.commit()
+    result['backfill_complete'] = bool(cursor.backfill_complete)
+    logger.info(f"📥 {profile.username}: {result['new_posts']} new posts, {result['backfilled_posts']} backfilled")
+    return result
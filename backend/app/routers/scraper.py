@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import logging
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import Iterator, List, Dict
 from pydantic import BaseModel
 from app.database import get_db
 from app.models.profile import Profile
-from app.schemas.profile import ProfileCreate
+from app.post_ingestion import ingest_profile_posts
+from app.scraper.rate_limiter import get_rate_limiter
 from app.scraper.real_instagram_scraper import RealInstagramScraper
-import asyncio
+from app.scraper.scraper_pool import ScraperPoolExhausted, get_scraper_pool
+from app.scraper.jobs import COMPLETED, get_job_manager
+from app.tasks import dispatch_scrape, scrape_and_store_profile
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def get_scraper() -> Iterator[RealInstagramScraper]:
+    """Check out a warm pooled scraper for the duration of the request"""
+    try:
+        with get_scraper_pool(RealInstagramScraper).checkout() as scraper:
+            yield scraper
+    except ScraperPoolExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 class ScrapeRequest(BaseModel):
     usernames: List[str]
@@ -22,17 +35,16 @@ class ScrapeResponse(BaseModel):
     results: List[Dict]
 
 @router.post("/profile", response_model=Dict)
-async def scrape_single_profile(
+def scrape_single_profile(
     request: SingleProfileRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    scraper: RealInstagramScraper = Depends(get_scraper)
 ):
     """Scrape a single Instagram profile and store it in database"""
     
     if not request.username.strip():
         raise HTTPException(status_code=400, detail="Username cannot be empty")
     
-    scraper = RealInstagramScraper()
-    
     try:
         # Scrape the profile
         profile_data = scraper.scrape_profile(request.username.strip())
@@ -72,110 +84,83 @@ async def scrape_single_profile(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error scraping profile: {str(e)}")
 
-@router.post("/profiles", response_model=ScrapeResponse)
-async def scrape_profiles(
-    request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
-    """Scrape Instagram profiles and store them in database"""
+@router.post("/profiles", status_code=202)
+def scrape_profiles(request: ScrapeRequest):
+    """Queue a scrape job for the profiles; poll or subscribe to it for progress"""
     
     if len(request.usernames) > 20:
         raise HTTPException(status_code=400, detail="Maximum 20 usernames allowed per request")
     
-    # Start scraping in background
-    background_tasks.add_task(scrape_and_store_profiles, request.usernames, db)
-    
-    return ScrapeResponse(
-        success_count=0,
-        failed_count=0,
-        results=[],
-        message="Scraping started in background"
-    )
+    return _start_job([username.strip() for username in request.usernames if username.strip()])
 
-async def scrape_and_store_profiles(usernames: List[str], db: Session):
-    """Background task to scrape profiles and store in database"""
-    scraper = RealInstagramScraper()
-    scraped_data = scraper.scrape_multiple_profiles(usernames)
-        
-        for profile_data in scraped_data:
-            try:
-                # Check if profile already exists
-                existing_profile = db.query(Profile).filter(
-                    Profile.username == profile_data['username']
-                ).first()
-                
-                if existing_profile:
-                    # Update existing profile
-                    for key, value in profile_data.items():
-                        if key != 'username':
-                            setattr(existing_profile, key, value)
-                else:
-                    # Create new profile
-                    new_profile = Profile(**profile_data)
-                    db.add(new_profile)
-                
-                db.commit()
-                
-            except Exception as e:
-                print(f"Error storing profile {profile_data['username']}: {str(e)}")
-                db.rollback()
-                continue
+def _job_manager():
+    """Jobs run in-process, or on the Celery workers with SCRAPE_JOB_BACKEND=celery"""
+    return get_job_manager(dispatch=dispatch_scrape)
+
+def _start_job(usernames: List[str]) -> Dict:
+    job = _job_manager().submit(usernames, scrape_and_store_profile)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": len(job.usernames),
+        "status_url": f"/api/scraper/jobs/{job.id}",
+        "events_url": f"/api/scraper/jobs/{job.id}/ws"
+    }
 
 @router.post("/profiles/sync", response_model=ScrapeResponse)
-async def scrape_profiles_sync(
+def scrape_profiles_sync(
     request: ScrapeRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    scraper: RealInstagramScraper = Depends(get_scraper)
 ):
     """Scrape Instagram profiles synchronously (for immediate results)"""
     
     if len(request.usernames) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 usernames allowed for sync requests")
     
-    scraper = RealInstagramScraper()
     scraped_data = scraper.scrape_multiple_profiles(request.usernames)
-        
-        success_count = 0
-        failed_count = len(request.usernames) - len(scraped_data)
-        results = []
-        
-        for profile_data in scraped_data:
-            try:
-                # Check if profile already exists
-                existing_profile = db.query(Profile).filter(
-                    Profile.username == profile_data['username']
-                ).first()
-                
-                if existing_profile:
-                    # Update existing profile
-                    for key, value in profile_data.items():
-                        if key != 'username':
-                            setattr(existing_profile, key, value)
-                    results.append({"username": profile_data['username'], "action": "updated"})
-                else:
-                    # Create new profile
-                    new_profile = Profile(**profile_data)
-                    db.add(new_profile)
-                    results.append({"username": profile_data['username'], "action": "created"})
-                
-                db.commit()
-                success_count += 1
-                
-            except Exception as e:
-                print(f"Error storing profile {profile_data['username']}: {str(e)}")
-                db.rollback()
-                failed_count += 1
-                results.append({"username": profile_data['username'], "action": "failed", "error": str(e)})
-        
-        return ScrapeResponse(
-            success_count=success_count,
-            failed_count=failed_count,
-            results=results
-        )
-
-@router.post("/update-all")
-async def update_all_profiles(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """Update all existing profiles in database"""
+    
+    success_count = 0
+    failed_count = len(request.usernames) - len(scraped_data)
+    results = []
+    
+    for profile_data in scraped_data:
+        try:
+            # Check if profile already exists
+            existing_profile = db.query(Profile).filter(
+                Profile.username == profile_data['username']
+            ).first()
+            
+            if existing_profile:
+                # Update existing profile
+                for key, value in profile_data.items():
+                    if key != 'username':
+                        setattr(existing_profile, key, value)
+                results.append({"username": profile_data['username'], "action": "updated"})
+            else:
+                # Create new profile
+                new_profile = Profile(**profile_data)
+                db.add(new_profile)
+                results.append({"username": profile_data['username'], "action": "created"})
+            
+            db.commit()
+            success_count += 1
+            
+        except Exception as e:
+            logger.error(f"Error storing profile {profile_data['username']}: {e}")
+            db.rollback()
+            failed_count += 1
+            results.append({"username": profile_data['username'], "action": "failed", "error": str(e)})
+    
+    return ScrapeResponse(
+        success_count=success_count,
+        failed_count=failed_count,
+        results=results
+    )
+
+@router.post("/update-all", status_code=202)
+def update_all_profiles(db: Session = Depends(get_db)):
+    """Queue a scrape job refreshing every profile in the database"""
     
     # Get all existing usernames
     profiles = db.query(Profile).all()
@@ -184,10 +169,68 @@ async def update_all_profiles(background_tasks: BackgroundTasks, db: Session = D
     if not usernames:
         raise HTTPException(status_code=404, detail="No profiles found to update")
     
-    # Start scraping in background
-    background_tasks.add_task(scrape_and_store_profiles, usernames, db)
+    return {"message": f"Started updating {len(usernames)} profiles", "count": len(usernames), **_start_job(usernames)}
+
+@router.post("/jobs", status_code=202)
+def create_scrape_job(request: ScrapeRequest):
+    """Queue a scrape job; returns its ID at once"""
+    usernames = [username.strip() for username in request.usernames if username.strip()]
+    if not usernames:
+        raise HTTPException(status_code=400, detail="No usernames given")
+    if len(usernames) > 100:
+        raise HTTPException(status_code=400, detail="Maximum 100 usernames allowed per job")
     
-    return {"message": f"Started updating {len(usernames)} profiles", "count": len(usernames)}
+    return _start_job(usernames)
+
+@router.get("/jobs/{job_id}")
+def get_scrape_job(job_id: str):
+    """Job status with the outcome of each username so far"""
+    snapshot = _job_manager().snapshot(job_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return snapshot
+
+async def _send_job_events(websocket: WebSocket, job_id: str, queue) -> None:
+    snapshot = await _job_manager().snapshot_async(job_id)
+    if not snapshot:
+        await websocket.send_json({"type": "error", "detail": "Job not found"})
+        return
+    await websocket.send_json({"type": "snapshot", **snapshot})
+    if snapshot['status'] == COMPLETED:
+        return
+    while True:
+        event = await queue.get()
+        await websocket.send_json(event)
+        if event['type'] == COMPLETED:
+            return
+
+@router.websocket("/jobs/{job_id}/ws")
+async def stream_scrape_job(websocket: WebSocket, job_id: str):
+    """Current job state, then one message per username update until the job completes"""
+    await websocket.accept()
+    # Subscribe before reading the snapshot so no update falls in between
+    queue = _job_manager().subscribe(job_id)
+    try:
+        await _send_job_events(websocket, job_id, queue)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _job_manager().unsubscribe(job_id, queue)
+
+@router.post("/posts/{username}")
+def ingest_posts(username: str, backfill_pages: int = 0, db: Session = Depends(get_db)):
+    """Fetch posts newer than the stored checkpoint; backfill_pages > 0 also walks older pages"""
+    profile = db.query(Profile).filter(Profile.username == username).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if backfill_pages < 0:
+        raise HTTPException(status_code=400, detail="backfill_pages cannot be negative")
+    
+    result = ingest_profile_posts(db, profile, backfill_pages=backfill_pages)
+    if 'error' in result:
+        raise HTTPException(status_code=503, detail=f"Could not fetch posts: {result['error']}")
+    return result
 
 @router.get("/status")
 async def get_scraper_status():
@@ -201,8 +244,10 @@ async def get_scraper_status():
             "Profile verification status",
             "Bio and profile picture extraction"
         ],
+        # Token buckets per host and endpoint class, as configured by SCRAPE_RATE_LIMITS
         "rate_limits": {
-            "requests_per_minute": 20,
-            "delay_between_requests": "2-5 seconds"
-        }
+            endpoint_class: {"requests_per_minute": round(rate * 60, 1), "burst": capacity}
+            for endpoint_class, (rate, capacity) in get_rate_limiter().limits.items()
+        },
+        "jobs": _job_manager().stats()
     }
@@ -1,206 +1,78 @@
+import asyncio
 import requests
 import time
-import random
 import json
 import logging
-from typing import Dict, Optional, List
+import threading
+from typing import Callable, Dict, Optional, List, Tuple
 from fake_useragent import UserAgent
-import re
-from bs4 import BeautifulSoup
-import urllib.parse
+from .async_engine import AsyncScrapeEngine, DEFAULT_CONCURRENCY
+from .rate_limiter import get_rate_limiter
+from .http_cache import get_http_cache
+from .html_extract import STREAM_CHUNK_SIZE, STREAM_PAGES, PageExtract, StreamingPageReader, parse_page, read_stream
+from .parse_executor import get_parse_executor
+from .extractor_chain import get_extractor_chain
+from .circuit_breaker import get_circuit_breakers
+from .negative_cache import NOT_FOUND, PRIVATE, classify_response, get_negative_cache
+from .retry_queue import retry_failed
+from .profile_catalog import get_profile_catalog
+from .proxy_pool import get_proxy_pool
+from .endpoint_stats import (
+    HEDGE_MAX_IN_FLIGHT, HEDGE_REQUESTS, get_endpoint_tracker, get_hedge_executor,
+    run_hedged, run_hedged_async
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Advanced Instagram API endpoints, keyed by the name their stats are tracked under
+API_ENDPOINTS = {
+    'profile_a1_dis': "https://www.instagram.com/{username}/?__a=1&__d=dis",
+    'profile_a1': "https://www.instagram.com/{username}/?__a=1",
+    'www_api_v1_info': "https://www.instagram.com/api/v1/users/{username}/info/",
+    'i_api_v1_info': "https://i.instagram.com/api/v1/users/{username}/info/",
+    'feed_a1_dis': "https://www.instagram.com/{username}/feed/?__a=1&__d=dis",
+}
+
+
+# Long-lived sessions for hedged API calls, one per hedge executor thread
+_hedge_sessions = threading.local()
+
+
+def _hedge_session() -> requests.Session:
+    session = getattr(_hedge_sessions, 'session', None)
+    if session is None:
+        session = _hedge_sessions.session = requests.Session()
+    return session
+
+
+def _has_followers(profile: Dict) -> bool:
+    """Only results with a follower count count as live data"""
+    return profile.get('followers_count', 0) > 0
+
+
 class AdvancedProductionScraper:
     def __init__(self):
         self.session = requests.Session()
         self.ua = UserAgent()
-        self.rate_limit_delay = (2, 5)
+        self.rate_limiter = get_rate_limiter()
+        self.endpoint_tracker = get_endpoint_tracker()
+        self.breakers = get_circuit_breakers()
+        # Outbound requests are spread over SCRAPE_PROXIES; direct when none are set
+        self.proxy_pool = get_proxy_pool()
+        self.http_cache = get_http_cache()
+        self.negative_cache = get_negative_cache()
+        # Known profiles stay pinned after both chains in scrape_profile
+        self.method_chain = get_extractor_chain('advanced_methods')
+        self.web_extractors = get_extractor_chain('advanced_web')
         
-        # Known profiles with current data (fallback)
-        self.known_profiles = {
-            'cristiano': {
-                'username': 'cristiano',
-                'profile_name': 'Cristiano Ronaldo',
-                'followers_count': 664800000,
-                'following_count': 612,
-                'posts_count': 3943,
-                'engagement_rate': 8.2,
-                'bio': 'Footballer | CR7 | Al Nassr | Portugal',
-                'profile_pic_url': 'https://ui-avatars.com/api/?name=Cristiano+Ronaldo&background=0ea5e9&color=fff&size=64&bold=true',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'leomessi': {
-                'username': 'leomessi',
-                'profile_name': 'Leo Messi',
-                'followers_count': 520000000,
-                'following_count': 289,
-                'posts_count': 1024,
-                'engagement_rate': 7.8,
-                'bio': 'Footballer | PSG | Argentina | World Cup Winner',
-                'profile_pic_url': 'https://ui-avatars.com/api/?name=Leo+Messi&background=0ea5e9&color=fff&size=64&bold=true',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'virat.kohli': {
-                'username': 'virat.kohli',
-                'profile_name': 'Virat Kohli',
-                'followers_count': 273000000,
-                'following_count': 284,
-                'posts_count': 1038,
-                'engagement_rate': 6.5,
-                'bio': 'Cricketer | RCB | India | Former Captain',
-                'profile_pic_url': 'https://ui-avatars.com/api/?name=Virat+Kohli&background=0ea5e9&color=fff&size=64&bold=true',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'ishowspeed': {
-                'username': 'ishowspeed',
-                'profile_name': 'IShowSpeed',
-                'followers_count': 40000000,
-                'following_count': 500,
-                'posts_count': 800,
-                'engagement_rate': 8.5,
-                'bio': 'YouTuber | Streamer | Football Fan',
-                'profile_pic_url': 'https://ui-avatars.com/api/?name=IShowSpeed&background=0ea5e9&color=fff&size=64&bold=true',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'selenagomez': {
-                'username': 'selenagomez',
-                'profile_name': 'Selena Gomez',
-                'followers_count': 429000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Singer | Actress | Rare Beauty Founder',
-                'profile_pic_url': 'https://instagram.com/selenagomez',
-                'is_verified': 1,
-                'is_private': 1
-            },
-            'therock': {
-                'username': 'therock',
-                'profile_name': 'Dwayne Johnson',
-                'followers_count': 395000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Actor | Producer | WWE Legend | Entrepreneur',
-                'profile_pic_url': 'https://instagram.com/therock',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'kyliejenner': {
-                'username': 'kyliejenner',
-                'profile_name': 'Kylie Jenner',
-                'followers_count': 399000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Entrepreneur | Kylie Cosmetics Founder',
-                'profile_pic_url': 'https://instagram.com/kyliejenner',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'kimkardashian': {
-                'username': 'kimkardashian',
-                'profile_name': 'Kim Kardashian',
-                'followers_count': 363000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Entrepreneur | SKIMS Founder | TV Personality',
-                'profile_pic_url': 'https://instagram.com/kimkardashian',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'arianagrande': {
-                'username': 'arianagrande',
-                'profile_name': 'Ariana Grande',
-                'followers_count': 380000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Singer | Actress | Perfume Creator',
-                'profile_pic_url': 'https://instagram.com/arianagrande',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'justinbieber': {
-                'username': 'justinbieber',
-                'profile_name': 'Justin Bieber',
-                'followers_count': 293000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Singer | Songwriter | Entrepreneur',
-                'profile_pic_url': 'https://instagram.com/justinbieber',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'taylorswift': {
-                'username': 'taylorswift',
-                'profile_name': 'Taylor Swift',
-                'followers_count': 282000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Singer | Songwriter | Eras Tour',
-                'profile_pic_url': 'https://instagram.com/taylorswift',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'billieeilish': {
-                'username': 'billieeilish',
-                'profile_name': 'Billie Eilish',
-                'followers_count': 111000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Singer | Songwriter | Oscar Winner',
-                'profile_pic_url': 'https://instagram.com/billieeilish',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'duolingo': {
-                'username': 'duolingo',
-                'profile_name': 'Duolingo',
-                'followers_count': 7000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Learn languages for free. Forever.',
-                'profile_pic_url': 'https://instagram.com/duolingo',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'nasa': {
-                'username': 'nasa',
-                'profile_name': 'NASA',
-                'followers_count': 100000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Explore the universe and discover our home planet',
-                'profile_pic_url': 'https://instagram.com/nasa',
-                'is_verified': 1,
-                'is_private': 0
-            },
-            'natgeo': {
-                'username': 'natgeo',
-                'profile_name': 'National Geographic',
-                'followers_count': 240000000,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': 'Inspiring people to care about the planet',
-                'profile_pic_url': 'https://instagram.com/natgeo',
-                'is_verified': 1,
-                'is_private': 0
-            }
-        }
+        # Known profiles with current data (fallback), indexed on disk and loaded on first use
+        self.known_profiles = get_profile_catalog('known_profiles')
+
+        # Set while a hedged API call is using self.session, which may outlast the checkout
+        self._session_lock = threading.Lock()
+        self._session_busy = False
+        self._on_session_free: List[Callable[[], None]] = []
 
     def _get_stealth_headers(self) -> Dict[str, str]:
         """Generate ultra-stealth headers"""
@@ -223,91 +95,273 @@ class AdvancedProductionScraper:
             'Referer': 'https://www.google.com/'
         }
 
-    def _rate_limit(self):
-        """Apply intelligent rate limiting"""
-        delay = random.uniform(*self.rate_limit_delay)
-        time.sleep(delay)
+    def _ranked_endpoints(self) -> Tuple[List[str], int]:
+        """API endpoint names, best observed performer first; open circuits are left out"""
+        max_in_flight = HEDGE_MAX_IN_FLIGHT if HEDGE_REQUESTS else 1
+        names = [
+            name for name in self.endpoint_tracker.rank(list(API_ENDPOINTS))
+            if self.breakers.available(API_ENDPOINTS[name], name)
+        ]
+        return names, max_in_flight
+
+    @staticmethod
+    def endpoint_stats() -> Dict[str, Dict]:
+        """Sliding-window success rate, latency and circuit state per API endpoint"""
+        stats = get_endpoint_tracker().snapshot()
+        breakers = get_circuit_breakers()
+        return {
+            name: {**stats.get(name, {'samples': 0}), 'circuit': breakers.snapshot(url, name)}
+            for name, url in API_ENDPOINTS.items()
+        }
+
+    def _api_headers(self) -> Dict[str, str]:
+        """Stealth headers plus the XHR headers the API endpoints expect"""
+        headers = self._get_stealth_headers()
+        headers.update({
+            'X-Requested-With': 'XMLHttpRequest',
+            'X-IG-App-ID': '936619743392459',
+            'X-IG-WWW-Claim': '0',
+            'X-Instagram-AJAX': '1',
+            'X-CSRFToken': 'missing'
+        })
+        return headers
+
+    def _parse_api_payload(self, data: Dict, username: str) -> Optional[Dict]:
+        """Parse an API JSON payload into a profile dict"""
+        # Try different data structures
+        user_data = None
+        if 'graphql' in data and 'user' in data['graphql']:
+            user_data = data['graphql']['user']
+        elif 'user' in data:
+            user_data = data['user']
+        elif 'data' in data and 'user' in data['data']:
+            user_data = data['data']['user']
+        
+        if user_data:
+            followers_count = 0
+            if 'edge_followed_by' in user_data and 'count' in user_data['edge_followed_by']:
+                followers_count = user_data['edge_followed_by']['count']
+            elif 'follower_count' in user_data:
+                followers_count = user_data['follower_count']
+            elif 'followers' in user_data:
+                followers_count = user_data['followers']
+            
+            if followers_count > 0:
+                logger.info(f"✅ ADVANCED API SUCCESS: Got live data for {username}")
+                return {
+                    'username': user_data.get('username', username),
+                    'profile_name': user_data.get('full_name', ''),
+                    'followers_count': followers_count,
+                    'following_count': user_data.get('edge_follow', {}).get('count', 0) or user_data.get('following_count', 0),
+                    'posts_count': user_data.get('edge_owner_to_timeline_media', {}).get('count', 0) or user_data.get('media_count', 0),
+                    'engagement_rate': 0.0,
+                    'bio': user_data.get('biography', ''),
+                    'profile_pic_url': user_data.get('profile_pic_url_hd', '') or user_data.get('profile_pic_url', ''),
+                    'is_verified': 1 if user_data.get('is_verified', False) else 0,
+                    'is_private': 1 if user_data.get('is_private', False) else 0
+                }
+        return None
+
+    def _fetch_api_endpoint(self, name: str, username: str, headers: Dict[str, str],
+                            session: Optional[requests.Session] = None) -> Optional[Dict]:
+        """Fetch and parse one API endpoint, recording its outcome"""
+        endpoint = API_ENDPOINTS[name].format(username=username)
+        with self.breakers.claim(endpoint, name) as allowed:
+            if not allowed:
+                logger.debug(f"Circuit open for {name}, skipping")
+                return None
+            self.rate_limiter.acquire(endpoint, 'api')
+        
+            started = time.monotonic()
+            result = None
+            status = None
+            try:
+                response = self.proxy_pool.get(
+                    session or self.session,
+                    endpoint,
+                    headers={**headers, **self.http_cache.conditional_headers(endpoint)},
+                    timeout=15
+                )
+                status = response.status_code
+                self.breakers.record(endpoint, name, status, response.headers.get('Retry-After'))
+            
+                logger.info(f"Advanced API {endpoint}: {response.status_code}")
+            
+                if response.status_code == 304:
+                    result = self.http_cache.not_modified(endpoint)
+                elif response.status_code == 200:
+                    try:
+                        result = self._parse_api_payload(response.json(), username)
+                        self.http_cache.store_response(endpoint, response.headers, result)
+                    except json.JSONDecodeError:
+                        pass
+                
+            except Exception as e:
+                if status is None:
+                    self.breakers.record(endpoint, name, None)
+                logger.debug(f"Advanced API endpoint {endpoint} failed: {e}")
+            finally:
+                self.endpoint_tracker.record(name, result is not None, time.monotonic() - started)
+            return result
+
+    def _claim_session(self) -> bool:
+        with self._session_lock:
+            if self._session_busy:
+                return False
+            self._session_busy = True
+            return True
+
+    def _release_session(self):
+        with self._session_lock:
+            self._session_busy = False
+            callbacks, self._on_session_free = self._on_session_free, []
+        for callback in callbacks:
+            callback()
+
+    def when_idle(self, callback: Callable[[], None]):
+        """Call back once no losing hedged request is still using self.session
+
+        ScraperPool returns the instance through this, so the next checkout has the session to itself.
+        """
+        with self._session_lock:
+            if self._session_busy:
+                self._on_session_free.append(callback)
+                return
+        callback()
+
+    def _fetch_hedged_endpoint(self, name: str, username: str, headers: Dict[str, str],
+                               cookies: requests.cookies.RequestsCookieJar) -> Optional[Dict]:
+        """_fetch_api_endpoint for run_hedged: one call at a time on self.session, hedges on their thread's own"""
+        if self._claim_session():
+            try:
+                return self._fetch_api_endpoint(name, username, headers)
+            finally:
+                self._release_session()
+        session = _hedge_session()
+        session.cookies.clear()
+        session.cookies.update(cookies)
+        return self._fetch_api_endpoint(name, username, headers, session)
 
     def _try_advanced_api_scraping(self, username: str) -> Optional[Dict]:
         """Try advanced Instagram API scraping"""
         try:
             logger.info(f"🚀 ADVANCED API: Attempting advanced scraping for {username}")
             
-            # Try multiple advanced endpoints
-            endpoints = [
-                f"https://www.instagram.com/{username}/?__a=1&__d=dis",
-                f"https://www.instagram.com/{username}/?__a=1",
-                f"https://www.instagram.com/api/v1/users/{username}/info/",
-                f"https://i.instagram.com/api/v1/users/{username}/info/",
-                f"https://www.instagram.com/{username}/feed/?__a=1&__d=dis"
-            ]
+            headers = self._api_headers()
+            names, max_in_flight = self._ranked_endpoints()
+            if max_in_flight > 1:
+                # A losing call keeps running after we return, so calls share self.session
+                # only one at a time and the pool waits for it before lending the scraper out
+                cookies = self.session.cookies.copy()
+                fetch = lambda name: self._fetch_hedged_endpoint(name, username, headers, cookies)
+            else:
+                fetch = lambda name: self._fetch_api_endpoint(name, username, headers)
             
-            headers = self._get_stealth_headers()
-            headers.update({
-                'X-Requested-With': 'XMLHttpRequest',
-                'X-IG-App-ID': '936619743392459',
-                'X-IG-WWW-Claim': '0',
-                'X-Instagram-AJAX': '1',
-                'X-CSRFToken': 'missing'
-            })
-            
-            for endpoint in endpoints:
-                try:
-                    response = self.session.get(endpoint, headers=headers, timeout=15)
-                    
-                    logger.info(f"Advanced API {endpoint}: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        try:
-                            data = response.json()
-                            
-                            # Try different data structures
-                            user_data = None
-                            if 'graphql' in data and 'user' in data['graphql']:
-                                user_data = data['graphql']['user']
-                            elif 'user' in data:
-                                user_data = data['user']
-                            elif 'data' in data and 'user' in data['data']:
-                                user_data = data['data']['user']
-                            
-                            if user_data:
-                                followers_count = 0
-                                if 'edge_followed_by' in user_data and 'count' in user_data['edge_followed_by']:
-                                    followers_count = user_data['edge_followed_by']['count']
-                                elif 'follower_count' in user_data:
-                                    followers_count = user_data['follower_count']
-                                elif 'followers' in user_data:
-                                    followers_count = user_data['followers']
-                                
-                                if followers_count > 0:
-                                    logger.info(f"✅ ADVANCED API SUCCESS: Got live data for {username}")
-                                    return {
-                                        'username': user_data.get('username', username),
-                                        'profile_name': user_data.get('full_name', ''),
-                                        'followers_count': followers_count,
-                                        'following_count': user_data.get('edge_follow', {}).get('count', 0) or user_data.get('following_count', 0),
-                                        'posts_count': user_data.get('edge_owner_to_timeline_media', {}).get('count', 0) or user_data.get('media_count', 0),
-                                        'engagement_rate': 0.0,
-                                        'bio': user_data.get('biography', ''),
-                                        'profile_pic_url': user_data.get('profile_pic_url_hd', '') or user_data.get('profile_pic_url', ''),
-                                        'is_verified': 1 if user_data.get('is_verified', False) else 0,
-                                        'is_private': 1 if user_data.get('is_private', False) else 0
-                                    }
-                        except json.JSONDecodeError:
-                            continue
-                    elif response.status_code == 429:
-                        logger.warning(f"Rate limited on {endpoint}, waiting...")
-                        time.sleep(10)
-                        continue
-                        
-                except Exception as e:
-                    logger.debug(f"Advanced API endpoint {endpoint} failed: {e}")
-                    continue
+            return run_hedged(
+                names,
+                fetch,
+                self.endpoint_tracker,
+                get_hedge_executor(),
+                max_in_flight=max_in_flight
+            )
                     
         except Exception as e:
             logger.debug(f"Advanced API scraping failed for {username}: {e}")
         return None
 
+    def _page_reader(self, username: str) -> StreamingPageReader:
+        """Streaming reader that stops once the head's ld+json block has follower counts"""
+        return StreamingPageReader(lambda page: self._extract_ld_json(page, username) is not None)
+
+    def _parse_web_html(self, html: str, username: str) -> Optional[Dict]:
+        """Extract a profile dict from the profile page HTML"""
+        return self._extract_web_page(PageExtract(html), username)
+
+    def _extract_web_page(self, page: PageExtract, username: str) -> Optional[Dict]:
+        """Run the web extractors over a PageExtract or a ParsedPage from a parse worker"""
+        return self.web_extractors.run([
+            ('ld_json', self._extract_ld_json, 0),
+            ('shared_data', self._extract_shared_data, 0),
+            # No counts, so only ever a partial result after both full extractors
+            ('og_meta', self._extract_og_meta, 1),
+        ], page, username, accept=_has_followers)
+
+    def _extract_ld_json(self, page: PageExtract, username: str) -> Optional[Dict]:
+        """Extractor strategy: ld+json additionalProperty counts"""
+        for data in page.ld_json():
+            try:
+                if 'mainEntity' in data and 'additionalProperty' in data['mainEntity']:
+                    props = {}
+                    for prop in data['mainEntity']['additionalProperty']:
+                        if 'name' in prop and 'value' in prop:
+                            props[prop['name']] = prop['value']
+                    
+                    followers_count = int(props.get('followers', 0))
+                    if followers_count > 0:
+                        logger.info(f"✅ ADVANCED WEB SUCCESS: Got live data for {username}")
+                        return {
+                            'username': username,
+                            'profile_name': data['mainEntity'].get('name', ''),
+                            'followers_count': followers_count,
+                            'following_count': int(props.get('following', 0)),
+                            'posts_count': int(props.get('posts', 0)),
+                            'engagement_rate': 0.0,
+                            'bio': data['mainEntity'].get('description', ''),
+                            'profile_pic_url': data['mainEntity'].get('image', ''),
+                            'is_verified': 1 if 'verified' in str(data).lower() else 0,
+                            'is_private': 0
+                        }
+            except:
+                continue
+        return None
+
+    def _extract_shared_data(self, page: PageExtract, username: str) -> Optional[Dict]:
+        """Extractor strategy: window._sharedData"""
+        data = page.shared_data()
+        if data:
+            try:
+                if 'entry_data' in data and 'ProfilePage' in data['entry_data']:
+                    profile_data = data['entry_data']['ProfilePage'][0]['graphql']['user']
+                    followers_count = profile_data.get('edge_followed_by', {}).get('count', 0)
+                    
+                    if followers_count > 0:
+                        logger.info(f"✅ ADVANCED WEB SUCCESS: Got live data for {username} via _sharedData")
+                        return {
+                            'username': profile_data.get('username', username),
+                            'profile_name': profile_data.get('full_name', ''),
+                            'followers_count': followers_count,
+                            'following_count': profile_data.get('edge_follow', {}).get('count', 0),
+                            'posts_count': profile_data.get('edge_owner_to_timeline_media', {}).get('count', 0),
+                            'engagement_rate': 0.0,
+                            'bio': profile_data.get('biography', ''),
+                            'profile_pic_url': profile_data.get('profile_pic_url_hd', ''),
+                            'is_verified': 1 if profile_data.get('is_verified', False) else 0,
+                            'is_private': 1 if profile_data.get('is_private', False) else 0
+                        }
+            except (KeyError, IndexError, TypeError):
+                pass
+        return None
+
+    def _extract_og_meta(self, page: PageExtract, username: str) -> Optional[Dict]:
+        """Extractor strategy: og: meta tags (no counts, kept only as a partial result)"""
+        meta_data = {key: value for key, value in page.meta().items() if 'og:' in key}
+        
+        if meta_data.get('og:title'):
+            logger.info(f"✅ ADVANCED WEB SUCCESS: Got meta data for {username}")
+            return {
+                'username': username,
+                'profile_name': meta_data.get('og:title', ''),
+                'followers_count': 0,  # Will fall back to known data
+                'following_count': 0,
+                'posts_count': 0,
+                'engagement_rate': 0.0,
+                'bio': meta_data.get('og:description', ''),
+                'profile_pic_url': meta_data.get('og:image', ''),
+                'is_verified': 0,
+                'is_private': 0
+            }
+        return None
+
     def _try_advanced_web_scraping(self, username: str) -> Optional[Dict]:
         """Try advanced web scraping with multiple techniques"""
         try:
@@ -315,111 +369,159 @@ class AdvancedProductionScraper:
             
             url = f"https://www.instagram.com/{username}/"
             headers = self._get_stealth_headers()
+            headers.update(self.http_cache.conditional_headers(url))
             
-            response = self.session.get(url, headers=headers, timeout=15)
+            with self.breakers.claim(url, 'web') as allowed:
+                if not allowed:
+                    logger.debug(f"Circuit open for the profile page, skipping {username}")
+                    return None
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                self.rate_limiter.acquire(url, 'web')
+                try:
+                    response = self.proxy_pool.get(self.session, url, headers=headers, timeout=15, stream=STREAM_PAGES)
+                except Exception:
+                    self.breakers.record(url, 'web', None)
+                    raise
+                self.breakers.record(url, 'web', response.status_code, response.headers.get('Retry-After'))
+            
+            # Streamed so the connection can be dropped once the profile data has arrived
+            with response:
+                if response.status_code == 304:
+                    return self.http_cache.not_modified(url)
                 
-                # Method 1: Look for JSON data in script tags
-                scripts = soup.find_all('script', type='application/ld+json')
-                for script in scripts:
-                    try:
-                        data = json.loads(script.string)
-                        if 'mainEntity' in data and 'additionalProperty' in data['mainEntity']:
-                            props = {}
-                            for prop in data['mainEntity']['additionalProperty']:
-                                if 'name' in prop and 'value' in prop:
-                                    props[prop['name']] = prop['value']
-                            
-                            followers_count = int(props.get('followers', 0))
-                            if followers_count > 0:
-                                logger.info(f"✅ ADVANCED WEB SUCCESS: Got live data for {username}")
-                                return {
-                                    'username': username,
-                                    'profile_name': data['mainEntity'].get('name', ''),
-                                    'followers_count': followers_count,
-                                    'following_count': int(props.get('following', 0)),
-                                    'posts_count': int(props.get('posts', 0)),
-                                    'engagement_rate': 0.0,
-                                    'bio': data['mainEntity'].get('description', ''),
-                                    'profile_pic_url': data['mainEntity'].get('image', ''),
-                                    'is_verified': 1 if 'verified' in str(data).lower() else 0,
-                                    'is_private': 0
-                                }
-                    except:
-                        continue
+                outcome = classify_response(response.status_code, response.url)
+                if outcome:
+                    self.negative_cache.record(username, outcome)
+                    return None
                 
-                # Method 2: Look for window._sharedData
-                scripts = soup.find_all('script')
-                for script in scripts:
-                    if script.string and 'window._sharedData' in script.string:
-                        try:
-                            json_str = script.string.split('window._sharedData = ')[1].split(';</script>')[0]
-                            data = json.loads(json_str)
-                            
-                            if 'entry_data' in data and 'ProfilePage' in data['entry_data']:
-                                profile_data = data['entry_data']['ProfilePage'][0]['graphql']['user']
-                                followers_count = profile_data.get('edge_followed_by', {}).get('count', 0)
-                                
-                                if followers_count > 0:
-                                    logger.info(f"✅ ADVANCED WEB SUCCESS: Got live data for {username} via _sharedData")
-                                    return {
-                                        'username': profile_data.get('username', username),
-                                        'profile_name': profile_data.get('full_name', ''),
-                                        'followers_count': followers_count,
-                                        'following_count': profile_data.get('edge_follow', {}).get('count', 0),
-                                        'posts_count': profile_data.get('edge_owner_to_timeline_media', {}).get('count', 0),
-                                        'engagement_rate': 0.0,
-                                        'bio': profile_data.get('biography', ''),
-                                        'profile_pic_url': profile_data.get('profile_pic_url_hd', ''),
-                                        'is_verified': 1 if profile_data.get('is_verified', False) else 0,
-                                        'is_private': 1 if profile_data.get('is_private', False) else 0
-                                    }
-                        except:
-                            continue
+                if response.status_code == 200:
+                    if STREAM_PAGES:
+                        html = read_stream(response.iter_content(STREAM_CHUNK_SIZE), self._page_reader(username))
+                    else:
+                        html = response.text
+                    result = self._parse_web_html(html, username)
+                    self.http_cache.store_response(url, response.headers, result)
+                    return result
+                    
+        except Exception as e:
+            logger.debug(f"Advanced web scraping failed for {username}: {e}")
+        return None
+
+    async def _fetch_api_endpoint_async(self, engine: AsyncScrapeEngine, name: str, username: str,
+                                        headers: Dict[str, str]) -> Optional[Dict]:
+        """Async variant of _fetch_api_endpoint on the shared engine"""
+        endpoint = API_ENDPOINTS[name].format(username=username)
+        with self.breakers.claim(endpoint, name) as allowed:
+            if not allowed:
+                logger.debug(f"Circuit open for {name}, skipping")
+                return None
+            await self.rate_limiter.acquire_async(endpoint, 'api')
+        
+            started = time.monotonic()
+            result = None
+            status = None
+            try:
+                validators = await self.http_cache.conditional_headers_async(endpoint)
+                response = await engine.get(
+                    endpoint,
+                    headers={**headers, **validators},
+                    timeout=15,
+                    endpoint_class=None
+                )
+                status = response.status_code
+                self.breakers.record(endpoint, name, status, response.headers.get('Retry-After'))
+            
+                logger.info(f"Advanced API {endpoint}: {response.status_code}")
+            
+                if response.status_code == 304:
+                    result = await self.http_cache.not_modified_async(endpoint)
+                elif response.status_code == 200:
+                    try:
+                        result = self._parse_api_payload(response.json(), username)
+                        await self.http_cache.store_response_async(endpoint, response.headers, result)
+                    except json.JSONDecodeError:
+                        pass
                 
-                # Method 3: Extract from meta tags
-                meta_data = {}
-                meta_tags = soup.find_all('meta')
-                for tag in meta_tags:
-                    if tag.get('property') and 'og:' in tag.get('property'):
-                        meta_data[tag.get('property')] = tag.get('content')
+            except Exception as e:
+                if status is None:
+                    self.breakers.record(endpoint, name, None)
+                logger.debug(f"Advanced API endpoint {endpoint} failed: {e}")
+            finally:
+                self.endpoint_tracker.record(name, result is not None, time.monotonic() - started)
+            return result
+
+    async def _try_advanced_api_scraping_async(self, engine: AsyncScrapeEngine, username: str) -> Optional[Dict]:
+        """Async variant of _try_advanced_api_scraping on the shared engine"""
+        headers = self._api_headers()
+        names, max_in_flight = self._ranked_endpoints()
+        
+        return await run_hedged_async(
+            names,
+            lambda name: self._fetch_api_endpoint_async(engine, name, username, headers),
+            self.endpoint_tracker,
+            max_in_flight=max_in_flight
+        )
+
+    async def _try_advanced_web_scraping_async(self, engine: AsyncScrapeEngine, username: str) -> Optional[Dict]:
+        """Async variant of _try_advanced_web_scraping on the shared engine"""
+        try:
+            url = f"https://www.instagram.com/{username}/"
+            headers = self._get_stealth_headers()
+            headers.update(await self.http_cache.conditional_headers_async(url))
+            with self.breakers.claim(url, 'web') as allowed:
+                if not allowed:
+                    return None
+            
+                try:
+                    if STREAM_PAGES:
+                        reader = self._page_reader(username)
+                        response = await engine.get_streamed(url, reader, headers=headers, timeout=15)
+                        html = reader.html()
+                    else:
+                        response = await engine.get(url, headers=headers, timeout=15)
+                        html = response.text
+                except Exception:
+                    self.breakers.record(url, 'web', None)
+                    raise
+                self.breakers.record(url, 'web', response.status_code, response.headers.get('Retry-After'))
+            
+            if response.status_code == 304:
+                return await self.http_cache.not_modified_async(url)
+            
+            outcome = classify_response(response.status_code, str(response.url))
+            if outcome:
+                await self.negative_cache.record_async(username, outcome)
+                return None
+            
+            if response.status_code == 200:
+                page = await get_parse_executor().run(parse_page, html)
+                result = self._extract_web_page(page, username)
+                await self.http_cache.store_response_async(url, response.headers, result)
+                return result
                 
-                if meta_data.get('og:title'):
-                    logger.info(f"✅ ADVANCED WEB SUCCESS: Got meta data for {username}")
-                    return {
-                        'username': username,
-                        'profile_name': meta_data.get('og:title', ''),
-                        'followers_count': 0,  # Will fall back to known data
-                        'following_count': 0,
-                        'posts_count': 0,
-                        'engagement_rate': 0.0,
-                        'bio': meta_data.get('og:description', ''),
-                        'profile_pic_url': meta_data.get('og:image', ''),
-                        'is_verified': 0,
-                        'is_private': 0
-                    }
-                    
         except Exception as e:
             logger.debug(f"Advanced web scraping failed for {username}: {e}")
         return None
 
     def _get_known_profile_data(self, username: str) -> Optional[Dict]:
         """Get data from known profiles database"""
-        normalized = username.lower().replace(' ', '').replace('_', '').replace('.', '')
-        
-        if username.lower() in self.known_profiles:
-            return self.known_profiles[username.lower()].copy()
-        
-        for key, value in self.known_profiles.items():
-            if normalized == key.lower().replace('_', '').replace('.', ''):
-                return value.copy()
+        return self.known_profiles.search(username)
+
+    def _fallback_result(self, username: str, negative: Optional[Dict] = None) -> Optional[Dict]:
+        """Answer without the network: negative-cache entry first, then known profiles"""
+        negative = negative or self.negative_cache.lookup(username)
+        if negative and negative['outcome'] == PRIVATE and negative.get('payload'):
+            return negative['payload']
+        if negative and negative['outcome'] == NOT_FOUND:
+            logger.warning(f"❌ NOT FOUND: {username}")
+            return None
         
-        for key, value in self.known_profiles.items():
-            if normalized in key.lower() or key.lower() in normalized:
-                return value.copy()
+        known_data = self._get_known_profile_data(username)
+        if known_data:
+            logger.info(f"📊 FALLBACK: Using known data for {username}")
+            return known_data
         
+        logger.warning(f"❌ FAILED: Could not scrape {username}")
         return None
 
     def scrape_profile(self, username: str) -> Optional[Dict]:
@@ -430,33 +532,27 @@ class AdvancedProductionScraper:
         username = username.strip().lower()
         logger.info(f"🚀 ADVANCED PRODUCTION SCRAPING: {username}")
         
-        # Apply rate limiting
-        self._rate_limit()
+        # Known-missing, private or blocked profiles skip the network entirely
+        negative = self.negative_cache.lookup(username)
+        if negative:
+            return self._fallback_result(username, negative)
         
-        # Try multiple advanced methods
-        methods = [
-            self._try_advanced_api_scraping,
-            self._try_advanced_web_scraping
-        ]
-        
-        for method in methods:
-            try:
-                result = method(username)
-                if result and result.get('followers_count', 0) > 0:
-                    logger.info(f"🎯 LIVE DATA SUCCESS: {username} via {method.__name__}")
-                    return result
-            except Exception as e:
-                logger.debug(f"Method {method.__name__} failed for {username}: {e}")
-                continue
+        # Try multiple advanced methods, most productive first
+        result = self.method_chain.run([
+            ('api', self._try_advanced_api_scraping),
+            ('web', self._try_advanced_web_scraping),
+        ], username, accept=_has_followers)
+        if result and _has_followers(result):
+            logger.info(f"🎯 LIVE DATA SUCCESS: {username}")
+            self.negative_cache.record_result(username, result)
+            return result
         
         # If all methods fail, try known profiles
-        known_data = self._get_known_profile_data(username)
-        if known_data:
-            logger.info(f"📊 FALLBACK: Using known data for {username}")
-            return known_data
-        
-        logger.warning(f"❌ FAILED: Could not scrape {username}")
-        return None
+        return self._fallback_result(username)
+
+    def _retryable(self, username: str) -> bool:
+        """Negatively cached profiles would only fail again"""
+        return self.negative_cache.lookup(username) is None
 
     def scrape_multiple_profiles(self, usernames: List[str]) -> Dict[str, Dict]:
         """Scrape multiple profiles with advanced techniques"""
@@ -473,4 +569,37 @@ class AdvancedProductionScraper:
                 logger.error(f"Error scraping {username}: {e}")
                 results[username] = None
         
+        # Failures get backed-off retries instead of waiting for the next poll cycle
+        failed = [username for username, result in results.items() if result is None]
+        if failed:
+            results.update(retry_failed(failed, self.scrape_profile, self._retryable))
+        
         return results
+
+    async def _scrape_profile_async(self, engine: AsyncScrapeEngine, username: str) -> Optional[Dict]:
+        """Async scraping pipeline mirroring scrape_profile"""
+        if not username:
+            return None
+        
+        username = username.strip().lower()
+        
+        negative = await self.negative_cache.lookup_async(username)
+        if negative:
+            return self._fallback_result(username, negative)
+        
+        result = await self.method_chain.run_async([
+            ('api', self._try_advanced_api_scraping_async),
+            ('web', self._try_advanced_web_scraping_async),
+        ], engine, username, accept=_has_followers)
+        if result and _has_followers(result):
+            logger.info(f"🎯 LIVE DATA SUCCESS: {username}")
+            await self.negative_cache.record_result_async(username, result)
+            return result
+        
+        # Re-reads the negative cache and the catalog, both of which may block
+        return await asyncio.to_thread(self._fallback_result, username)
+
+    async def scrape_many(self, usernames: List[str], concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Dict]:
+        """Scrape many profiles concurrently with per-host politeness limits"""
+        async with AsyncScrapeEngine(concurrency=concurrency) as engine:
+            return await engine.run(usernames, self._scrape_profile_async, self._retryable)
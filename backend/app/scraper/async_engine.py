@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .html_extract import STREAM_CHUNK_SIZE, StreamingPageReader
+from .retry_queue import RetryQueue
+from .transport import build_async_client, request_headers
+from .proxy_pool import PROXY_BLOCK_STATUSES, PROXY_RETRIES, Proxy, ProxyPool, get_proxy_pool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "50"))
+PER_HOST_CONCURRENCY = int(os.getenv("SCRAPE_PER_HOST_CONCURRENCY", "8"))
+
+
+ScrapeOne = Callable[["AsyncScrapeEngine", str], Awaitable[Optional[Dict]]]
+
+
+class AsyncScrapeEngine:
+    """Shared asyncio HTTP engine with bounded concurrency and per-host politeness"""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        timeout: float = 15.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.proxy_pool = proxy_pool or get_proxy_pool()
+        self._client: Optional[httpx.AsyncClient] = None
+        # One keep-alive client per proxy, created on first use
+        self._proxy_clients: Dict[str, httpx.AsyncClient] = {}
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _new_client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        # Instagram hosts get their own small HTTP/2 pools; concurrent requests share connections
+        return build_async_client(self.concurrency, timeout=self.timeout, proxy=proxy)
+
+    async def __aenter__(self):
+        self._client = self._new_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for client in self._proxy_clients.values():
+            await client.aclose()
+        self._proxy_clients.clear()
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def _client_for(self, proxy: Proxy) -> httpx.AsyncClient:
+        if proxy.url not in self._proxy_clients:
+            self._proxy_clients[proxy.url] = self._new_client(proxy.url)
+        return self._proxy_clients[proxy.url]
+
+    async def _send(self, send: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Run send through the healthiest proxy, moving to another exit if one is refused or blocked"""
+        for attempt in range(PROXY_RETRIES + 1):
+            proxy = self.proxy_pool.acquire()
+            if proxy is None:
+                return await send(self._client)
+            started = time.monotonic()
+            try:
+                response = await send(self._client_for(proxy))
+            except httpx.HTTPError:
+                self.proxy_pool.observe(proxy, None, None)
+                if attempt == PROXY_RETRIES:
+                    raise
+                continue
+            finally:
+                self.proxy_pool.release(proxy)
+            self.proxy_pool.observe(proxy, response.status_code, time.monotonic() - started)
+            if response.status_code in PROXY_BLOCK_STATUSES and attempt < PROXY_RETRIES:
+                continue
+            return response
+
+    def _host(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._hosts[host]
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        endpoint_class: Optional[str] = 'web',
+    ) -> httpx.Response:
+        """GET a URL while respecting the politeness limits of its host
+
+        Pass endpoint_class=None when the caller has already acquired from the rate limiter.
+        """
+        if self._client is None:
+            raise RuntimeError("AsyncScrapeEngine must be used as an async context manager")
+
+        headers = request_headers(headers)
+
+        if endpoint_class:
+            await self.rate_limiter.acquire_async(url, endpoint_class)
+        async with self._host(url):
+            return await self._send(lambda client: client.get(url, headers=headers, timeout=timeout or self.timeout))
+
+    async def get_streamed(
+        self,
+        url: str,
+        reader: StreamingPageReader,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        endpoint_class: Optional[str] = 'web',
+    ) -> httpx.Response:
+        """Like get, but feeds the body into reader and drops the connection once it has enough
+
+        The returned response's body is not loaded; read the page from reader.html().
+        """
+        if self._client is None:
+            raise RuntimeError("AsyncScrapeEngine must be used as an async context manager")
+
+        headers = request_headers(headers)
+
+        if endpoint_class:
+            await self.rate_limiter.acquire_async(url, endpoint_class)
+
+        async def _read(client: httpx.AsyncClient) -> httpx.Response:
+            async with client.stream('GET', url, headers=headers, timeout=timeout or self.timeout) as response:
+                if response.status_code == 200:
+                    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                        if reader.feed(chunk):
+                            break
+                return response
+
+        async with self._host(url):
+            return await self._send(_read)
+
+    async def run(self, usernames: List[str], scrape_one: ScrapeOne,
+                  retryable: Callable[[str], bool] = lambda username: True) -> Dict[str, Optional[Dict]]:
+        """Run scrape_one for every username with at most `concurrency` in flight
+
+        Failures that are retryable get jittered backoff retries; a waiting retry holds no
+        concurrency slot.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        retries = RetryQueue()
+        results: Dict[str, Optional[Dict]] = {username: None for username in usernames}
+
+        async def _bounded(username: str, attempt: int):
+            async with semaphore:
+                try:
+                    results[username] = await scrape_one(self, username)
+                except Exception as e:
+                    logger.error(f"Error scraping {username}: {e}")
+                    results[username] = None
+            # retryable may consult a shared negative cache, so keep it off the loop
+            if results[username] is None and await asyncio.to_thread(retryable, username):
+                retries.schedule(username, attempt + 1)
+
+        tasks = {asyncio.create_task(_bounded(username, 0)) for username in results}
+        while tasks or len(retries):
+            for username, attempt in retries.due():
+                tasks.add(asyncio.create_task(_bounded(username, attempt)))
+            if tasks:
+                _, tasks = await asyncio.wait(tasks, timeout=retries.next_delay(), return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(retries.next_delay() or 0)
+        return results
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+from .resource_filter import BLOCK_RESOURCES, ResourceFilter
+from .proxy_pool import Proxy, ProxyPool, get_proxy_pool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+BROWSER_CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "50"))
+BROWSER_HEALTH_INTERVAL = float(os.getenv("BROWSER_HEALTH_INTERVAL", "30"))
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu'
+]
+
+
+class BrowserPool:
+    """Long-lived Chromium process handing out pre-warmed contexts and pages
+
+    The pool belongs to the event loop that first starts it. Each context is bound to one
+    outbound proxy for its lifetime and is replaced once that proxy is quarantined. A slot
+    whose context could not be created sits in the idle queue as None until a checkout
+    manages to fill it, so failures never shrink the pool.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_uses: int = BROWSER_CONTEXT_MAX_USES,
+                 health_interval: float = BROWSER_HEALTH_INTERVAL, headless: bool = True,
+                 resource_filter: Optional[ResourceFilter] = None, proxy_pool: Optional[ProxyPool] = None):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.health_interval = health_interval
+        self.headless = headless
+        self.resource_filter = resource_filter or (ResourceFilter() if BLOCK_RESOURCES else None)
+        self.proxy_pool = proxy_pool or get_proxy_pool()
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._uses: Dict[BrowserContext, int] = {}
+        self._generation: Dict[BrowserContext, int] = {}
+        self._proxies: Dict[BrowserContext, Proxy] = {}
+        self._current_generation = 0
+        self._empty_slots = 0
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self.checkouts = 0
+        self.relaunches = 0
+
+    @property
+    def started(self) -> bool:
+        return self.browser is not None
+
+    async def start(self):
+        """Launch the browser and pre-warm the contexts (idempotent)"""
+        async with self._lock:
+            if self.started:
+                return
+            self.playwright = await async_playwright().start()
+            self._idle = asyncio.Queue()
+            await self._launch()
+            if self.health_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+            logger.info(f"Browser pool started with {self.size} warm contexts")
+
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        self._current_generation += 1
+        for _ in range(self.size):
+            try:
+                self._idle.put_nowait(await self._new_context())
+            except Exception as e:
+                logger.error(f"Could not create browser context: {e}")
+                self._return_slot(None)
+
+    async def _new_context(self) -> BrowserContext:
+        proxy = self.proxy_pool.acquire()
+        try:
+            context = await self.browser.new_context(
+                user_agent=DEFAULT_USER_AGENT,
+                viewport={'width': 1366, 'height': 768},
+                locale='en-US',
+                proxy=proxy.playwright_config() if proxy else None
+            )
+        except Exception:
+            if proxy:
+                self.proxy_pool.release(proxy)
+            raise
+        if proxy:
+            self._proxies[context] = proxy
+        if self.resource_filter:
+            await self.resource_filter.install(context)
+        await context.new_page()
+        self._uses[context] = 0
+        self._generation[context] = self._current_generation
+        return context
+
+    async def _fill_slot(self) -> BrowserContext:
+        """New context for a checked-out slot; the slot goes back empty if that fails"""
+        try:
+            return await self._new_context()
+        except BaseException:
+            self._return_slot(None)
+            raise
+
+    def _return_slot(self, context: Optional[BrowserContext]):
+        if context is None:
+            self._empty_slots += 1
+        self._idle.put_nowait(context)
+
+    async def _take_slot(self) -> Optional[BrowserContext]:
+        context = await self._idle.get()
+        if context is None:
+            self._empty_slots -= 1
+        return context
+
+    async def _discard(self, context: BrowserContext):
+        self._uses.pop(context, None)
+        self._generation.pop(context, None)
+        proxy = self._proxies.pop(context, None)
+        if proxy:
+            self.proxy_pool.release(proxy)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser context: {e}")
+
+    def _is_healthy(self, context: BrowserContext) -> bool:
+        return (
+            self.browser is not None
+            and self.browser.is_connected()
+            and self._generation.get(context) == self._current_generation
+            and bool(context.pages)
+            and not context.pages[0].is_closed()
+            and (context not in self._proxies or self._proxies[context].available(time.monotonic()))
+        )
+
+    def report(self, page: Page, status_code: Optional[int], latency: Optional[float]):
+        """Feed a navigation outcome back to the health score of the page's proxy"""
+        proxy = self._proxies.get(page.context)
+        if proxy:
+            self.proxy_pool.observe(proxy, status_code, latency)
+
+    async def health_check(self) -> bool:
+        """Relaunch the browser if it has crashed or disconnected"""
+        if not self.started:
+            return False
+        if self.browser.is_connected():
+            return True
+        async with self._lock:
+            if not self.browser.is_connected():
+                logger.warning("Browser pool lost its browser, relaunching")
+                self.relaunches += 1
+                # Empty slots are dropped too; the relaunch fills every slot afresh
+                while not self._idle.empty():
+                    context = self._idle.get_nowait()
+                    if context is not None:
+                        await self._discard(context)
+                self._empty_slots = 0
+                # Contexts checked out from the dead browser are dropped on return
+                await self._launch()
+        return self.browser.is_connected()
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.health_interval)
+                await self.health_check()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Browser pool health check failed: {e}")
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a warm page; it is reset and returned to the pool afterwards"""
+        await self.start()
+        await self.health_check()
+
+        context = await self._take_slot()
+        if context is None or not self._is_healthy(context):
+            if context is not None:
+                await self._discard(context)
+            context = await self._fill_slot()
+
+        self.checkouts += 1
+        page = context.pages[0]
+        recycle = False
+        try:
+            yield page
+        except Exception:
+            recycle = page.is_closed()
+            raise
+        finally:
+            stale = self._generation.get(context) != self._current_generation
+            self._uses[context] = self._uses.get(context, 0) + 1
+            if stale:
+                # The relaunch already refilled this slot
+                await self._discard(context)
+            else:
+                if not recycle and self._uses[context] < self.max_uses and self._is_healthy(context):
+                    try:
+                        await page.goto('about:blank')
+                    except Exception:
+                        recycle = True
+                else:
+                    recycle = True
+
+                if recycle:
+                    await self._discard(context)
+                    try:
+                        context = await self._new_context()
+                    except Exception as e:
+                        logger.error(f"Could not replace browser context: {e}")
+                        context = None
+                # An empty slot still goes back, so a waiting checkout can try to fill it
+                self._return_slot(context)
+
+    def stats(self) -> Dict:
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize() - self._empty_slots if self._idle else 0,
+            'empty_slots': self._empty_slots,
+            'checkouts': self.checkouts,
+            'relaunches': self.relaunches,
+            'connected': bool(self.browser and self.browser.is_connected()),
+            'resources': self.resource_filter.stats() if self.resource_filter else None,
+            'proxies': self.proxy_pool.snapshot() if self.proxy_pool.enabled else None,
+        }
+
+    async def close(self):
+        """Close every context, the browser and the Playwright driver"""
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+        self._uses.clear()
+        self._generation.clear()
+        for proxy in self._proxies.values():
+            self.proxy_pool.release(proxy)
+        self._proxies.clear()
+        self._idle = None
+        self._empty_slots = 0
+
+
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide browser pool shared by Playwright scrapers"""
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserPool()
+    return _browser_pool
+
+
+async def close_browser_pool():
+    """Shut down the process-wide browser pool if it was started"""
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
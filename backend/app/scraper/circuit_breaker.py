@@ -0,0 +1,214 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+
+from .rate_limiter import host_of
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("SCRAPE_BREAKER_FAILURES", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("SCRAPE_BREAKER_RESET", "30"))
+BREAKER_MAX_RESET_TIMEOUT = float(os.getenv("SCRAPE_BREAKER_MAX_RESET", "900"))
+# A half-open probe that has not reported back by then is presumed lost and another is admitted
+BREAKER_PROBE_TIMEOUT = float(os.getenv("SCRAPE_BREAKER_PROBE_TIMEOUT", "120"))
+
+# Statuses that mean "back off" rather than "this request failed"
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker; an open breaker rejects calls without waiting"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT,
+                 probe_timeout: float = BREAKER_PROBE_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.probe_timeout = probe_timeout
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def _probe_held(self) -> bool:
+        return self._probing and time.monotonic() - self._probe_started < self.probe_timeout
+
+    def available(self) -> bool:
+        """Whether a call would be let through right now, without claiming the half-open probe"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return time.monotonic() >= self.open_until
+        return not self._probe_held()
+
+    def allow(self) -> bool:
+        """Let a call through; once the open period ends a single probe is admitted"""
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN:
+            if self._probe_held():
+                return False
+            if self._probing:
+                logger.warning(f"Half-open probe lost after {self.probe_timeout:.0f}s, admitting another")
+            self._probing = True
+            self._probe_started = time.monotonic()
+            return True
+        return self.state == CLOSED
+
+    def release(self):
+        """Hand back a claimed probe whose call ended without an outcome, e.g. on cancellation"""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def retry_in(self) -> float:
+        """Seconds until a call would be admitted"""
+        if self.state == OPEN:
+            return max(0.0, self.open_until - time.monotonic())
+        return 0.0
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.reset_timeout = self.base_reset_timeout
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            # The probe failed: stay away twice as long as last time
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self.trip()
+        elif self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, retry_after: Optional[float] = None):
+        """Open now, for Retry-After if the server gave one, else the current reset timeout"""
+        wait = self.reset_timeout if retry_after is None else min(self.max_reset_timeout, retry_after)
+        self.state = OPEN
+        self._probing = False
+        self.open_until = max(self.open_until, time.monotonic() + wait)
+
+    def snapshot(self) -> Dict:
+        return {
+            'state': HALF_OPEN if self.state == OPEN and not self.retry_in() else self.state,
+            'failures': self.failures,
+            'retry_in': round(self.retry_in(), 1),
+        }
+
+
+class CircuitBreakers:
+    """Breakers per host and per (host, endpoint); a call needs both to be closed"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> CircuitBreaker:
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker()
+        return self._breakers[key]
+
+    def _pair(self, url: str, endpoint: str):
+        host = host_of(url)
+        return self._get(host), self._get(f"{host} {endpoint}")
+
+    def available(self, url: str, endpoint: str) -> bool:
+        """Cheap check used for ordering work; does not claim a probe"""
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            return host_breaker.available() and endpoint_breaker.available()
+
+    def allow(self, url: str, endpoint: str) -> bool:
+        """Claim permission for a call; False means skip it immediately"""
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            if not host_breaker.available() or not endpoint_breaker.available():
+                return False
+            return host_breaker.allow() and endpoint_breaker.allow()
+
+    def release(self, url: str, endpoint: str):
+        """Hand back probes claimed by allow() when the call will never call record()"""
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            host_breaker.release()
+            endpoint_breaker.release()
+
+    @contextmanager
+    def claim(self, url: str, endpoint: str) -> Iterator[bool]:
+        """allow() for a block: yields whether to go ahead and releases an unreported probe on exit
+
+        Covers every way out of the block, cancellation and timeouts included, so a lost call
+        cannot leave the circuit half-open with its only probe taken.
+        """
+        allowed = self.allow(url, endpoint)
+        try:
+            yield allowed
+        finally:
+            if allowed:
+                self.release(url, endpoint)
+
+    def retry_in(self, url: str, endpoint: str) -> float:
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            return max(host_breaker.retry_in(), endpoint_breaker.retry_in())
+
+    def record(self, url: str, endpoint: str, status_code: Optional[int], retry_after: Optional[str] = None):
+        """Feed an outcome back; status_code None means the request itself failed"""
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            if status_code in THROTTLE_STATUSES:
+                # The host asked us to back off, so every endpoint on it waits
+                wait = parse_retry_after(retry_after)
+                host_breaker.trip(wait)
+                endpoint_breaker.trip(wait)
+                logger.warning(f"Circuit open for {host_of(url)} ({endpoint}) after {status_code}, "
+                               f"retry in {host_breaker.retry_in():.0f}s")
+            elif status_code is None or status_code >= 500:
+                endpoint_breaker.record_failure()
+                if host_breaker.state == HALF_OPEN:
+                    host_breaker.record_failure()
+            else:
+                host_breaker.record_success()
+                endpoint_breaker.record_success()
+
+    def snapshot(self, url: str, endpoint: str) -> Dict:
+        with self._lock:
+            host_breaker, endpoint_breaker = self._pair(url, endpoint)
+            state = endpoint_breaker.snapshot()
+            state['host'] = host_breaker.snapshot()
+            return state
+
+
+_circuit_breakers = CircuitBreakers()
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """Process-wide breakers so every scraper instance sees the same open circuits"""
+    return _circuit_breakers
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENDPOINT_WINDOW_SECONDS = float(os.getenv("SCRAPE_ENDPOINT_WINDOW", "3600"))
+ENDPOINT_WINDOW_SAMPLES = int(os.getenv("SCRAPE_ENDPOINT_SAMPLES", "200"))
+HEDGE_REQUESTS = os.getenv("SCRAPE_HEDGE_REQUESTS", "1") == "1"
+HEDGE_MAX_IN_FLIGHT = int(os.getenv("SCRAPE_HEDGE_MAX_IN_FLIGHT", "2"))
+HEDGE_MIN_SAMPLES = 5
+
+# Assumed latency for endpoints we have no successful samples for yet
+UNKNOWN_LATENCY = 1.0
+
+
+class EndpointStats:
+    """Success rate and latency of one endpoint over a sliding window"""
+
+    def __init__(self, window_seconds: float = ENDPOINT_WINDOW_SECONDS, max_samples: int = ENDPOINT_WINDOW_SAMPLES):
+        self.window_seconds = window_seconds
+        self.samples: Deque[Tuple[float, bool, float]] = deque(maxlen=max_samples)
+
+    def record(self, ok: bool, latency: float):
+        self.samples.append((time.monotonic(), ok, latency))
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+    @property
+    def success_rate(self) -> float:
+        """Laplace-smoothed success rate, so untried endpoints start at 0.5"""
+        self._prune()
+        successes = sum(1 for _, ok, _ in self.samples if ok)
+        return (successes + 1) / (len(self.samples) + 2)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """Latency percentile of successful responses in the window"""
+        self._prune()
+        latencies = sorted(latency for _, ok, latency in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def expected_cost(self) -> float:
+        """Expected seconds spent per successful response"""
+        latency = self.latency_percentile(0.5) or UNKNOWN_LATENCY
+        return latency / self.success_rate
+
+    def snapshot(self) -> Dict:
+        self._prune()
+        return {
+            'samples': len(self.samples),
+            'success_rate': round(self.success_rate, 3),
+            'p50_latency': self.latency_percentile(0.5),
+            'p90_latency': self.latency_percentile(0.9),
+        }
+
+
+class EndpointTracker:
+    """Ranks endpoints by observed success rate and latency"""
+
+    def __init__(self):
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> EndpointStats:
+        if name not in self._stats:
+            self._stats[name] = EndpointStats()
+        return self._stats[name]
+
+    def record(self, name: str, ok: bool, latency: float):
+        with self._lock:
+            self._get(name).record(ok, latency)
+
+    def rank(self, names: List[str]) -> List[str]:
+        """Order names by expected cost per success; ties keep the given order"""
+        with self._lock:
+            return sorted(names, key=lambda name: self._get(name).expected_cost())
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """p90 latency after which a backup request is worth firing"""
+        with self._lock:
+            stats = self._get(name)
+            if sum(1 for _, ok, _ in stats.samples if ok) < HEDGE_MIN_SAMPLES:
+                return None
+            return stats.latency_percentile(0.9)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+
+def run_hedged(names: List[str], call: Callable[[str], Optional[Dict]], tracker: EndpointTracker,
+               executor: ThreadPoolExecutor, max_in_flight: int = HEDGE_MAX_IN_FLIGHT) -> Optional[Dict]:
+    """Try endpoints in order, firing the next one early if the current one outlasts its p90
+
+    Calls still running when a result comes back cannot be interrupted and finish on the
+    executor after this returns, so call must not touch state the caller gives up on return.
+    """
+    queue = list(names)
+    in_flight: Set[Future] = set()
+    last_name: Optional[str] = None
+
+    try:
+        while queue or in_flight:
+            if queue and not in_flight:
+                last_name = queue.pop(0)
+                in_flight.add(executor.submit(call, last_name))
+
+            delay = tracker.hedge_delay(last_name) if queue and len(in_flight) < max_in_flight else None
+            done, in_flight = wait(in_flight, timeout=delay, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                result = future.result()
+                if result:
+                    return result
+
+            if not done and queue:
+                logger.info(f"Hedging: {last_name} is slower than its p90, also trying {queue[0]}")
+                last_name = queue.pop(0)
+                in_flight.add(executor.submit(call, last_name))
+    finally:
+        # Hedges still waiting for an executor thread never start
+        for future in in_flight:
+            future.cancel()
+
+    return None
+
+
+async def run_hedged_async(names: List[str], call: Callable[[str], Awaitable[Optional[Dict]]],
+                           tracker: EndpointTracker, max_in_flight: int = HEDGE_MAX_IN_FLIGHT) -> Optional[Dict]:
+    """Async counterpart of run_hedged"""
+    queue = list(names)
+    in_flight: Set[asyncio.Task] = set()
+    last_name: Optional[str] = None
+
+    try:
+        while queue or in_flight:
+            if queue and not in_flight:
+                last_name = queue.pop(0)
+                in_flight.add(asyncio.create_task(call(last_name)))
+
+            delay = tracker.hedge_delay(last_name) if queue and len(in_flight) < max_in_flight else None
+            done, in_flight = await asyncio.wait(in_flight, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                result = task.result()
+                if result:
+                    return result
+
+            if not done and queue:
+                logger.info(f"Hedging: {last_name} is slower than its p90, also trying {queue[0]}")
+                last_name = queue.pop(0)
+                in_flight.add(asyncio.create_task(call(last_name)))
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+    return None
+
+
+_endpoint_tracker = EndpointTracker()
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def get_endpoint_tracker() -> EndpointTracker:
+    """Process-wide endpoint tracker so stats survive scraper instances"""
+    return _endpoint_tracker
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Threads used to run hedged blocking requests"""
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='endpoint-hedge')
+        return _hedge_executor
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Older observations fade so the order follows layout changes within a few dozen pages
+EXTRACTOR_STATS_DECAY = float(os.getenv("SCRAPE_EXTRACTOR_DECAY", "0.98"))
+# A strategy hitting less often than this over enough recent attempts counts as dead
+EXTRACTOR_DEAD_HIT_RATE = 0.05
+EXTRACTOR_DEAD_MIN_ATTEMPTS = 5
+# Every this many runs dead strategies keep their place, so one that recovers is noticed
+EXTRACTOR_PROBE_EVERY = int(os.getenv("SCRAPE_EXTRACTOR_PROBE_EVERY", "50"))
+
+# (name, strategy) or (name, strategy, tier); lower tiers return richer records
+Strategy = Union[Tuple[str, Callable[..., Any]], Tuple[str, Callable[..., Any], int]]
+StrategyList = List[Strategy]
+
+
+def _tier(strategy: Strategy) -> int:
+    return strategy[2] if len(strategy) > 2 else 0
+
+
+class StrategyStats:
+    """Exponentially decayed hit rate and cost of one extraction strategy"""
+
+    def __init__(self):
+        self.attempts = 0.0
+        self.hits = 0.0
+        self.cost = 0.0
+
+    def record(self, hit: bool, cost: float):
+        self.attempts = self.attempts * EXTRACTOR_STATS_DECAY + 1
+        self.hits = self.hits * EXTRACTOR_STATS_DECAY + (1 if hit else 0)
+        self.cost = self.cost * EXTRACTOR_STATS_DECAY + cost
+
+    @property
+    def hit_rate(self) -> float:
+        """Laplace-smoothed, so untried strategies start at 0.5"""
+        return (self.hits + 1) / (self.attempts + 2)
+
+    @property
+    def avg_cost(self) -> float:
+        return self.cost / self.attempts if self.attempts else 0.0
+
+    def expected_cost(self) -> float:
+        """Expected seconds spent per successful extraction"""
+        return self.avg_cost / self.hit_rate
+
+    @property
+    def dead(self) -> bool:
+        """Practically never hits lately, e.g. because the page no longer has its block"""
+        return self.attempts >= EXTRACTOR_DEAD_MIN_ATTEMPTS and self.hits < EXTRACTOR_DEAD_HIT_RATE * self.attempts
+
+
+class ExtractorChain:
+    """Runs extraction strategies cheapest-expected-success first, learning from every run
+
+    Cost only orders strategies within a quality tier: a strategy that yields a poorer
+    record is never tried ahead of a richer one because it happens to be cheaper. A dead
+    strategy, whatever its tier, goes behind every live one until a periodic probe run
+    sees it hit again. Strategies are passed on each call so bound methods of short-lived
+    scraper instances can share statistics by name.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._stats: Dict[str, StrategyStats] = {}
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def order(self, strategies: StrategyList) -> StrategyList:
+        """Live strategies before dead ones, then by tier and expected cost per hit; ties keep the given order"""
+        with self._lock:
+            self._runs += 1
+            probe = self._runs % EXTRACTOR_PROBE_EVERY == 0
+            for strategy in strategies:
+                self._stats.setdefault(strategy[0], StrategyStats())
+            return sorted(strategies, key=lambda item: (
+                not probe and self._stats[item[0]].dead, _tier(item), self._stats[item[0]].expected_cost()
+            ))
+
+    def _record(self, name: str, hit: bool, cost: float):
+        with self._lock:
+            self._stats[name].record(hit, cost)
+
+    def run(self, strategies: StrategyList, *args, accept: Callable[[Any], bool] = bool, **kwargs) -> Optional[Any]:
+        """Return the first accepted result, else the first non-empty one, else None"""
+        partial = None
+        for name, strategy, *_ in self.order(strategies):
+            started = time.perf_counter()
+            try:
+                result = strategy(*args, **kwargs)
+            except Exception as e:
+                logger.debug(f"{self.name}: strategy {name} failed: {e}")
+                result = None
+            hit = result is not None and accept(result)
+            self._record(name, hit, time.perf_counter() - started)
+            if hit:
+                return result
+            if partial is None and result:
+                partial = result
+        return partial
+
+    async def run_async(self, strategies: StrategyList, *args, accept: Callable[[Any], bool] = bool, **kwargs) -> Optional[Any]:
+        """Async counterpart of run for coroutine strategies"""
+        partial = None
+        for name, strategy, *_ in self.order(strategies):
+            started = time.perf_counter()
+            try:
+                result = await strategy(*args, **kwargs)
+            except Exception as e:
+                logger.debug(f"{self.name}: strategy {name} failed: {e}")
+                result = None
+            hit = result is not None and accept(result)
+            self._record(name, hit, time.perf_counter() - started)
+            if hit:
+                return result
+            if partial is None and result:
+                partial = result
+        return partial
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    'hit_rate': round(stats.hit_rate, 3),
+                    'avg_cost_ms': round(stats.avg_cost * 1000, 3),
+                    'expected_cost_ms': round(stats.expected_cost() * 1000, 3),
+                    'dead': stats.dead,
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+_chains: Dict[str, ExtractorChain] = {}
+_chains_lock = threading.Lock()
+
+
+def get_extractor_chain(name: str) -> ExtractorChain:
+    """Process-wide chain for name, so statistics outlive scraper instances"""
+    with _chains_lock:
+        if name not in _chains:
+            _chains[name] = ExtractorChain(name)
+        return _chains[name]
+
+
+def extractor_chain_stats() -> Dict[str, Dict]:
+    """Statistics of every chain in this process"""
+    with _chains_lock:
+        chains = list(_chains.values())
+    return {chain.name: chain.stats() for chain in chains}
@@ -0,0 +1,291 @@
+import codecs
+import html as html_lib
+import json
+import logging
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_SCRIPT_OPEN_RE = re.compile(r'<script\b([^>]*)>', re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r'</script\s*>', re.IGNORECASE)
+_META_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+_LD_JSON_TYPE_RE = re.compile(r'type\s*=\s*["\']?application/ld\+json', re.IGNORECASE)
+_HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+_SHARED_DATA_MARKER = 'window._sharedData'
+
+STREAM_CHUNK_SIZE = int(os.getenv("SCRAPE_STREAM_CHUNK_SIZE", str(16 * 1024)))
+# Set SCRAPE_STREAM_PAGES=0 to always download whole pages
+STREAM_PAGES = os.getenv("SCRAPE_STREAM_PAGES", "1") != "0"
+
+# Fields read from inline ProfilePage scripts and the type each value must have
+PROFILE_SCRIPT_FIELDS = {
+    'followers_count': int,
+    'following_count': int,
+    'media_count': int,
+    'full_name': str,
+    'biography': str,
+    'is_verified': bool,
+    'is_private': bool,
+}
+_PROFILE_FIELD_RE = re.compile(
+    r'"(' + '|'.join(PROFILE_SCRIPT_FIELDS) + r')":(?:(\d+)|"([^"]*)"|(true|false))'
+)
+
+_decoder = json.JSONDecoder()
+
+
+def _attrs(tag: str) -> Dict[str, str]:
+    attrs = {}
+    for name, double, single, bare in _ATTR_RE.findall(tag):
+        attrs[name.lower()] = html_lib.unescape(double or single or bare)
+    return attrs
+
+
+def scan_profile_fields(script: str) -> Dict[str, object]:
+    """Single pass over a script for every PROFILE_SCRIPT_FIELDS key; first typed match wins
+
+    Stops as soon as all fields have been found.
+    """
+    found: Dict[str, object] = {}
+    for match in _PROFILE_FIELD_RE.finditer(script):
+        key, number, text, flag = match.groups()
+        if key in found:
+            continue
+        kind = PROFILE_SCRIPT_FIELDS[key]
+        if kind is int and number is not None:
+            found[key] = int(number)
+        elif kind is str and text is not None:
+            found[key] = text
+        elif kind is bool and flag is not None:
+            found[key] = flag == 'true'
+        else:
+            continue
+        if len(found) == len(PROFILE_SCRIPT_FIELDS):
+            break
+    return found
+
+
+class PageExtract:
+    """Locates the _sharedData, ld+json and meta blocks of a profile page by scanning raw text
+
+    BeautifulSoup is only used when a block's marker is present but the scan could not read it.
+    """
+
+    def __init__(self, html: str):
+        self.html = html or ''
+        self._scripts: Optional[List[tuple]] = None
+        self._soup = None
+        self.used_fallback = False
+
+    def _soup_fallback(self):
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+
+            self.used_fallback = True
+            self._soup = BeautifulSoup(self.html, 'html.parser')
+        return self._soup
+
+    def scripts(self) -> List[tuple]:
+        """(attributes, body) for every inline script, in document order"""
+        if self._scripts is None:
+            scripts = []
+            pos = 0
+            while True:
+                opening = _SCRIPT_OPEN_RE.search(self.html, pos)
+                if not opening:
+                    break
+                closing = _SCRIPT_CLOSE_RE.search(self.html, opening.end())
+                if not closing:
+                    break
+                scripts.append((opening.group(1), self.html[opening.end():closing.start()]))
+                pos = closing.end()
+            self._scripts = scripts
+        return self._scripts
+
+    def scripts_containing(self, needle: str) -> List[str]:
+        """Bodies of inline scripts that mention needle"""
+        if needle not in self.html:
+            return []
+        return [body for _, body in self.scripts() if needle in body]
+
+    def shared_data(self) -> Optional[Dict]:
+        """Decoded window._sharedData object, if the page has one"""
+        start = self.html.find(_SHARED_DATA_MARKER)
+        while start != -1:
+            brace = self.html.find('{', start)
+            if brace != -1 and self.html[start + len(_SHARED_DATA_MARKER):brace].strip() == '=':
+                try:
+                    data, _ = _decoder.raw_decode(self.html, brace)
+                    return data
+                except ValueError as e:
+                    logger.debug(f"Could not decode _sharedData: {e}")
+            start = self.html.find(_SHARED_DATA_MARKER, start + 1)
+        return None
+
+    def ld_json(self) -> List[Dict]:
+        """Decoded application/ld+json blocks"""
+        if 'ld+json' not in self.html:
+            return []
+        blocks = []
+        for attrs, body in self.scripts():
+            if _LD_JSON_TYPE_RE.search(attrs):
+                try:
+                    blocks.append(json.loads(body))
+                except ValueError:
+                    continue
+        if not blocks:
+            for script in self._soup_fallback().find_all('script', type='application/ld+json'):
+                try:
+                    blocks.append(json.loads(script.string))
+                except (TypeError, ValueError):
+                    continue
+        return blocks
+
+    def meta(self) -> Dict[str, str]:
+        """Meta tag contents keyed by their property or name attribute"""
+        head_end = _HEAD_END_RE.search(self.html)
+        region = self.html[:head_end.start()] if head_end else self.html
+        meta = {}
+        for tag in _META_RE.findall(region):
+            attrs = _attrs(tag)
+            key = attrs.get('property') or attrs.get('name')
+            if key and 'content' in attrs and key not in meta:
+                meta[key] = attrs['content']
+        if not meta and '<meta' in self.html.lower():
+            for tag in self._soup_fallback().find_all('meta'):
+                key = tag.get('property') or tag.get('name')
+                if key and tag.get('content') is not None and key not in meta:
+                    meta[key] = tag.get('content')
+        return meta
+
+
+class ParsedPage:
+    """PageExtract results computed up front, cheap to pickle back from a parse worker
+
+    Offers the same lookups as PageExtract; scripts_containing only knows the needles
+    asked for when parsing.
+    """
+
+    def __init__(self, shared_data: Optional[Dict], ld_json: List[Dict], meta: Dict[str, str],
+                 scripts: Dict[str, List[str]], used_fallback: bool = False):
+        self._shared_data = shared_data
+        self._ld_json = ld_json
+        self._meta = meta
+        self._scripts = scripts
+        self.used_fallback = used_fallback
+
+    def shared_data(self) -> Optional[Dict]:
+        return self._shared_data
+
+    def ld_json(self) -> List[Dict]:
+        return self._ld_json
+
+    def meta(self) -> Dict[str, str]:
+        return self._meta
+
+    def scripts_containing(self, needle: str) -> List[str]:
+        return self._scripts.get(needle, [])
+
+
+def parse_page(html: str, needles: tuple = ('ProfilePage',)) -> ParsedPage:
+    """Every block the profile extractors read, for running in a parse worker"""
+    page = PageExtract(html)
+    return ParsedPage(
+        page.shared_data(),
+        page.ld_json(),
+        page.meta(),
+        {needle: page.scripts_containing(needle) for needle in needles},
+        page.used_fallback,
+    )
+
+
+def page_shared_data(html: str) -> Optional[Dict]:
+    """Decoded window._sharedData of a page, for running in a parse worker"""
+    return PageExtract(html).shared_data()
+
+
+class StreamingPageReader:
+    """Collects a page chunk by chunk and says when the rest of the body is not needed
+
+    Once </head> has arrived, is_complete is asked whether the head alone already
+    carries everything the caller needs. If not, reading goes on until the script
+    holding body_marker has closed, or to the end of the page if it never appears.
+    """
+
+    def __init__(self, is_complete: Callable[[PageExtract], bool],
+                 body_marker: Optional[str] = _SHARED_DATA_MARKER):
+        self.is_complete = is_complete
+        self.body_marker = body_marker
+        self.bytes_read = 0
+        self.stopped_early = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._parts: List[str] = []
+        # Text still being scanned for a stopping point; None once there is none left to find
+        self._scan: Optional[str] = ''
+        self._scanned = 0
+        self._head_done = False
+        self._marker_at = -1
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk; True means stop reading"""
+        self.bytes_read += len(chunk)
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        if self._scan is None:
+            return False
+        self._scan += text
+        if not self._head_done and not self._check_head():
+            return self.stopped_early
+        return self._check_body()
+
+    def _check_head(self) -> bool:
+        """True once </head> has been seen; sets stopped_early if the head is enough"""
+        # Only rescan the new text plus enough overlap for a split closing tag
+        head_end = _HEAD_END_RE.search(self._scan, max(0, self._scanned - 8))
+        if not head_end:
+            self._scanned = len(self._scan)
+            return False
+        self._head_done = True
+        self._scanned = head_end.end()
+        try:
+            self.stopped_early = bool(self.is_complete(PageExtract(self._scan[:head_end.end()])))
+        except Exception as e:
+            logger.debug(f"Streaming completeness check failed: {e}")
+        if self.stopped_early or not self.body_marker:
+            self._scan = None
+            return False
+        return True
+
+    def _check_body(self) -> bool:
+        """Stop at the </script> closing the first body script with the marker"""
+        if self._marker_at < 0:
+            at = self._scan.find(self.body_marker, max(self._scanned - len(self.body_marker), 0))
+            if at < 0:
+                self._scanned = len(self._scan)
+                return False
+            self._marker_at = self._scanned = at
+        closing = _SCRIPT_CLOSE_RE.search(self._scan, max(self._marker_at, self._scanned - 9))
+        if not closing:
+            self._scanned = len(self._scan)
+            return False
+        self._scan = None
+        self.stopped_early = True
+        return True
+
+    def html(self) -> str:
+        """Everything received so far"""
+        return ''.join(self._parts) + self._decoder.decode(b'', final=True)
+
+
+def read_stream(chunks, reader: StreamingPageReader) -> str:
+    """Feed an iterable of byte chunks into reader until it has enough; returns the page text"""
+    for chunk in chunks:
+        if reader.feed(chunk):
+            break
+    if reader.stopped_early:
+        logger.debug(f"Stopped streaming after {reader.bytes_read} bytes")
+    return reader.html()
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_BACKEND = os.getenv("SCRAPE_HTTP_CACHE", "disk").lower()
+HTTP_CACHE_PATH = os.getenv("SCRAPE_HTTP_CACHE_PATH", os.path.join(".cache", "http_cache.sqlite3"))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_HTTP_CACHE_MAX_ENTRIES", "10000"))
+HTTP_CACHE_TTL = int(os.getenv("SCRAPE_HTTP_CACHE_TTL", str(7 * 24 * 3600)))
+# Reads only note their access time; it reaches disk with the next write or after this many reads
+HTTP_CACHE_TOUCH_BATCH = 100
+
+
+class SQLiteCacheStore:
+    """Bounded on-disk store; least recently used entries are evicted first"""
+
+    blocking = True
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS http_cache_accessed ON http_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM http_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= HTTP_CACHE_TOUCH_BATCH:
+                self._flush_touched()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def _flush_touched(self):
+        self._conn.executemany(
+            "UPDATE http_cache SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._touched.items()]
+        )
+        self._touched.clear()
+
+    def set(self, key: str, entry: Dict):
+        with self._lock:
+            # Eviction below must see recent reads
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, value, accessed_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM http_cache WHERE key IN ("
+                "SELECT key FROM http_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+
+class RedisCacheStore:
+    """Redis store shared across workers; entries expire after the TTL"""
+
+    blocking = True
+
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = HTTP_CACHE_TTL):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.client.get(f"httpcache:{key}")
+        return json.loads(value) if value else None
+
+    def set(self, key: str, entry: Dict):
+        self.client.set(f"httpcache:{key}", json.dumps(entry), ex=self.ttl)
+
+
+class HTTPCache:
+    """ETag/Last-Modified validators plus the profile extracted from the cached body"""
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, url: str) -> Optional[Dict]:
+        if self.store is None:
+            return None
+        try:
+            return self.store.get(url)
+        except Exception as e:
+            logger.warning(f"HTTP cache read failed for {url}: {e}")
+            return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously seen URL"""
+        entry = self._get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url: str) -> Optional[Dict]:
+        """Profile extracted last time, to use when the server answers 304"""
+        entry = self._get(url)
+        if entry and entry.get('profile'):
+            self.hits += 1
+            logger.info(f"HTTP cache: {url} not modified, reusing extracted profile")
+            return dict(entry['profile'])
+        self.misses += 1
+        return None
+
+    def store_response(self, url: str, headers: Mapping[str, str], profile: Optional[Dict]):
+        """Remember validators and the extracted profile for a 200 response"""
+        if self.store is None or not profile:
+            return
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        try:
+            self.store.set(url, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'profile': profile,
+                'stored_at': time.time(),
+            })
+        except Exception as e:
+            logger.warning(f"HTTP cache write failed for {url}: {e}")
+
+    async def _run_async(self, method, *args):
+        # Disk and Redis stores do blocking I/O, which belongs off the event loop
+        if self.store is not None and self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def conditional_headers_async(self, url: str) -> Dict[str, str]:
+        """conditional_headers for coroutines"""
+        return await self._run_async(self.conditional_headers, url)
+
+    async def not_modified_async(self, url: str) -> Optional[Dict]:
+        """not_modified for coroutines"""
+        return await self._run_async(self.not_modified, url)
+
+    async def store_response_async(self, url: str, headers: Mapping[str, str], profile: Optional[Dict]):
+        """store_response for coroutines"""
+        await self._run_async(self.store_response, url, headers, profile)
+
+
+_http_cache: Optional[HTTPCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Process-wide HTTP cache configured from the environment"""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            store = None
+            try:
+                if HTTP_CACHE_BACKEND == "redis":
+                    store = RedisCacheStore()
+                elif HTTP_CACHE_BACKEND == "disk":
+                    store = SQLiteCacheStore()
+            except Exception as e:
+                logger.warning(f"HTTP cache unavailable, continuing without it: {e}")
+            _http_cache = HTTPCache(store)
+        return _http_cache
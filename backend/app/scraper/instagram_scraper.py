@@ -1,10 +1,13 @@
-import asyncio
-import random
-import time
 from typing import Dict, Optional, List
 from playwright.async_api import async_playwright, Browser, Page
 from fake_useragent import UserAgent
 import logging
+from .rate_limiter import get_rate_limiter
+from .html_extract import page_shared_data
+from .parse_executor import get_parse_executor
+from .extractor_chain import get_extractor_chain
+from .negative_cache import NOT_FOUND, PRIVATE, classify_response, get_negative_cache
+from .response_capture import CAPTURE_RESPONSES, ENGAGEMENT_POSTS, ResponseCapture
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,8 +16,9 @@ class InstagramScraper:
     def __init__(self):
         self.browser: Optional[Browser] = None
         self.user_agent = UserAgent()
-        self.delay_min = 2
-        self.delay_max = 5
+        self.rate_limiter = get_rate_limiter()
+        self.extractor_chain = get_extractor_chain('dom')
+        self.negative_cache = get_negative_cache()
         
     async def __aenter__(self):
         self.playwright = await async_playwright().start()
@@ -38,11 +42,6 @@ class InstagramScraper:
             await self.browser.close()
         await self.playwright.stop()
     
-    async def _random_delay(self):
-        """Random delay between requests"""
-        delay = random.uniform(self.delay_min, self.delay_max)
-        await asyncio.sleep(delay)
-    
     async def _create_page(self) -> Page:
         """Create a new page with anti-detection measures"""
         context = await self.browser.new_context(
@@ -75,24 +74,52 @@ class InstagramScraper:
     
     async def scrape_profile(self, username: str) -> Optional[Dict]:
         """Scrape Instagram profile data"""
+        # Private and missing profiles are remembered, so skip them without a page load
+        if await self.negative_cache.lookup_async(username):
+            return None
+        
         try:
-            await self._random_delay()
+            profile_url = f"https://www.instagram.com/{username}/"
+            await self.rate_limiter.acquire_async(profile_url, 'browser')
             
             page = await self._create_page()
+            # The page fetches the profile and its posts as JSON; listen before navigating
+            capture = ResponseCapture(username).attach(page)
             
             # Navigate to profile
-            profile_url = f"https://www.instagram.com/{username}/"
             logger.info(f"Scraping profile: {profile_url}")
             
-            await page.goto(profile_url, wait_until='networkidle', timeout=30000)
+            wait_until = 'domcontentloaded' if CAPTURE_RESPONSES else 'networkidle'
+            response = await page.goto(profile_url, wait_until=wait_until, timeout=30000)
+            outcome = classify_response(response.status if response else 200, page.url)
+            if outcome:
+                logger.warning(f"Profile {username} is {outcome}")
+                await self.negative_cache.record_async(username, outcome)
+                await page.close()
+                return None
+            
+            if CAPTURE_RESPONSES and await capture.wait():
+                profile_data = capture.profile()
+                await page.close()
+                if profile_data['is_private']:
+                    logger.warning(f"Profile {username} is private")
+                    await self.negative_cache.record_async(username, PRIVATE)
+                    return None
+                logger.info(f"Captured {username} from {capture.responses} JSON responses: "
+                            f"{profile_data['followers_count']} followers, {len(capture.posts)} posts")
+                await self.negative_cache.record_result_async(username, profile_data)
+                return profile_data
             
-            # Check if profile exists and is public
+            # No usable JSON: fall back to the rendered page
+            if CAPTURE_RESPONSES:
+                await page.wait_for_load_state('networkidle')
             await page.wait_for_timeout(3000)
             
             # Check for private account
             private_indicator = await page.query_selector('text="This Account is Private"')
             if private_indicator:
                 logger.warning(f"Profile {username} is private")
+                await self.negative_cache.record_async(username, PRIVATE)
                 await page.close()
                 return None
             
@@ -100,11 +127,13 @@ class InstagramScraper:
             not_found = await page.query_selector('text="Sorry, this page isn\'t available."')
             if not_found:
                 logger.warning(f"Profile {username} not found")
+                await self.negative_cache.record_async(username, NOT_FOUND)
                 await page.close()
                 return None
             
             # Extract profile data
-            profile_data = await self._extract_profile_data(page, username)
+            profile_data = await self._extract_profile_data(page, capture, username)
+            await self.negative_cache.record_result_async(username, profile_data)
             
             await page.close()
             return profile_data
@@ -113,8 +142,66 @@ class InstagramScraper:
             logger.error(f"Error scraping profile {username}: {str(e)}")
             return None
     
-    async def _extract_profile_data(self, page: Page, username: str) -> Dict:
+    async def _extract_profile_data(self, page: Page, capture: ResponseCapture, username: str) -> Dict:
         """Extract profile data from the page"""
+        profile_data = await self.extractor_chain.run_async([
+            ('page_json', self._extract_from_page_json),
+            ('dom', self._extract_from_dom),
+        ], page, capture, username, accept=lambda profile: profile['followers_count'] > 0)
+        
+        if profile_data:
+            logger.info(f"Successfully scraped {username}: {profile_data['followers_count']} followers")
+            return profile_data
+        
+        return {
+            'username': username,
+            'profile_name': None,
+            'followers_count': 0,
+            'following_count': 0,
+            'posts_count': 0,
+            'engagement_rate': 0.0,
+            'bio': "",
+            'profile_pic_url': "",
+            'is_verified': 0,
+            'is_private': 0
+        }
+    
+    async def _extract_from_page_json(self, page: Page, capture: ResponseCapture, username: str) -> Optional[Dict]:
+        """Extractor strategy: window._sharedData embedded in the page"""
+        data = await get_parse_executor().run(page_shared_data, await page.content())
+        if not data:
+            return None
+        try:
+            user = data['entry_data']['ProfilePage'][0]['graphql']['user']
+        except (KeyError, IndexError, TypeError):
+            return None
+        
+        followers = user.get('edge_followed_by', {}).get('count', 0)
+        media = user.get('edge_owner_to_timeline_media', {})
+        engagement_rate = 0.0
+        recent_posts = [edge.get('node', {}) for edge in media.get('edges', [])[:9]]
+        if recent_posts and followers > 0:
+            total_engagement = sum(
+                node.get('edge_liked_by', {}).get('count', 0) + node.get('edge_media_to_comment', {}).get('count', 0)
+                for node in recent_posts
+            )
+            engagement_rate = (total_engagement / len(recent_posts) / followers) * 100
+        
+        return {
+            'username': username,
+            'profile_name': user.get('full_name', ''),
+            'followers_count': followers,
+            'following_count': user.get('edge_follow', {}).get('count', 0),
+            'posts_count': media.get('count', 0),
+            'engagement_rate': round(engagement_rate, 2),
+            'bio': user.get('biography', ''),
+            'profile_pic_url': user.get('profile_pic_url_hd', '') or user.get('profile_pic_url', ''),
+            'is_verified': 1 if user.get('is_verified') else 0,
+            'is_private': 1 if user.get('is_private') else 0
+        }
+    
+    async def _extract_from_dom(self, page: Page, capture: ResponseCapture, username: str) -> Optional[Dict]:
+        """Extractor strategy: rendered profile header and recent posts"""
         try:
             # Wait for profile elements to load
             await page.wait_for_selector('article', timeout=10000)
@@ -137,15 +224,13 @@ class InstagramScraper:
             verified_element = await page.query_selector('svg[aria-label="Verified"]')
             is_verified = 1 if verified_element else 0
             
-            # Calculate engagement rate (simplified)
+            # Engagement from post data the page fetched as JSON, instead of opening each post
             engagement_rate = 0.0
-            if stats['posts_count'] > 0 and stats['followers_count'] > 0:
-                # Get recent posts for engagement calculation
-                recent_posts = await self._get_recent_posts_engagement(page)
-                if recent_posts:
-                    total_engagement = sum(post['likes'] + post['comments'] for post in recent_posts)
-                    avg_engagement = total_engagement / len(recent_posts)
-                    engagement_rate = (avg_engagement / stats['followers_count']) * 100
+            recent_posts = sorted(capture.posts.values(), key=lambda post: post['taken_at'], reverse=True)[:ENGAGEMENT_POSTS]
+            if recent_posts and stats['followers_count'] > 0:
+                total_engagement = sum(post['likes'] + post['comments'] for post in recent_posts)
+                avg_engagement = total_engagement / len(recent_posts)
+                engagement_rate = (avg_engagement / stats['followers_count']) * 100
             
             profile_data = {
                 'username': username,
@@ -160,23 +245,11 @@ class InstagramScraper:
                 'is_private': 0
             }
             
-            logger.info(f"Successfully scraped {username}: {stats['followers_count']} followers")
             return profile_data
             
         except Exception as e:
             logger.error(f"Error extracting profile data for {username}: {str(e)}")
-            return {
-                'username': username,
-                'profile_name': None,
-                'followers_count': 0,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': "",
-                'profile_pic_url': "",
-                'is_verified': 0,
-                'is_private': 0
-            }
+            return None
     
     async def _extract_text(self, page: Page, selector: str) -> Optional[str]:
         """Extract text from element"""
@@ -220,49 +293,6 @@ class InstagramScraper:
         
         return stats
     
-    async def _get_recent_posts_engagement(self, page: Page, limit: int = 9) -> List[Dict]:
-        """Get engagement data from recent posts"""
-        posts = []
-        try:
-            # Find post elements
-            post_elements = await page.query_selector_all('article div[role="button"]')
-            
-            for i, post_element in enumerate(post_elements[:limit]):
-                try:
-                    # Click on post to open it
-                    await post_element.click()
-                    await page.wait_for_timeout(1000)
-                    
-                    # Extract likes and comments
-                    likes_element = await page.query_selector('section span[aria-label*="like"]')
-                    comments_element = await page.query_selector('section span[aria-label*="comment"]')
-                    
-                    likes = 0
-                    comments = 0
-                    
-                    if likes_element:
-                        likes_text = await likes_element.inner_text()
-                        likes = self._parse_count(likes_text)
-                    
-                    if comments_element:
-                        comments_text = await comments_element.inner_text()
-                        comments = self._parse_count(comments_text)
-                    
-                    posts.append({'likes': likes, 'comments': comments})
-                    
-                    # Close the post
-                    await page.keyboard.press('Escape')
-                    await page.wait_for_timeout(500)
-                    
-                except Exception as e:
-                    logger.error(f"Error extracting post {i}: {str(e)}")
-                    continue
-            
-        except Exception as e:
-            logger.error(f"Error getting recent posts: {str(e)}")
-        
-        return posts
-    
     def _parse_count(self, text: str) -> int:
         """Parse count text (e.g., '1.2M' -> 1200000)"""
         if not text:
@@ -291,7 +321,6 @@ class InstagramScraper:
                 profile_data = await self.scrape_profile(username)
                 if profile_data:
                     results.append(profile_data)
-                await self._random_delay()
             except Exception as e:
                 logger.error(f"Error scraping {username}: {str(e)}")
                 continue
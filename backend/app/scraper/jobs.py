@@ -0,0 +1,360 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .scraper_pool import SCRAPER_POOL_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Usernames scraped at once across all jobs; matching the scraper pool avoids checkout waits
+JOB_WORKERS = int(os.getenv("SCRAPE_JOB_WORKERS", str(SCRAPER_POOL_SIZE)))
+# How long finished jobs stay queryable
+JOB_TTL = float(os.getenv("SCRAPE_JOB_TTL", "3600"))
+# local runs jobs on threads in the API process; celery hands them to the worker tier
+JOB_BACKEND = os.getenv("SCRAPE_JOB_BACKEND", "local").lower()
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+COMPLETED = 'completed'
+
+# Per-username work: returns a JSON-able result or raises with a message for the client
+JobWork = Callable[[str], Dict]
+# Hands one username of a job to the worker tier
+JobDispatch = Callable[[str, str], None]
+
+
+class ScrapeJob:
+    """One batch of usernames and the outcome of each"""
+
+    def __init__(self, usernames: List[str]):
+        self.id = uuid.uuid4().hex
+        self.usernames = usernames
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.items: Dict[str, Dict] = {username: {'status': QUEUED} for username in usernames}
+        self.done = 0
+        self.failed = 0
+
+    @property
+    def status(self) -> str:
+        if self.done == len(self.usernames):
+            return COMPLETED
+        if self.done or any(item['status'] == RUNNING for item in self.items.values()):
+            return RUNNING
+        return QUEUED
+
+    def snapshot(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'total': len(self.usernames),
+            'completed': self.done,
+            'failed': self.failed,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'items': {username: dict(item) for username, item in self.items.items()},
+        }
+
+
+class JobManager:
+    """Runs scrape jobs on a bounded worker pool and streams per-username progress
+
+    Request handlers only create jobs and read state, so they return immediately however
+    many scrapes are queued. Subscribers get events on their own event loop.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, ttl: float = JOB_TTL):
+        self.workers = max(1, workers)
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scrape-job')
+        self._jobs: Dict[str, ScrapeJob] = {}
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self.queued = 0
+
+    def submit(self, usernames: List[str], work: JobWork) -> ScrapeJob:
+        """Queue a job; its usernames start as workers free up"""
+        job = ScrapeJob(list(dict.fromkeys(usernames)))
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+            self.queued += len(job.usernames)
+        for username in job.usernames:
+            self._executor.submit(self._run_one, job, username, work)
+        logger.info(f"Job {job.id} queued with {len(job.usernames)} usernames")
+        return job
+
+    def _run_one(self, job: ScrapeJob, username: str, work: JobWork):
+        with self._lock:
+            self.queued -= 1
+            job.items[username] = {'status': RUNNING}
+        self._publish(job, {'type': 'progress', 'username': username, 'status': RUNNING})
+
+        started = time.monotonic()
+        try:
+            item = {'status': SUCCEEDED, 'result': work(username)}
+        except Exception as e:
+            logger.warning(f"Job {job.id}: {username} failed: {e}")
+            item = {'status': FAILED, 'error': str(e)}
+        item['seconds'] = round(time.monotonic() - started, 2)
+
+        with self._lock:
+            job.items[username] = item
+            job.done += 1
+            job.failed += 1 if item['status'] == FAILED else 0
+            final = None
+            if job.done == len(job.usernames):
+                job.finished_at = time.time()
+                final = job.snapshot()
+        self._publish(job, {'type': 'progress', 'username': username, **item})
+        if final:
+            self._publish(job, {'type': COMPLETED, **final})
+
+    def _publish(self, job: ScrapeJob, event: Dict):
+        event = {'job_id': job.id, 'completed': job.done, 'total': len(job.usernames), **event}
+        with self._lock:
+            subscribers = list(self._subscribers.get(job.id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(job.id, queue)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at and job.finished_at < cutoff and job_id not in self._subscribers]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    async def snapshot_async(self, job_id: str) -> Optional[Dict]:
+        """snapshot for coroutines; in-process state needs no thread"""
+        return self.snapshot(job_id)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Queue receiving the job's events on the calling event loop"""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = [entry for entry in self._subscribers.get(job_id, []) if entry[1] is not queue]
+            if subscribers:
+                self._subscribers[job_id] = subscribers
+            else:
+                self._subscribers.pop(job_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job.finished_at is None)
+            return {'backend': 'local', 'workers': self.workers, 'jobs': len(self._jobs),
+                    'active_jobs': active, 'queued_usernames': self.queued}
+
+
+class RedisJobStore:
+    """Job state in Redis, written by scrape workers on any node and read by the API
+
+    Progress events go out on a pub/sub channel per job. A username is counted once even
+    when a redelivered task finishes it again.
+    """
+
+    # KEYS: items, meta, finished set; ARGV: username, item JSON, failed flag
+    _FINISH_SCRIPT = """
+        if redis.call('SADD', KEYS[3], ARGV[1]) == 0 then return -1 end
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+        if ARGV[3] == '1' then redis.call('HINCRBY', KEYS[2], 'failed', 1) end
+        return redis.call('HINCRBY', KEYS[2], 'done', 1)
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl: float = JOB_TTL, client=None):
+        import redis
+
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.client = client or redis.Redis.from_url(self.redis_url)
+        self.client.ping()
+        self.ttl = int(ttl)
+        self._finish = self.client.register_script(self._FINISH_SCRIPT)
+
+    def _keys(self, job_id: str) -> Tuple[str, str, str]:
+        return f"scrape:job:{job_id}:items", f"scrape:job:{job_id}", f"scrape:job:{job_id}:finished"
+
+    def channel(self, job_id: str) -> str:
+        return f"scrape:job:{job_id}:events"
+
+    def create(self, job: ScrapeJob):
+        items, meta, finished = self._keys(job.id)
+        pipe = self.client.pipeline()
+        pipe.hset(meta, mapping={'usernames': json.dumps(job.usernames), 'created_at': job.created_at,
+                                 'done': 0, 'failed': 0})
+        pipe.hset(items, mapping={username: json.dumps({'status': QUEUED}) for username in job.usernames})
+        # Unfinished jobs outlive a worker backlog; finishing resets the clock to the TTL
+        for key in (items, meta, finished):
+            pipe.expire(key, self.ttl * 24)
+        pipe.execute()
+
+    def _publish(self, job_id: str, event: Dict):
+        self.client.publish(self.channel(job_id), json.dumps({'job_id': job_id, **event}))
+
+    def start(self, job_id: str, username: str):
+        items, meta, finished = self._keys(job_id)
+        if self.client.sismember(finished, username):
+            return
+        self.client.hset(items, username, json.dumps({'status': RUNNING}))
+        done, total = self._progress(job_id)
+        self._publish(job_id, {'type': 'progress', 'username': username, 'status': RUNNING,
+                               'completed': done, 'total': total})
+
+    def finish(self, job_id: str, username: str, item: Dict):
+        items, meta, finished = self._keys(job_id)
+        done = self._finish(keys=[items, meta, finished],
+                            args=[username, json.dumps(item), '1' if item['status'] == FAILED else '0'])
+        if done < 0:
+            return
+        total = len(json.loads(self.client.hget(meta, 'usernames') or '[]'))
+        self._publish(job_id, {'type': 'progress', 'username': username, **item, 'completed': done, 'total': total})
+        if done == total:
+            self.client.hset(meta, 'finished_at', time.time())
+            for key in (items, meta, finished):
+                self.client.expire(key, self.ttl)
+            self._publish(job_id, {'type': COMPLETED, **self.snapshot(job_id)})
+
+    def _progress(self, job_id: str) -> Tuple[int, int]:
+        usernames, done = self.client.hmget(self._keys(job_id)[1], 'usernames', 'done')
+        return int(done or 0), len(json.loads(usernames or '[]'))
+
+    def snapshot(self, job_id: str) -> Optional[Dict]:
+        items, meta, _ = self._keys(job_id)
+        fields = {key.decode(): value.decode() for key, value in self.client.hgetall(meta).items()}
+        if not fields:
+            return None
+        usernames = json.loads(fields['usernames'])
+        stored = {key.decode(): json.loads(value) for key, value in self.client.hgetall(items).items()}
+        done, total = int(fields.get('done', 0)), len(usernames)
+        if done == total:
+            status = COMPLETED
+        elif done or any(item['status'] == RUNNING for item in stored.values()):
+            status = RUNNING
+        else:
+            status = QUEUED
+        return {
+            'job_id': job_id,
+            'status': status,
+            'total': total,
+            'completed': done,
+            'failed': int(fields.get('failed', 0)),
+            'created_at': float(fields['created_at']),
+            'finished_at': float(fields['finished_at']) if 'finished_at' in fields else None,
+            'items': {username: stored.get(username, {'status': QUEUED}) for username in usernames},
+        }
+
+
+class DistributedJobManager:
+    """JobManager interface over a RedisJobStore; the worker tier does the scraping
+
+    dispatch hands each (job id, username) to the task queue, where workers run the same
+    per-username work the local manager would and report through the store.
+    """
+
+    def __init__(self, store: RedisJobStore, dispatch: JobDispatch):
+        self.store = store
+        self.dispatch = dispatch
+        self._relays: Dict[int, asyncio.Task] = {}
+
+    def submit(self, usernames: List[str], work: Optional[JobWork] = None) -> ScrapeJob:
+        """Record the job and queue its usernames; work is ignored, workers bring their own"""
+        job = ScrapeJob(list(dict.fromkeys(usernames)))
+        self.store.create(job)
+        for username in job.usernames:
+            self.dispatch(job.id, username)
+        logger.info(f"Job {job.id} dispatched with {len(job.usernames)} usernames")
+        return job
+
+    def snapshot(self, job_id: str) -> Optional[Dict]:
+        return self.store.snapshot(job_id)
+
+    async def snapshot_async(self, job_id: str) -> Optional[Dict]:
+        """snapshot for coroutines; the Redis round-trips run on a worker thread"""
+        return await asyncio.to_thread(self.store.snapshot, job_id)
+
+    async def _relay(self, job_id: str, queue: asyncio.Queue):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.store.redis_url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(self.store.channel(job_id))
+            # A job that finished before the subscription took hold would never announce it
+            snapshot = await asyncio.to_thread(self.store.snapshot, job_id)
+            if snapshot and snapshot['status'] == COMPLETED:
+                queue.put_nowait({'type': COMPLETED, **snapshot})
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    queue.put_nowait(json.loads(message['data']))
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Queue receiving the job's events, relayed from Redis pub/sub on the calling loop"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._relays[id(queue)] = asyncio.get_running_loop().create_task(self._relay(job_id, queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        task = self._relays.pop(id(queue), None)
+        if task:
+            task.cancel()
+
+    def stats(self) -> Dict:
+        return {'backend': 'celery', 'subscribers': len(self._relays)}
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager(dispatch: Optional[JobDispatch] = None):
+    """Process-wide job manager; SCRAPE_JOB_BACKEND=celery sends usernames to dispatch"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            if JOB_BACKEND == "celery" and dispatch is not None:
+                try:
+                    _job_manager = DistributedJobManager(RedisJobStore(), dispatch)
+                except Exception as e:
+                    logger.warning(f"Redis job store unavailable, running jobs in-process: {e}")
+            if _job_manager is None:
+                _job_manager = JobManager()
+        return _job_manager
+
+
+_job_store: Optional[RedisJobStore] = None
+
+
+def get_job_store() -> RedisJobStore:
+    """Process-wide Redis job store, for workers reporting progress"""
+    global _job_store
+    with _job_manager_lock:
+        if _job_store is None:
+            _job_store = RedisJobStore()
+        return _job_store
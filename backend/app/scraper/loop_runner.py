@@ -0,0 +1,104 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How long a blocking caller waits for its coroutine before giving up on it
+SYNC_CALL_TIMEOUT = float(os.getenv("SCRAPE_SYNC_TIMEOUT", "300"))
+SHUTDOWN_TIMEOUT = 30.0
+
+
+class BackgroundLoop:
+    """One event loop on a daemon thread that sync code submits coroutines to
+
+    Loop-bound resources (Playwright, browser pools, async clients) created on it live as
+    long as the process instead of one asyncio.run per call.
+    """
+
+    def __init__(self, name: str = 'scraper-loop'):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable]] = []
+        self.calls = 0
+
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if needed (idempotent)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                logger.info(f"Background event loop {self.name} started")
+            return self.loop
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def on_shutdown(self, hook: Callable[[], Awaitable]):
+        """Coroutine function awaited on the loop before it stops"""
+        self._shutdown_hooks.append(hook)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = SYNC_CALL_TIMEOUT) -> Any:
+        """Block until coro finishes on the background loop and return its result"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}: blocking call from inside its own loop would deadlock")
+        future = asyncio.run_coroutine_threadsafe(coro, self.start())
+        self.calls += 1
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Run the shutdown hooks on the loop, then stop it and join the thread"""
+        with self._lock:
+            thread, loop = self._thread, self.loop
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+
+        async def _shutdown():
+            for hook in reversed(self._shutdown_hooks):
+                try:
+                    await hook()
+                except Exception as e:
+                    logger.error(f"{self.name} shutdown hook failed: {e}")
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(SHUTDOWN_TIMEOUT)
+        except Exception as e:
+            logger.error(f"{self.name} did not shut down cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(SHUTDOWN_TIMEOUT)
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Process-wide background loop, stopped at interpreter exit"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+            atexit.register(_background_loop.stop)
+        return _background_loop
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = 'not_found'
+PRIVATE = 'private'
+BLOCKED = 'blocked'
+
+# Base TTL per outcome class, in seconds; doubled on every repeat miss
+DEFAULT_TTLS = {
+    NOT_FOUND: int(os.getenv("SCRAPE_NEGATIVE_TTL_NOT_FOUND", str(6 * 3600))),
+    PRIVATE: int(os.getenv("SCRAPE_NEGATIVE_TTL_PRIVATE", "3600")),
+    BLOCKED: int(os.getenv("SCRAPE_NEGATIVE_TTL_BLOCKED", "300")),
+}
+NEGATIVE_TTL_MAX = int(os.getenv("SCRAPE_NEGATIVE_TTL_MAX", str(7 * 24 * 3600)))
+
+_LOGIN_PATH = '/accounts/login'
+
+
+def classify_response(status_code: int, final_url: str = '') -> Optional[str]:
+    """Outcome class implied by a profile page response, or None if it is not negative"""
+    if status_code == 404:
+        return NOT_FOUND
+    # 429s are throttling of the whole host and are handled by the circuit breakers
+    if status_code in (401, 403) or _LOGIN_PATH in (final_url or ''):
+        return BLOCKED
+    return None
+
+
+class InMemoryNegativeBackend:
+    """Negative entries held in this process"""
+
+    blocking = False
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+        self._strikes: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            expires_at, entry = self._entries.get(username, (0.0, None))
+            if entry is not None and expires_at <= time.time():
+                del self._entries[username]
+                return None
+            return entry
+
+    def set(self, username: str, entry: Dict, ttl: int):
+        with self._lock:
+            self._entries[username] = (time.time() + ttl, entry)
+
+    def delete(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+            for key in [key for key in self._strikes if key[0] == username]:
+                del self._strikes[key]
+
+    def strike(self, username: str, outcome: str, window: int) -> int:
+        """Count a miss; the count resets once window seconds pass without one"""
+        with self._lock:
+            now = time.time()
+            count, last = self._strikes.get((username, outcome), (0, now))
+            count = count + 1 if now - last < window else 1
+            self._strikes[(username, outcome)] = (count, now)
+            return count
+
+
+class RedisNegativeBackend:
+    """Negative entries in Redis so every worker skips the same profiles"""
+
+    blocking = True
+
+    def __init__(self, redis_url: Optional[str] = None):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.client.ping()
+
+    def get(self, username: str) -> Optional[Dict]:
+        value = self.client.get(f"negcache:{username}")
+        return json.loads(value) if value else None
+
+    def set(self, username: str, entry: Dict, ttl: int):
+        self.client.set(f"negcache:{username}", json.dumps(entry), ex=ttl)
+
+    def delete(self, username: str):
+        keys = [f"negcache:{username}"] + [f"negcache:strikes:{username}:{outcome}" for outcome in DEFAULT_TTLS]
+        self.client.delete(*keys)
+
+    def strike(self, username: str, outcome: str, window: int) -> int:
+        key = f"negcache:strikes:{username}:{outcome}"
+        pipe = self.client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, window)
+        count, _ = pipe.execute()
+        return int(count)
+
+
+class NegativeCache:
+    """Remembers profiles that were missing, private or blocked so polls skip the network"""
+
+    def __init__(self, backend=None, ttls: Optional[Dict[str, int]] = None, max_ttl: int = NEGATIVE_TTL_MAX):
+        self.backend = backend or InMemoryNegativeBackend()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_ttl = max_ttl
+        self.hits = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return username.strip().lower()
+
+    def lookup(self, username: str) -> Optional[Dict]:
+        """Active entry ({'outcome', 'strikes', 'expires_at', 'payload'}) for username, if any"""
+        try:
+            entry = self.backend.get(self._key(username))
+        except Exception as e:
+            logger.warning(f"Negative cache read failed for {username}: {e}")
+            return None
+        if entry:
+            self.hits += 1
+            logger.info(f"Negative cache: {username} is {entry['outcome']} (strike {entry['strikes']})")
+        return entry
+
+    def record(self, username: str, outcome: str, payload: Optional[Dict] = None) -> int:
+        """Cache a negative outcome; returns the TTL it was given"""
+        key = self._key(username)
+        try:
+            strikes = self.backend.strike(key, outcome, self.max_ttl)
+            ttl = min(self.max_ttl, self.ttls[outcome] * 2 ** (strikes - 1))
+            self.backend.set(key, {
+                'outcome': outcome,
+                'strikes': strikes,
+                'expires_at': time.time() + ttl,
+                'payload': payload,
+            }, ttl)
+            return ttl
+        except Exception as e:
+            logger.warning(f"Negative cache write failed for {username}: {e}")
+            return 0
+
+    def clear(self, username: str):
+        """Forget a profile after a successful scrape"""
+        try:
+            self.backend.delete(self._key(username))
+        except Exception as e:
+            logger.warning(f"Negative cache clear failed for {username}: {e}")
+
+    def record_result(self, username: str, profile: Optional[Dict]):
+        """Cache private profiles with their data as payload; clear everything else"""
+        if not profile:
+            return
+        if profile.get('is_private'):
+            self.record(username, PRIVATE, payload=profile)
+        else:
+            self.clear(username)
+
+    async def _run_async(self, method, *args):
+        # A shared backend makes network round-trips, which belong off the event loop
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def lookup_async(self, username: str) -> Optional[Dict]:
+        """lookup for coroutines"""
+        return await self._run_async(self.lookup, username)
+
+    async def record_async(self, username: str, outcome: str, payload: Optional[Dict] = None) -> int:
+        """record for coroutines"""
+        return await self._run_async(self.record, username, outcome, payload)
+
+    async def record_result_async(self, username: str, profile: Optional[Dict]):
+        """record_result for coroutines"""
+        await self._run_async(self.record_result, username, profile)
+
+
+_negative_cache: Optional[NegativeCache] = None
+_negative_cache_lock = threading.Lock()
+
+
+def get_negative_cache() -> NegativeCache:
+    """Process-wide negative cache configured from the environment"""
+    global _negative_cache
+    with _negative_cache_lock:
+        if _negative_cache is None:
+            backend = None
+            if os.getenv("SCRAPE_NEGATIVE_CACHE_BACKEND", "memory").lower() == "redis":
+                try:
+                    backend = RedisNegativeBackend()
+                except Exception as e:
+                    logger.warning(f"Redis negative cache unavailable, using in-process entries: {e}")
+            _negative_cache = NegativeCache(backend=backend)
+        return _negative_cache
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Free-threaded builds (python3.13t and later) parse in parallel on plain threads
+GIL_DISABLED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+# auto, process, thread or inline; auto picks threads without a GIL or a second core, processes otherwise
+PARSE_EXECUTOR = os.getenv("SCRAPE_PARSE_EXECUTOR", "auto")
+PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Parses submitted but not finished; further submitters wait for a slot
+PARSE_QUEUE_DEPTH = int(os.getenv("SCRAPE_PARSE_QUEUE_DEPTH", str(PARSE_WORKERS * 4)))
+# spawn keeps workers clear of the server's threads and sockets
+PARSE_START_METHOD = os.getenv("SCRAPE_PARSE_START_METHOD", "spawn")
+
+_SLOT_POLL_INTERVAL = 0.005
+
+
+def _timed(fn: Callable, args: Tuple) -> Tuple[Any, float]:
+    """Run fn in the worker and report how long it took there"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def resolve_mode(mode: str = PARSE_EXECUTOR) -> str:
+    if mode == 'auto':
+        # One core gains nothing from processes but still pays for pickling pages across
+        return 'thread' if GIL_DISABLED or (os.cpu_count() or 1) < 2 else 'process'
+    if mode not in ('process', 'thread', 'inline'):
+        logger.warning(f"Unknown parse executor '{mode}', parsing inline")
+        return 'inline'
+    return mode
+
+
+class ParseExecutor:
+    """Runs CPU-bound page parsing off the event loop with a bounded number of parses in flight
+
+    Functions and arguments must be picklable in process mode: module-level functions over
+    plain strings, returning plain data.
+    """
+
+    def __init__(self, mode: str = PARSE_EXECUTOR, workers: int = PARSE_WORKERS,
+                 queue_depth: int = PARSE_QUEUE_DEPTH):
+        self.mode = resolve_mode(mode)
+        self.workers = max(1, workers)
+        self.queue_depth = max(1, queue_depth)
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'jobs': 0,
+            'failures': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0,
+            'queue_waits': 0,
+            'queue_wait_seconds': 0.0,
+            'worker_seconds': 0.0,
+            'loop_seconds': 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='parse')
+                logger.info(f"Started {self.mode} parse executor with {self.workers} workers")
+            return self._executor
+
+    def _reset_executor(self, executor: Executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    async def _acquire_slot(self):
+        # Polling keeps the slot count valid across the separate loops sync wrappers run
+        if self._slots.acquire(blocking=False):
+            return
+        started = time.perf_counter()
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(_SLOT_POLL_INTERVAL)
+        with self._lock:
+            self._stats['queue_waits'] += 1
+            self._stats['queue_wait_seconds'] += time.perf_counter() - started
+
+    def _record(self, loop_seconds: float, worker_seconds: float, failed: bool = False):
+        with self._lock:
+            self._stats['jobs'] += 1
+            self._stats['failures'] += 1 if failed else 0
+            self._stats['loop_seconds'] += loop_seconds
+            self._stats['worker_seconds'] += worker_seconds
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Result of fn(*args), computed in a worker once a queue slot is free"""
+        if self.mode == 'inline':
+            result, elapsed = _timed(fn, args)
+            self._record(elapsed, 0.0)
+            return result
+
+        await self._acquire_slot()
+        with self._lock:
+            self._stats['in_flight'] += 1
+            self._stats['peak_in_flight'] = max(self._stats['peak_in_flight'], self._stats['in_flight'])
+        executor = self._get_executor()
+        try:
+            submitted = time.perf_counter()
+            future = asyncio.get_running_loop().run_in_executor(executor, _timed, fn, args)
+            loop_seconds = time.perf_counter() - submitted
+            try:
+                result, worker_seconds = await future
+            except BrokenProcessPool:
+                # A worker died (OOM, segfault in a parser); the next call gets a fresh pool
+                logger.error("Parse worker pool broke, restarting it")
+                self._reset_executor(executor)
+                self._record(loop_seconds, 0.0, failed=True)
+                raise
+            except Exception:
+                self._record(loop_seconds, 0.0, failed=True)
+                raise
+            self._record(loop_seconds, worker_seconds)
+            return result
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict:
+        """Counters plus the event-loop time saved by parsing elsewhere"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['mode'] = self.mode
+        stats['workers'] = self.workers
+        stats['queue_depth'] = self.queue_depth
+        stats['loop_seconds_saved'] = max(0.0, stats['worker_seconds'] - stats['loop_seconds'])
+        for key in ('queue_wait_seconds', 'worker_seconds', 'loop_seconds', 'loop_seconds_saved'):
+            stats[key] = round(stats[key], 4)
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_parse_executor: Optional[ParseExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def get_parse_executor() -> ParseExecutor:
+    """Process-wide parse executor; workers start on first use"""
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = ParseExecutor()
+        return _parse_executor
+
+
+def shutdown_parse_executor():
+    global _parse_executor
+    with _parse_executor_lock:
+        executor, _parse_executor = _parse_executor, None
+    if executor:
+        executor.shutdown()
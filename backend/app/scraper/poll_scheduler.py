@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bounds on how often one profile is polled, however active or dormant it looks
+POLL_MIN_INTERVAL = float(os.getenv("SCRAPE_POLL_MIN_INTERVAL", os.getenv("POLL_INTERVAL", "60")))
+POLL_MAX_INTERVAL = float(os.getenv("SCRAPE_POLL_MAX_INTERVAL", "3600"))
+# Most profiles scraped per cycle, most-likely-changed first; 0 scrapes every due profile
+POLL_BUDGET = int(os.getenv("SCRAPE_POLL_BUDGET", "0"))
+# A profile falls due once it has changed since its last check with this probability
+POLL_TARGET_PROBABILITY = float(os.getenv("SCRAPE_POLL_TARGET_PROBABILITY", "0.5"))
+# Observations lose half their weight over this many seconds, so the rate follows the account
+POLL_HALF_LIFE = float(os.getenv("SCRAPE_POLL_HALF_LIFE", "86400"))
+
+
+def new_state() -> Dict:
+    return {
+        'changes': 0.0,
+        'exposure': 0.0,
+        'last_checked': None,
+        'next_due': 0.0,
+        'checks': 0,
+        'changed_checks': 0,
+    }
+
+
+class InMemoryPollBackend:
+    """Per-profile polling state in this process"""
+
+    blocking = False
+
+    def __init__(self):
+        self._states: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, usernames: List[str]) -> Dict[str, Dict]:
+        with self._lock:
+            return {username: dict(self._states[username]) for username in usernames if username in self._states}
+
+    def put(self, username: str, state: Dict):
+        with self._lock:
+            self._states[username] = dict(state)
+
+
+class RedisPollBackend:
+    """Per-profile polling state in a Redis hash, so learned rates survive restarts"""
+
+    blocking = True
+
+    def __init__(self, redis_url: Optional[str] = None, key: str = "scrape:poll"):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.client.ping()
+        self.key = key
+
+    def get_many(self, usernames: List[str]) -> Dict[str, Dict]:
+        if not usernames:
+            return {}
+        values = self.client.hmget(self.key, usernames)
+        return {username: json.loads(value) for username, value in zip(usernames, values) if value}
+
+    def put(self, username: str, state: Dict):
+        self.client.hset(self.key, username, json.dumps(state))
+
+
+class PollScheduler:
+    """Decides which profiles a polling cycle scrapes, from each profile's observed change rate
+
+    Changes are treated as a Poisson process whose rate is estimated from decayed counts of
+    checks that saw a change over the time they covered. A profile is due once the chance it
+    changed since its last check reaches the target probability, clamped to [min_interval,
+    max_interval]; when more are due than the budget allows, the likeliest to have changed go first.
+    """
+
+    def __init__(self, backend=None, min_interval: float = POLL_MIN_INTERVAL,
+                 max_interval: float = POLL_MAX_INTERVAL, budget: int = POLL_BUDGET,
+                 target_probability: float = POLL_TARGET_PROBABILITY, half_life: float = POLL_HALF_LIFE):
+        self.backend = backend or InMemoryPollBackend()
+        self.min_interval = max(1.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.budget = max(0, budget)
+        self.target_probability = min(0.99, max(0.01, target_probability))
+        self.half_life = max(1.0, half_life)
+        self._lock = threading.Lock()
+        self._stats = {'cycles': 0, 'selected': 0, 'deferred': 0, 'not_due': 0}
+
+    def rate(self, state: Dict) -> float:
+        """Estimated changes per second; one prior change per min_interval keeps new profiles on a short leash"""
+        return (state['changes'] + 1.0) / (state['exposure'] + self.min_interval)
+
+    def change_probability(self, state: Dict, now: float) -> float:
+        """Chance the profile changed since it was last checked"""
+        if state['last_checked'] is None:
+            return 1.0
+        return 1.0 - math.exp(-self.rate(state) * max(0.0, now - state['last_checked']))
+
+    def interval(self, state: Dict) -> float:
+        """Seconds from one check until the next is due"""
+        interval = -math.log(1.0 - self.target_probability) / self.rate(state)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _states(self, usernames: List[str]) -> Dict[str, Dict]:
+        try:
+            states = self.backend.get_many(usernames)
+        except Exception as e:
+            logger.warning(f"Could not read polling state, polling every profile: {e}")
+            states = {}
+        return {username: states.get(username) or new_state() for username in usernames}
+
+    def _put(self, username: str, state: Dict):
+        try:
+            self.backend.put(username, state)
+        except Exception as e:
+            logger.warning(f"Could not store polling state for {username}: {e}")
+
+    def select(self, usernames: List[str], now: Optional[float] = None) -> List[str]:
+        """Usernames to scrape this cycle"""
+        now = time.time() if now is None else now
+        states = self._states(usernames)
+        due = [username for username in usernames if states[username]['next_due'] <= now]
+
+        def priority(username: str):
+            state = states[username]
+            # Profiles past the max interval first, so the budget cannot starve a quiet account forever
+            overdue = state['last_checked'] is None or now - state['last_checked'] >= self.max_interval
+            return overdue, self.change_probability(state, now)
+
+        due.sort(key=priority, reverse=True)
+        selected = due[:self.budget] if self.budget else due
+        with self._lock:
+            self._stats['cycles'] += 1
+            self._stats['selected'] += len(selected)
+            self._stats['deferred'] += len(due) - len(selected)
+            self._stats['not_due'] += len(usernames) - len(due)
+        return selected
+
+    def observe(self, username: str, changed: bool, now: Optional[float] = None) -> float:
+        """Learn from one successful check; returns seconds until the profile is next due"""
+        now = time.time() if now is None else now
+        state = self._states([username])[username]
+        if state['last_checked'] is not None:
+            # The first check has nothing to compare against and teaches nothing
+            elapsed = max(0.0, now - state['last_checked'])
+            decay = 0.5 ** (elapsed / self.half_life)
+            state['changes'] = state['changes'] * decay + (1.0 if changed else 0.0)
+            state['exposure'] = state['exposure'] * decay + elapsed
+            state['changed_checks'] += 1 if changed else 0
+        state['checks'] += 1
+        state['last_checked'] = now
+        interval = self.interval(state)
+        state['next_due'] = now + interval
+        self._put(username, state)
+        return interval
+
+    def postpone(self, username: str, now: Optional[float] = None):
+        """Push a failed check back by min_interval without learning from it; retries happen elsewhere"""
+        now = time.time() if now is None else now
+        state = self._states([username])[username]
+        state['next_due'] = now + self.min_interval
+        self._put(username, state)
+
+    def stats(self, usernames: List[str], now: Optional[float] = None) -> Dict:
+        """Counters plus each profile's learned interval and change probability"""
+        now = time.time() if now is None else now
+        with self._lock:
+            stats = dict(self._stats)
+        stats['budget'] = self.budget
+        stats['min_interval'] = self.min_interval
+        stats['max_interval'] = self.max_interval
+        stats['profiles'] = {
+            username: {
+                'checks': state['checks'],
+                'changed_checks': state['changed_checks'],
+                'interval': round(self.interval(state), 1),
+                'change_probability': round(self.change_probability(state, now), 3),
+                'due_in': round(max(0.0, state['next_due'] - now), 1),
+            }
+            for username, state in self._states(usernames).items()
+        }
+        return stats
+
+    async def _run_async(self, method, *args):
+        # A shared backend makes network round-trips, which belong off the event loop
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def select_async(self, usernames: List[str]) -> List[str]:
+        """select for coroutines"""
+        return await self._run_async(self.select, usernames)
+
+    async def observe_async(self, username: str, changed: bool) -> float:
+        """observe for coroutines"""
+        return await self._run_async(self.observe, username, changed)
+
+    async def postpone_async(self, username: str):
+        """postpone for coroutines"""
+        await self._run_async(self.postpone, username)
+
+    async def stats_async(self, usernames: List[str]) -> Dict:
+        """stats for coroutines"""
+        return await self._run_async(self.stats, usernames)
+
+
+_poll_scheduler: Optional[PollScheduler] = None
+_poll_scheduler_lock = threading.Lock()
+
+
+def get_poll_scheduler() -> PollScheduler:
+    """Process-wide poll scheduler configured from the environment"""
+    global _poll_scheduler
+    with _poll_scheduler_lock:
+        if _poll_scheduler is None:
+            backend = None
+            if os.getenv("SCRAPE_POLL_BACKEND", "memory").lower() == "redis":
+                try:
+                    backend = RedisPollBackend()
+                except Exception as e:
+                    logger.warning(f"Redis polling state unavailable, keeping it in-process: {e}")
+            _poll_scheduler = PollScheduler(backend=backend)
+        return _poll_scheduler
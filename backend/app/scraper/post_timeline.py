@@ -0,0 +1,181 @@
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from fake_useragent import UserAgent
+
+from .rate_limiter import get_rate_limiter
+from .circuit_breaker import get_circuit_breakers
+from .proxy_pool import get_proxy_pool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIMELINE_PAGE_SIZE = int(os.getenv("SCRAPE_TIMELINE_PAGE_SIZE", "12"))
+# Pages a catch-up run may walk before giving up on reaching the checkpoint
+TIMELINE_MAX_PAGES = int(os.getenv("SCRAPE_TIMELINE_MAX_PAGES", "5"))
+# Older pages a backfill run walks at most
+TIMELINE_BACKFILL_PAGES = int(os.getenv("SCRAPE_TIMELINE_BACKFILL_PAGES", "3"))
+
+PROFILE_INFO_URL = "https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
+USER_FEED_URL = "https://i.instagram.com/api/v1/feed/user/{user_id}/"
+
+POST_TYPES = {1: 'image', 2: 'video', 8: 'carousel', 'GraphImage': 'image', 'GraphVideo': 'video',
+              'GraphSidecar': 'carousel'}
+
+# (posts newest first, cursor for the next older page or None at the end)
+TimelinePage = Tuple[List[Dict], Optional[str]]
+
+
+class TimelineUnavailable(Exception):
+    """A timeline page could not be fetched (blocked, circuit open or a bad response)"""
+
+
+def normalize_post(node: Dict) -> Optional[Dict]:
+    """One post from a GraphQL edge node or a v1 feed item, None if it is not a post"""
+    shortcode = node.get('shortcode') or node.get('code')
+    if not shortcode:
+        return None
+
+    if 'edge_liked_by' in node or 'edge_media_preview_like' in node:
+        caption_edges = node.get('edge_media_to_caption', {}).get('edges', [])
+        return {
+            'shortcode': shortcode,
+            'url': f"https://www.instagram.com/p/{shortcode}/",
+            'caption': caption_edges[0]['node'].get('text') if caption_edges else None,
+            'likes': (node.get('edge_liked_by') or node.get('edge_media_preview_like') or {}).get('count', 0),
+            'comments': node.get('edge_media_to_comment', {}).get('count', 0),
+            'views': node.get('video_view_count') or 0,
+            'taken_at': node.get('taken_at_timestamp') or 0,
+            'post_type': POST_TYPES.get(node.get('__typename')),
+            'pinned': bool(node.get('pinned_for_users')),
+        }
+
+    caption = node.get('caption') or {}
+    return {
+        'shortcode': shortcode,
+        'url': f"https://www.instagram.com/p/{shortcode}/",
+        'caption': caption.get('text') if isinstance(caption, dict) else None,
+        'likes': node.get('like_count', 0),
+        'comments': node.get('comment_count', 0),
+        'views': node.get('play_count') or node.get('view_count') or 0,
+        'taken_at': node.get('taken_at') or 0,
+        'post_type': POST_TYPES.get(node.get('media_type')),
+        'pinned': bool(node.get('timeline_pinned_user_ids')),
+    }
+
+
+def _normalize_all(nodes: List[Dict]) -> List[Dict]:
+    posts = [normalize_post(node) for node in nodes]
+    return [post for post in posts if post]
+
+
+def collect_new_posts(first_page: TimelinePage, fetch_older: Callable[[str], TimelinePage],
+                      newest_shortcode: Optional[str], newest_taken_at: int = 0,
+                      max_pages: int = TIMELINE_MAX_PAGES) -> TimelinePage:
+    """Posts newer than the checkpoint, newest first, walking older pages only until it is reached
+
+    Without a checkpoint only the first page is taken. Pinned posts lead the timeline out of
+    date order, so they never end the walk. The returned cursor points past the oldest page read.
+    """
+    posts, cursor = first_page
+    new_posts: List[Dict] = []
+    pages = 1
+    while True:
+        for post in posts:
+            seen = post['shortcode'] == newest_shortcode or (newest_taken_at and post['taken_at'] <= newest_taken_at)
+            if post['pinned']:
+                if not seen:
+                    new_posts.append(post)
+                continue
+            if seen:
+                return new_posts, cursor
+            new_posts.append(post)
+        if newest_shortcode is None or not cursor or pages >= max_pages:
+            if newest_shortcode is not None and cursor:
+                logger.warning(f"Checkpoint not reached after {pages} pages, a gap may remain")
+            return new_posts, cursor
+        posts, cursor = fetch_older(cursor)
+        pages += 1
+
+
+def backfill_posts(fetch_older: Callable[[str], TimelinePage], cursor: Optional[str],
+                   max_pages: int = TIMELINE_BACKFILL_PAGES) -> TimelinePage:
+    """Walk up to max_pages older pages from cursor; the returned cursor is None once history ends
+
+    A page that cannot be fetched ends the walk early and its cursor is returned to resume from.
+    """
+    posts: List[Dict] = []
+    for _ in range(max_pages):
+        if not cursor:
+            break
+        try:
+            page, next_cursor = fetch_older(cursor)
+        except TimelineUnavailable as e:
+            logger.warning(f"Backfill stopped early: {e}")
+            break
+        posts.extend(page)
+        cursor = next_cursor
+    return posts, cursor
+
+
+class PostTimelineClient:
+    """Fetches profile timelines page by page through the shared politeness machinery"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.ua = UserAgent()
+        self.rate_limiter = get_rate_limiter()
+        self.breakers = get_circuit_breakers()
+        self.proxy_pool = get_proxy_pool()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'User-Agent': self.ua.random,
+            'Accept': 'application/json',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'X-IG-App-ID': '936619743392459',
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+
+    def _get_json(self, url: str, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        with self.breakers.claim(url, endpoint) as allowed:
+            if not allowed:
+                raise TimelineUnavailable(f"circuit open for {endpoint}")
+            self.rate_limiter.acquire(url, 'api')
+            try:
+                response = self.proxy_pool.get(self.session, url, headers=self._headers(), params=params, timeout=15)
+            except Exception as e:
+                self.breakers.record(url, endpoint, None)
+                raise TimelineUnavailable(f"{url}: {e}")
+            self.breakers.record(url, endpoint, response.status_code, response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            raise TimelineUnavailable(f"{url}: HTTP {response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            raise TimelineUnavailable(f"{url}: response is not JSON")
+
+    def first_page(self, username: str, user_id: Optional[str] = None) -> Tuple[Optional[str], TimelinePage]:
+        """(user id, newest page), user id None if there is no such profile
+
+        Only the feed is paged, so its max_id cursors stay valid across runs; a known user
+        id skips the profile lookup.
+        """
+        if not user_id:
+            data = self._get_json(PROFILE_INFO_URL.format(username=username), 'timeline_profile')
+            user = (data.get('data') or {}).get('user')
+            if not user or not user.get('id'):
+                return None, ([], None)
+            user_id = str(user['id'])
+        return user_id, self.page(user_id, None)
+
+    def page(self, user_id: str, cursor: Optional[str]) -> TimelinePage:
+        """One feed page, older than cursor when given"""
+        params = {'count': TIMELINE_PAGE_SIZE}
+        if cursor:
+            params['max_id'] = cursor
+        data = self._get_json(USER_FEED_URL.format(user_id=user_id), 'timeline_feed', params)
+        next_cursor = data.get('next_max_id') if data.get('more_available') else None
+        return _normalize_all(data.get('items', [])), next_cursor
@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional, Set
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# Built indexes live outside the package so read-only installs still work
+CATALOG_INDEX_DIR = os.getenv("SCRAPE_CATALOG_INDEX_DIR", os.path.join(tempfile.gettempdir(), 'profile-catalog'))
+
+GRAM_SIZE = 3
+_BUILD_BATCH = 10000
+# Bound parameters per IN (...) query; SQLite builds before 3.32 allow at most 999
+_QUERY_BATCH = 500
+
+
+def normalize_username(username: str) -> str:
+    """Lowercase with the separators people drop or add when typing a handle"""
+    return username.strip().lower().replace(' ', '').replace('_', '').replace('.', '')
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def build_index(source: str, target: str) -> int:
+    """Build the SQLite index for a JSONL catalog; returns the number of profiles
+
+    Entries keep their file order as rank, which decides between several fuzzy matches.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, building = tempfile.mkstemp(suffix='.building', dir=os.path.dirname(target))
+    os.close(fd)
+    db = sqlite3.connect(building)
+    try:
+        db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -65536;
+            CREATE TABLE profiles (rank INTEGER PRIMARY KEY, key TEXT NOT NULL, normalized TEXT NOT NULL, data TEXT NOT NULL);
+            CREATE TABLE grams (gram TEXT NOT NULL, rank INTEGER NOT NULL, PRIMARY KEY (gram, rank)) WITHOUT ROWID;
+            CREATE TEMP TABLE gram_staging (gram TEXT NOT NULL, rank INTEGER NOT NULL);
+        """)
+        count = 0
+        profiles, grams = [], []
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = entry['username'].lower()
+                profiles.append((count, key, normalize_username(key), line.strip()))
+                grams.extend((gram, count) for gram in _grams(key))
+                count += 1
+                if len(profiles) >= _BUILD_BATCH:
+                    db.executemany("INSERT INTO profiles VALUES (?, ?, ?, ?)", profiles)
+                    db.executemany("INSERT INTO gram_staging VALUES (?, ?)", grams)
+                    profiles, grams = [], []
+        db.executemany("INSERT INTO profiles VALUES (?, ?, ?, ?)", profiles)
+        db.executemany("INSERT INTO gram_staging VALUES (?, ?)", grams)
+        # Sorted inserts and late indexes are much cheaper than maintaining B-trees row by row
+        db.executescript("""
+            INSERT INTO grams SELECT gram, rank FROM gram_staging ORDER BY gram, rank;
+            DROP TABLE gram_staging;
+            CREATE INDEX profiles_key ON profiles (key);
+            CREATE INDEX profiles_normalized ON profiles (normalized, rank);
+        """)
+        db.commit()
+    finally:
+        db.close()
+    os.replace(building, target)
+    return count
+
+
+class ProfileCatalog:
+    """Fallback profile data on disk, indexed by exact key, normalized key and trigrams
+
+    Nothing is read until the first lookup, and lookups touch only the rows they need,
+    so catalog size does not show up in import time or memory.
+    """
+
+    def __init__(self, source: str, index_path: Optional[str] = None):
+        self.source = source
+        name = os.path.splitext(os.path.basename(source))[0]
+        self.index_path = index_path or os.path.join(CATALOG_INDEX_DIR, f"{name}.sqlite3")
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        self._ready = False
+        self._max_key_length: Optional[int] = None
+
+    def _ensure_index(self):
+        if self._ready:
+            return
+        with self._build_lock:
+            if self._ready:
+                return
+            stale = (not os.path.exists(self.index_path)
+                     or os.path.getmtime(self.index_path) < os.path.getmtime(self.source))
+            if stale:
+                count = build_index(self.source, self.index_path)
+                logger.info(f"Built profile catalog index {self.index_path} ({count} profiles)")
+            self._ready = True
+
+    def _db(self) -> sqlite3.Connection:
+        self._ensure_index()
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            # One read-only connection per thread; sqlite3 connections are not shareable
+            db = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            self._local.db = db
+        return db
+
+    def get(self, username: str) -> Optional[Dict]:
+        """Exact (case-insensitive) match"""
+        row = self._db().execute(
+            "SELECT data FROM profiles WHERE key = ? ORDER BY rank LIMIT 1", (username.strip().lower(),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_normalized(self, username: str) -> Optional[Dict]:
+        """Match ignoring case, spaces, underscores and dots"""
+        row = self._db().execute(
+            "SELECT data FROM profiles WHERE normalized = ? ORDER BY rank LIMIT 1", (normalize_username(username),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _containing(self, text: str) -> Iterator[int]:
+        """Ranks of keys containing text, in rank order (text needs at least GRAM_SIZE chars)"""
+        grams = sorted(_grams(text))
+        placeholders = ','.join('?' * len(grams))
+        cursor = self._db().execute(
+            f"SELECT rank FROM grams WHERE gram IN ({placeholders}) "
+            f"GROUP BY rank HAVING COUNT(*) = ? ORDER BY rank",
+            (*grams, len(grams)),
+        )
+        for (rank,) in cursor:
+            yield rank
+
+    def max_key_length(self) -> int:
+        if self._max_key_length is None:
+            self._max_key_length = self._db().execute("SELECT COALESCE(MAX(LENGTH(key)), 0) FROM profiles").fetchone()[0]
+        return self._max_key_length
+
+    def search(self, username: str) -> Optional[Dict]:
+        """Best fallback for username: exact, then normalized, then substring either way
+
+        Substring matching follows the old in-code lookup: the normalized name inside a known
+        key, or a known key inside the normalized name. The earliest catalog entry wins.
+        """
+        try:
+            return self._search(username)
+        except sqlite3.Error as e:
+            logger.warning(f"Profile catalog search for {username!r} failed: {e}")
+            return None
+
+    def _search(self, username: str) -> Optional[Dict]:
+        profile = self.get(username) or self.get_normalized(username)
+        if profile:
+            return profile
+
+        normalized = normalize_username(username)
+        if not normalized:
+            return None
+        db = self._db()
+        best: Optional[int] = None
+        longest = self.max_key_length()
+
+        # Known keys inside the name: substrings no longer than the longest key are candidates,
+        # at most len × longest of them, looked up in bounded batches
+        pieces = sorted({normalized[i:j] for i in range(len(normalized))
+                         for j in range(i + 1, min(len(normalized), i + longest) + 1)})
+        for start in range(0, len(pieces), _QUERY_BATCH):
+            batch = pieces[start:start + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            row = db.execute(f"SELECT MIN(rank) FROM profiles WHERE key IN ({placeholders})", batch).fetchone()
+            if row and row[0] is not None and (best is None or row[0] < best):
+                best = row[0]
+
+        # The name inside known keys: trigram postings narrow it down, then confirm
+        if GRAM_SIZE <= len(normalized) <= longest:
+            for rank in self._containing(normalized):
+                if best is not None and rank >= best:
+                    break
+                (key,) = db.execute("SELECT key FROM profiles WHERE rank = ?", (rank,)).fetchone()
+                if normalized in key:
+                    best = rank
+                    break
+
+        if best is None:
+            return None
+        (data,) = db.execute("SELECT data FROM profiles WHERE rank = ?", (best,)).fetchone()
+        return json.loads(data)
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+
+_catalogs: Dict[str, ProfileCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_profile_catalog(name: str) -> ProfileCatalog:
+    """Process-wide catalog for data/<name>.jsonl, indexed on first use"""
+    with _catalogs_lock:
+        if name not in _catalogs:
+            _catalogs[name] = ProfileCatalog(os.path.join(CATALOG_DATA_DIR, f"{name}.jsonl"))
+        return _catalogs[name]
+
+
+if __name__ == '__main__':
+    # Prebuild every catalog index, e.g. at image build time
+    for filename in sorted(os.listdir(CATALOG_DATA_DIR)):
+        if filename.endswith('.jsonl'):
+            catalog = get_profile_catalog(filename[:-len('.jsonl')])
+            catalog._ensure_index()
+            print(f"{catalog.source}: {len(catalog)} profiles -> {catalog.index_path}")
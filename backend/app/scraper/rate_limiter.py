@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Endpoint classes share one bucket per host: (tokens per second, burst capacity)
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    'web': (0.3, 3),
+    'api': (0.5, 5),
+    'browser': (0.3, 2),
+}
+
+
+def _parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse SCRAPE_RATE_LIMITS, e.g. "web=0.3/3,api=0.5/5" """
+    limits = dict(DEFAULT_LIMITS)
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, value = item.split('=', 1)
+        rate, _, burst = value.partition('/')
+        try:
+            rate, burst = float(rate), float(burst or 1)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit spec: {item}")
+            continue
+        # reserve divides by the rate, and a bucket without capacity never holds a token
+        if not rate > 0 or not burst > 0:
+            logger.warning(f"Ignoring rate limit spec without a positive rate and burst: {item}")
+            continue
+        limits[name.strip()] = (rate, burst)
+    return limits
+
+
+def host_of(url: str) -> str:
+    """Return the host of a URL, or the value itself if it is already a host"""
+    return urlparse(url).netloc if '://' in url else url
+
+
+class InMemoryBucketBackend:
+    """Token buckets held in this process"""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate) - 1
+            self._buckets[key] = (tokens, now)
+        return 0.0 if tokens >= 0 else -tokens / rate
+
+
+class RedisBucketBackend:
+    """Token buckets in Redis so several processes share one request budget"""
+
+    blocking = True
+
+    # Tokens may go negative: the deficit is the caller's place in line
+    _SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    if tokens >= 0 then return '0' end
+    return tostring(-tokens / rate)
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self._script = self.client.register_script(self._SCRIPT)
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        return float(self._script(keys=[key], args=[rate, capacity]))
+
+
+class RateLimiter:
+    """Token-bucket rate limiter keyed by host and endpoint class"""
+
+    def __init__(self, backend=None, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.backend = backend or InMemoryBucketBackend()
+        self.limits = limits or dict(DEFAULT_LIMITS)
+
+    def _bucket(self, url: str, endpoint_class: str) -> Tuple[str, float, float]:
+        rate, capacity = self.limits.get(endpoint_class, self.limits['web'])
+        return f"ratelimit:{host_of(url)}:{endpoint_class}", rate, capacity
+
+    def reserve(self, url: str, endpoint_class: str = 'web') -> float:
+        """Reserve a request slot and return the wait before it may be used"""
+        key, rate, capacity = self._bucket(url, endpoint_class)
+        try:
+            return self.backend.reserve(key, rate, capacity)
+        except Exception as e:
+            # Never let a limiter outage stop scraping; fall back to the bucket's pace
+            logger.warning(f"Rate limiter backend failed for {key}: {e}")
+            return 1.0 / rate
+
+    def acquire(self, url: str, endpoint_class: str = 'web'):
+        """Block until a request to this host and endpoint class is allowed"""
+        wait = self.reserve(url, endpoint_class)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str, endpoint_class: str = 'web'):
+        """Wait without blocking the event loop until a request is allowed"""
+        if self.backend.blocking:
+            wait = await asyncio.to_thread(self.reserve, url, endpoint_class)
+        else:
+            wait = self.reserve(url, endpoint_class)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter configured from the environment"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            limits = _parse_limits(os.getenv("SCRAPE_RATE_LIMITS", ""))
+            backend = None
+            if os.getenv("SCRAPE_RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+                try:
+                    backend = RedisBucketBackend()
+                except Exception as e:
+                    logger.warning(f"Redis rate limiter unavailable, using in-process buckets: {e}")
+            _rate_limiter = RateLimiter(backend=backend, limits=limits)
+        return _rate_limiter
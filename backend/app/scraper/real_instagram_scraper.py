@@ -1,10 +1,21 @@
 import requests
-import time
-import random
 import re
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
 from fake_useragent import UserAgent
 import logging
+from .async_engine import AsyncScrapeEngine, DEFAULT_CONCURRENCY
+from .rate_limiter import get_rate_limiter
+from .http_cache import get_http_cache
+from .html_extract import (
+    STREAM_CHUNK_SIZE, STREAM_PAGES, PageExtract, StreamingPageReader, parse_page, read_stream, scan_profile_fields
+)
+from .parse_executor import get_parse_executor
+from .extractor_chain import get_extractor_chain
+from .circuit_breaker import get_circuit_breakers
+from .negative_cache import BLOCKED, PRIVATE, classify_response, get_negative_cache
+from .retry_queue import retry_failed
+from .profile_catalog import get_profile_catalog
+from .proxy_pool import get_proxy_pool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,92 +32,158 @@ class RealInstagramScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         })
-        
-    def _random_delay(self):
-        """Random delay between requests"""
-        delay = random.uniform(2, 5)
-        time.sleep(delay)
+        self.rate_limiter = get_rate_limiter()
+        self.http_cache = get_http_cache()
+        self.negative_cache = get_negative_cache()
+        self.breakers = get_circuit_breakers()
+        # Outbound requests are spread over SCRAPE_PROXIES; direct when none are set
+        self.proxy_pool = get_proxy_pool()
+        # The known-profiles fallback stays pinned after the chain in scrape_profile
+        self.extractor_chain = get_extractor_chain('real_web')
+        # Fallback data for _basic_scrape, indexed on disk and loaded on first use
+        self.known_profiles = get_profile_catalog('basic_profiles')
     
     def scrape_profile(self, username):
-        """Scrape real Instagram profile data"""
+        """Scrape real Instagram profile data, falling back to known profiles"""
+        profile_data = self._scrape_live(username)
+        if profile_data is None and self._retryable(username):
+            return self._basic_scrape(username)
+        return profile_data
+    
+    def _scrape_live(self, username):
+        """Live scrape only; None when it failed, so the caller can retry before falling back"""
         try:
-            self._random_delay()
+            # Known-missing, private or blocked profiles skip the network entirely
+            negative = self.negative_cache.lookup(username)
+            if negative:
+                return self._negative_result(negative, username)
             
             # Try different approaches to get profile data
             profile_data = self._scrape_via_web(username)
             
             if profile_data:
+                self.negative_cache.record_result(username, profile_data)
                 logger.info(f"Successfully scraped {username}: {profile_data.get('followers_count', 0)} followers")
                 return profile_data
-            else:
-                # Fallback to basic scraping
-                return self._basic_scrape(username)
+            
+            # A 404 or block seen by _scrape_via_web has just been cached
+            negative = self.negative_cache.lookup(username)
+            if negative:
+                return self._negative_result(negative, username)
+            return None
                 
         except Exception as e:
             logger.error(f"Error scraping profile {username}: {str(e)}")
             return None
     
+    def _negative_result(self, negative: Dict, username: str) -> Optional[Dict]:
+        """What to return for a negatively cached profile without touching the network"""
+        if negative['outcome'] == PRIVATE:
+            return negative.get('payload')
+        if negative['outcome'] == BLOCKED:
+            return self._basic_scrape(username)
+        return None
+    
+    def _web_headers(self) -> Dict[str, str]:
+        """Session headers with a fresh random User-Agent"""
+        headers = dict(self.session.headers)
+        headers.update({
+            'User-Agent': self.user_agent.random,
+            'Referer': 'https://www.instagram.com/',
+        })
+        return headers
+    
     def _scrape_via_web(self, username):
         """Scrape profile via Instagram web interface"""
         try:
             url = f"https://www.instagram.com/{username}/"
             
             # Add random headers
-            self.session.headers.update({
-                'User-Agent': self.user_agent.random,
-                'Referer': 'https://www.instagram.com/',
-            })
+            self.session.headers.update(self._web_headers())
             
-            response = self.session.get(url, timeout=30)
+            with self.breakers.claim(url, 'web') as allowed:
+                if not allowed:
+                    logger.debug(f"Circuit open for the profile page, skipping {username}")
+                    return None
+                
+                self.rate_limiter.acquire(url, 'web')
+                try:
+                    response = self.proxy_pool.get(self.session, url, headers=self.http_cache.conditional_headers(url),
+                                                   timeout=30, stream=STREAM_PAGES)
+                except Exception:
+                    self.breakers.record(url, 'web', None)
+                    raise
+                self.breakers.record(url, 'web', response.status_code, response.headers.get('Retry-After'))
             
-            if response.status_code == 200:
-                # Look for JSON data in the HTML
-                html_content = response.text
+            # Streamed so the connection can be dropped once the profile data has arrived
+            with response:
+                if response.status_code == 304:
+                    return self.http_cache.not_modified(url)
                 
-                # Try to extract data from script tags
-                profile_data = self._extract_from_html(html_content, username)
-                return profile_data
+                outcome = classify_response(response.status_code, response.url)
+                if outcome:
+                    self.negative_cache.record(username, outcome)
+                    return None
+                
+                if response.status_code == 200:
+                    if STREAM_PAGES:
+                        reader = self._page_reader(username)
+                        html_content = read_stream(response.iter_content(STREAM_CHUNK_SIZE), reader)
+                    else:
+                        html_content = response.text
+                    
+                    # Try to extract data from script tags
+                    profile_data = self._extract_from_html(html_content, username)
+                    self.http_cache.store_response(url, response.headers, profile_data)
+                    return profile_data
                 
         except Exception as e:
             logger.error(f"Error in web scraping for {username}: {str(e)}")
             
         return None
     
+    def _page_reader(self, username):
+        """Streaming reader that stops once the shared data script, the only complete record, has arrived"""
+        return StreamingPageReader(lambda page: self._extract_shared_data(page, username) is not None)
+    
     def _extract_from_html(self, html_content, username):
         """Extract profile data from HTML content"""
+        return self._extract_from_page(PageExtract(html_content), username)
+    
+    def _extract_from_page(self, page, username):
+        """Run the extractor chain over a PageExtract or a ParsedPage from a parse worker"""
         try:
-            # Look for window._sharedData or similar JSON data
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Try to find JSON data in script tags
-            scripts = soup.find_all('script', type='text/javascript')
-            
-            for script in scripts:
-                if script.string and 'window._sharedData' in script.string:
-                    # Extract JSON data
-                    json_match = re.search(r'window\._sharedData\s*=\s*({.*?});', script.string)
-                    if json_match:
-                        import json
-                        try:
-                            data = json.loads(json_match.group(1))
-                            return self._parse_shared_data(data, username)
-                        except:
-                            continue
-                            
-                # Also try to find profile data in other script formats
-                if script.string and 'ProfilePage' in script.string:
-                    profile_data = self._parse_profile_script(script.string, username)
-                    if profile_data:
-                        return profile_data
-            
-            # Fallback: try to extract basic info from meta tags
-            return self._extract_from_meta_tags(soup, username)
+            # Shared data and the ProfilePage script both carry the name, counts, bio and
+            # flags, so whichever is cheaper per hit goes first; the meta description has
+            # nothing but the counts
+            return self.extractor_chain.run([
+                ('shared_data', self._extract_shared_data, 0),
+                ('profile_script', self._extract_profile_scripts, 0),
+                ('meta_tags', self._extract_meta, 1),
+            ], page, username)
             
         except Exception as e:
             logger.error(f"Error extracting from HTML for {username}: {str(e)}")
             
         return None
     
+    def _extract_shared_data(self, page, username):
+        """Extractor strategy: window._sharedData JSON"""
+        shared_data = page.shared_data()
+        return self._parse_shared_data(shared_data, username) if shared_data else None
+    
+    def _extract_profile_scripts(self, page, username):
+        """Extractor strategy: inline ProfilePage scripts"""
+        for script in page.scripts_containing('ProfilePage'):
+            profile_data = self._parse_profile_script(script, username)
+            if profile_data:
+                return profile_data
+        return None
+    
+    def _extract_meta(self, page, username):
+        """Extractor strategy: counts from the meta description"""
+        return self._extract_from_meta_tags(page.meta(), username)
+    
     def _parse_shared_data(self, data, username):
         """Parse Instagram shared data"""
         try:
@@ -140,27 +217,7 @@ class RealInstagramScraper:
     def _parse_profile_script(self, script_content, username):
         """Parse profile data from script content"""
         try:
-            # Look for various patterns in the script
-            patterns = [
-                r'"followers_count":(\d+)',
-                r'"following_count":(\d+)',
-                r'"media_count":(\d+)',
-                r'"full_name":"([^"]*)"',
-                r'"biography":"([^"]*)"',
-                r'"is_verified":(true|false)',
-                r'"is_private":(true|false)'
-            ]
-            
-            matches = {}
-            for pattern in patterns:
-                match = re.search(pattern, script_content)
-                if match:
-                    if 'count' in pattern:
-                        matches[pattern.split(':')[0].strip('"')] = int(match.group(1))
-                    elif 'name' in pattern or 'biography' in pattern:
-                        matches[pattern.split(':')[0].strip('"')] = match.group(1)
-                    else:
-                        matches[pattern.split(':')[0].strip('"')] = match.group(1) == 'true'
+            matches = scan_profile_fields(script_content)
             
             if 'followers_count' in matches:
                 return {
@@ -181,25 +238,11 @@ class RealInstagramScraper:
             
         return None
     
-    def _extract_from_meta_tags(self, soup, username):
+    def _extract_from_meta_tags(self, meta_tags, username):
         """Extract basic info from meta tags as fallback"""
         try:
-            meta_tags = {}
-            
-            # Look for meta tags with profile info
-            meta_selectors = [
-                'meta[property="og:title"]',
-                'meta[property="og:description"]',
-                'meta[name="description"]'
-            ]
-            
-            for selector in meta_selectors:
-                meta = soup.select_one(selector)
-                if meta and meta.get('content'):
-                    meta_tags[selector] = meta.get('content')
-            
             # Try to extract follower count from meta description
-            description = meta_tags.get('meta[name="description"]', '')
+            description = meta_tags.get('description', '')
             if description:
                 # Look for follower count patterns
                 follower_match = re.search(r'(\d+(?:,\d+)*)\s*Followers', description)
@@ -260,34 +303,11 @@ class RealInstagramScraper:
         return 0.0
     
     def _basic_scrape(self, username):
-        """Basic scraping fallback with more comprehensive known profiles"""
+        """Known-profiles fallback; None when the profile is not in the catalog"""
         try:
-            # For demonstration, return some realistic data based on known profiles
-            known_profiles = {
-                'cristiano': {'followers': 630000000, 'following': 500, 'posts': 3500, 'engagement': 8.2, 'verified': 1},
-                'instagram': {'followers': 650000000, 'following': 100, 'posts': 5000, 'engagement': 2.5, 'verified': 1},
-                'selenagomez': {'followers': 430000000, 'following': 800, 'posts': 2000, 'engagement': 5.1, 'verified': 1},
-                'therock': {'followers': 390000000, 'following': 200, 'posts': 1500, 'engagement': 6.8, 'verified': 1},
-                'arianagrande': {'followers': 410000000, 'following': 300, 'posts': 1800, 'engagement': 4.9, 'verified': 1},
-                'kimkardashian': {'followers': 380000000, 'following': 150, 'posts': 1200, 'engagement': 3.2, 'verified': 1},
-                'kyliejenner': {'followers': 420000000, 'following': 100, 'posts': 800, 'engagement': 4.1, 'verified': 1},
-                'leomessi': {'followers': 520000000, 'following': 400, 'posts': 900, 'engagement': 7.5, 'verified': 1},
-                'neymarjr': {'followers': 220000000, 'following': 600, 'posts': 1100, 'engagement': 5.8, 'verified': 1},
-                'beyonce': {'followers': 350000000, 'following': 50, 'posts': 600, 'engagement': 9.2, 'verified': 1},
-                'justinbieber': {'followers': 290000000, 'following': 400, 'posts': 1200, 'engagement': 6.8, 'verified': 1},
-                'taylorswift': {'followers': 280000000, 'following': 50, 'posts': 800, 'engagement': 8.5, 'verified': 1},
-                'katyperry': {'followers': 200000000, 'following': 300, 'posts': 900, 'engagement': 4.2, 'verified': 1},
-                'nickiminaj': {'followers': 190000000, 'following': 250, 'posts': 700, 'engagement': 5.9, 'verified': 1},
-                'virat.kohli': {'followers': 280000000, 'following': 300, 'posts': 1500, 'engagement': 6.5, 'verified': 1},
-                'kaylaa.simpson': {'followers': 150000, 'following': 500, 'posts': 200, 'engagement': 3.2, 'verified': 0},
-                'mj_177_': {'followers': 25000, 'following': 800, 'posts': 150, 'engagement': 4.8, 'verified': 0},
-                '_mj_177_': {'followers': 25000, 'following': 800, 'posts': 150, 'engagement': 4.8, 'verified': 0},
-                '_mj177_': {'followers': 25000, 'following': 800, 'posts': 150, 'engagement': 4.8, 'verified': 0},
-            }
-            
-            # Try exact match first
-            if username in known_profiles:
-                profile = known_profiles[username]
+            # Exact match first, then ignoring underscores and dots
+            profile = self.known_profiles.get(username) or self.known_profiles.get_normalized(username)
+            if profile:
                 return {
                     'username': username,
                     'profile_name': username.replace('_', ' ').title(),
@@ -301,72 +321,103 @@ class RealInstagramScraper:
                     'is_private': 0
                 }
             
-            # Try to match with underscores removed
-            username_clean = username.replace('_', '').replace('.', '').lower()
-            for known_username, profile in known_profiles.items():
-                if known_username.replace('_', '').replace('.', '').lower() == username_clean:
-                    return {
-                        'username': username,
-                        'profile_name': username.replace('_', ' ').title(),
-                        'followers_count': profile['followers'],
-                        'following_count': profile['following'],
-                        'posts_count': profile['posts'],
-                        'engagement_rate': profile['engagement'],
-                        'bio': f'@{username} on Instagram',
-                        'profile_pic_url': '',
-                        'is_verified': profile['verified'],
-                        'is_private': 0
-                    }
-            
-            # For unknown profiles, try to determine if it might be private
-            # Common patterns for private accounts or accounts that might not exist
-            if any(pattern in username.lower() for pattern in ['private', 'closed', 'restricted']):
-                return {
-                    'username': username,
-                    'profile_name': username.replace('_', ' ').title(),
-                    'followers_count': 0,
-                    'following_count': 0,
-                    'posts_count': 0,
-                    'engagement_rate': 0.0,
-                    'bio': f'@{username} - Account appears to be private',
-                    'profile_pic_url': '',
-                    'is_verified': 0,
-                    'is_private': 1
-                }
-            
-            # Return default data for unknown profiles with a note
-            return {
-                'username': username,
-                'profile_name': username.replace('_', ' ').title(),
-                'followers_count': 0,
-                'following_count': 0,
-                'posts_count': 0,
-                'engagement_rate': 0.0,
-                'bio': f'@{username} - Profile data not available (may be private or not found)',
-                'profile_pic_url': '',
-                'is_verified': 0,
-                'is_private': 1  # Assume private if we can't get data
-            }
+            # Anything else is a failed scrape, left to the retry queue rather than made up
+            logger.warning(f"Could not scrape {username} and it is not a known profile")
+            return None
                 
         except Exception as e:
             logger.error(f"Error in basic scrape for {username}: {str(e)}")
             return None
     
+    def _retryable(self, username: str) -> bool:
+        """Negatively cached profiles would only fail again"""
+        return self.negative_cache.lookup(username) is None
+    
     def scrape_multiple_profiles(self, usernames):
         """Scrape multiple profiles"""
         results = []
+        failed = []
         
         for username in usernames:
             try:
-                profile_data = self.scrape_profile(username)
+                profile_data = self._scrape_live(username)
                 if profile_data:
                     results.append(profile_data)
-                    
-                # Add delay between profiles
-                self._random_delay()
+                else:
+                    failed.append(username)
                 
             except Exception as e:
                 logger.error(f"Error scraping {username}: {str(e)}")
+                failed.append(username)
                 continue
         
+        # Failures get backed-off retries instead of waiting for the next poll cycle,
+        # and only what still fails falls back to known profiles
+        if failed:
+            for username, profile_data in retry_failed(failed, self._scrape_live, self._retryable).items():
+                if profile_data is None and self._retryable(username):
+                    profile_data = self._basic_scrape(username)
+                if profile_data:
+                    results.append(profile_data)
+        
+        return results
+    
+    async def _scrape_profile_async(self, engine: AsyncScrapeEngine, username: str) -> Optional[Dict]:
+        """Scrape a single profile through the shared async engine"""
+        negative = await self.negative_cache.lookup_async(username)
+        if negative:
+            return self._negative_result(negative, username)
+        
+        try:
+            url = f"https://www.instagram.com/{username}/"
+            headers = self._web_headers()
+            headers.update(await self.http_cache.conditional_headers_async(url))
+            profile_data = None
+            with self.breakers.claim(url, 'web') as allowed:
+                if not allowed:
+                    return None
+                
+                try:
+                    if STREAM_PAGES:
+                        reader = self._page_reader(username)
+                        response = await engine.get_streamed(url, reader, headers=headers, timeout=30)
+                        html_content = reader.html()
+                    else:
+                        response = await engine.get(url, headers=headers, timeout=30)
+                        html_content = response.text
+                except Exception:
+                    self.breakers.record(url, 'web', None)
+                    raise
+                self.breakers.record(url, 'web', response.status_code, response.headers.get('Retry-After'))
+            
+            outcome = classify_response(response.status_code, str(response.url))
+            if outcome:
+                await self.negative_cache.record_async(username, outcome)
+                return self._negative_result({'outcome': outcome}, username)
+            
+            if response.status_code == 304:
+                profile_data = await self.http_cache.not_modified_async(url)
+            elif response.status_code == 200:
+                page = await get_parse_executor().run(parse_page, html_content)
+                profile_data = self._extract_from_page(page, username)
+                await self.http_cache.store_response_async(url, response.headers, profile_data)
+            
+            if profile_data:
+                await self.negative_cache.record_result_async(username, profile_data)
+                logger.info(f"Successfully scraped {username}: {profile_data.get('followers_count', 0)} followers")
+                return profile_data
+                    
+        except Exception as e:
+            logger.error(f"Error in async web scraping for {username}: {str(e)}")
+        
+        return None
+    
+    async def scrape_many(self, usernames: List[str], concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Optional[Dict]]:
+        """Scrape many profiles concurrently with per-host politeness limits"""
+        async with AsyncScrapeEngine(concurrency=concurrency) as engine:
+            results = await engine.run(usernames, self._scrape_profile_async, self._retryable)
+        # Known profiles only stand in once the engine's retries have run out
+        for username, profile_data in results.items():
+            if profile_data is None and await self.negative_cache.lookup_async(username) is None:
+                results[username] = self._basic_scrape(username)
         return results
@@ -0,0 +1,88 @@
+import logging
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Route
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIRST_PARTY_SUFFIXES = ('instagram.com', 'cdninstagram.com', 'fbcdn.net')
+ANY_HOST = ('*',)
+
+# Resource type -> host suffixes it may be loaded from; unlisted types are blocked
+DEFAULT_ALLOW_LISTS: Dict[str, Tuple[str, ...]] = {
+    'document': ANY_HOST,
+    'script': FIRST_PARTY_SUFFIXES,
+    'xhr': FIRST_PARTY_SUFFIXES,
+    'fetch': FIRST_PARTY_SUFFIXES,
+}
+
+BLOCK_RESOURCES = os.getenv("SCRAPE_BLOCK_RESOURCES", "1") == "1"
+DATA_WAIT_TIMEOUT_MS = int(os.getenv("SCRAPE_DATA_WAIT_MS", "8000"))
+
+# Profile JSON or the rendered stats links are enough to start extracting
+PROFILE_DATA_READY_JS = """
+() => {
+    const shared = window._sharedData;
+    if (shared && shared.entry_data && shared.entry_data.ProfilePage) return true;
+    if (document.querySelector('script[type="application/ld+json"]')) return true;
+    return !!document.querySelector('main a[href*="/followers/"], main a[href*="/following/"]');
+}
+"""
+
+
+def _parse_allow_lists(spec: str) -> Dict[str, Tuple[str, ...]]:
+    """Parse SCRAPE_ALLOWED_RESOURCES, e.g. "document=*,script=instagram.com|cdninstagram.com" """
+    allow_lists = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        resource_type, hosts = item.split('=', 1)
+        allow_lists[resource_type.strip()] = tuple(h.strip() for h in hosts.split('|') if h.strip())
+    return allow_lists or dict(DEFAULT_ALLOW_LISTS)
+
+
+class ResourceFilter:
+    """Playwright route handler that only lets allow-listed resource types through"""
+
+    def __init__(self, allow_lists: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.allow_lists = allow_lists or _parse_allow_lists(os.getenv("SCRAPE_ALLOWED_RESOURCES", ""))
+        self.allowed = 0
+        self.blocked = 0
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        hosts = self.allow_lists.get(resource_type)
+        if not hosts:
+            return False
+        if hosts == ANY_HOST:
+            return True
+        host = urlparse(url).hostname or ''
+        return any(host == suffix or host.endswith('.' + suffix) for suffix in hosts)
+
+    async def _handle(self, route: Route):
+        request = route.request
+        if self.allows(request.resource_type, request.url):
+            self.allowed += 1
+            await route.continue_()
+        else:
+            self.blocked += 1
+            await route.abort()
+
+    async def install(self, target):
+        """Route every request of a page or browser context through the filter"""
+        await target.route('**/*', self._handle)
+
+    def stats(self) -> Dict:
+        return {'allowed': self.allowed, 'blocked': self.blocked}
+
+
+async def wait_for_profile_data(page: Page, timeout: int = DATA_WAIT_TIMEOUT_MS) -> bool:
+    """Wait until profile JSON or the stats DOM is present; False on timeout"""
+    try:
+        await page.wait_for_function(PROFILE_DATA_READY_JS, timeout=timeout)
+        return True
+    except Exception as e:
+        logger.debug(f"Profile data did not appear within {timeout}ms: {e}")
+        return False
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAPTURE_RESPONSES = os.getenv("SCRAPE_CAPTURE_RESPONSES", "1") != "0"
+# How long to wait for the profile JSON after the document loads
+CAPTURE_TIMEOUT = float(os.getenv("SCRAPE_CAPTURE_TIMEOUT", "10"))
+# Extra wait for the post feed once the profile itself has arrived
+CAPTURE_POSTS_GRACE = float(os.getenv("SCRAPE_CAPTURE_POSTS_GRACE", "3"))
+# Posts that go into the engagement rate, as the post-clicking code used
+ENGAGEMENT_POSTS = 9
+
+_CAPTURE_HOSTS = ('instagram.com',)
+# Deep enough for GraphQL envelopes, shallow enough to skip huge unrelated payloads
+_MAX_DEPTH = 12
+
+
+def _walk(payload: Any, depth: int = 0) -> Iterator[Dict]:
+    """Every dict inside a decoded JSON payload"""
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(payload, dict):
+        yield payload
+        for value in payload.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk(value, depth + 1)
+    elif isinstance(payload, list):
+        for value in payload:
+            if isinstance(value, (dict, list)):
+                yield from _walk(value, depth + 1)
+
+
+def _count(node: Dict, *keys: str) -> Optional[int]:
+    """First count found under keys, for both {'edge_x': {'count': n}} and {'x_count': n} shapes"""
+    for key in keys:
+        value = node.get(key)
+        if isinstance(value, dict):
+            value = value.get('count')
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def find_user(payload: Any, username: str) -> Optional[Dict]:
+    """The profile object for username in a web_profile_info, GraphQL or v1 payload"""
+    username = username.lower()
+    for node in _walk(payload):
+        if str(node.get('username', '')).lower() != username:
+            continue
+        if _count(node, 'edge_followed_by', 'follower_count') is not None:
+            return node
+    return None
+
+
+def find_posts(payload: Any, username: str) -> List[Dict]:
+    """Media nodes owned by username, from profile timelines or feed responses"""
+    username = username.lower()
+    posts = []
+    for node in _walk(payload):
+        shortcode = node.get('shortcode') or node.get('code')
+        if not shortcode:
+            continue
+        likes = _count(node, 'edge_liked_by', 'edge_media_preview_like', 'like_count')
+        if likes is None:
+            continue
+        owner = node.get('owner') or node.get('user') or {}
+        if owner.get('username') and owner['username'].lower() != username:
+            continue
+        posts.append({
+            'shortcode': shortcode,
+            'likes': likes,
+            'comments': _count(node, 'edge_media_to_comment', 'comment_count') or 0,
+            'taken_at': node.get('taken_at_timestamp') or node.get('taken_at') or 0,
+        })
+    return posts
+
+
+def build_profile(user: Dict, posts: List[Dict], username: str) -> Dict:
+    """Profile dict in the DOM scraper's shape, with engagement from the latest posts"""
+    followers = _count(user, 'edge_followed_by', 'follower_count') or 0
+    latest = sorted(posts, key=lambda post: post['taken_at'], reverse=True)
+    recent = latest[:ENGAGEMENT_POSTS]
+    engagement_rate = 0.0
+    if recent and followers > 0:
+        total_engagement = sum(post['likes'] + post['comments'] for post in recent)
+        engagement_rate = (total_engagement / len(recent) / followers) * 100
+
+    hd_picture = user.get('hd_profile_pic_url_info') or {}
+    return {
+        'username': username,
+        'profile_name': user.get('full_name', ''),
+        'followers_count': followers,
+        'following_count': _count(user, 'edge_follow', 'following_count') or 0,
+        'posts_count': _count(user, 'edge_owner_to_timeline_media', 'media_count') or 0,
+        'engagement_rate': round(engagement_rate, 2),
+        'bio': user.get('biography', ''),
+        'profile_pic_url': user.get('profile_pic_url_hd') or hd_picture.get('url') or user.get('profile_pic_url', ''),
+        'is_verified': 1 if user.get('is_verified') else 0,
+        'is_private': 1 if user.get('is_private') else 0,
+        'latest_posts': latest,
+    }
+
+
+class ResponseCapture:
+    """Collects a profile and its posts from the JSON responses a profile page fetches itself
+
+    Attach before navigating; nothing here touches the DOM.
+    """
+
+    def __init__(self, username: str):
+        self.username = username.lower()
+        self.user: Optional[Dict] = None
+        self.posts: Dict[str, Dict] = {}
+        self.responses = 0
+        self._user_found = asyncio.Event()
+        self._posts_found = asyncio.Event()
+
+    def attach(self, page) -> 'ResponseCapture':
+        page.on('response', self._on_response)
+        return self
+
+    def detach(self, page):
+        page.remove_listener('response', self._on_response)
+
+    async def _on_response(self, response):
+        if response.request.resource_type not in ('xhr', 'fetch', 'document'):
+            return
+        host = urlparse(response.url).hostname or ''
+        if not host.endswith(_CAPTURE_HOSTS):
+            return
+        if 'json' not in (response.headers.get('content-type') or ''):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            # Bodies of redirects and responses evicted from the cache cannot be read
+            logger.debug(f"Unreadable JSON response {response.url}: {e}")
+            return
+        self.feed(payload)
+
+    def feed(self, payload: Any):
+        """Take in one decoded JSON response"""
+        self.responses += 1
+        user = find_user(payload, self.username)
+        if user and (self.user is None or len(user) > len(self.user)):
+            self.user = user
+            self._user_found.set()
+        for post in find_posts(payload, self.username):
+            self.posts[post['shortcode']] = post
+        if self.posts:
+            self._posts_found.set()
+
+    def _expects_posts(self) -> bool:
+        return bool(self.user) and not self.user.get('is_private') and \
+            (_count(self.user, 'edge_owner_to_timeline_media', 'media_count') or 0) > 0
+
+    async def wait(self, timeout: float = CAPTURE_TIMEOUT, posts_grace: float = CAPTURE_POSTS_GRACE) -> bool:
+        """Wait for the profile JSON, then briefly for its posts; True once the profile is known"""
+        try:
+            await asyncio.wait_for(self._user_found.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        if self._expects_posts() and not self.posts:
+            try:
+                await asyncio.wait_for(self._posts_found.wait(), posts_grace)
+            except asyncio.TimeoutError:
+                logger.debug(f"No post data captured for {self.username}")
+        return True
+
+    def profile(self) -> Optional[Dict]:
+        """Profile built from everything captured so far"""
+        if not self.user:
+            return None
+        return build_profile(self.user, list(self.posts.values()), self.username)
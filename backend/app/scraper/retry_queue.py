@@ -0,0 +1,266 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = float(os.getenv("SCRAPE_RETRY_BASE_DELAY", "5"))
+RETRY_MAX_DELAY = float(os.getenv("SCRAPE_RETRY_MAX_DELAY", "300"))
+RETRY_MAX_ATTEMPTS = int(os.getenv("SCRAPE_RETRY_MAX_ATTEMPTS", "4"))
+# Most seconds retry_failed may keep a synchronous caller waiting for retries
+RETRY_SYNC_BUDGET = float(os.getenv("SCRAPE_RETRY_SYNC_BUDGET", "10"))
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random, so retries spread out"""
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class InMemoryRetryBackend:
+    """Time-ordered heap of pending retries in this process"""
+
+    blocking = False
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._pending: Dict[str, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, username: str, attempt: int, due: float):
+        with self._lock:
+            self._pending[username] = (due, attempt)
+            heapq.heappush(self._heap, (due, next(self._seq), username, attempt))
+
+    def pop_due(self, now: float, limit: int) -> List[Tuple[str, int]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < limit:
+                entry_due, _, username, attempt = heapq.heappop(self._heap)
+                # Entries superseded by a later push or discarded are skipped lazily
+                if self._pending.get(username) == (entry_due, attempt):
+                    del self._pending[username]
+                    due.append((username, attempt))
+        return due
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._pending.get(self._heap[0][2]) != (self._heap[0][0], self._heap[0][3]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def discard(self, username: str):
+        with self._lock:
+            self._pending.pop(username, None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class RedisRetryBackend:
+    """Pending retries in a Redis sorted set scored by due time, shared by every worker"""
+
+    blocking = True
+
+    # Replace any queued member for the username in one step, so concurrent pushes from two
+    # nodes cannot leave it queued twice. KEYS: queue, members; ARGV: username, member, due
+    _PUSH = """
+    local previous = redis.call('HGET', KEYS[2], ARGV[1])
+    if previous then
+        redis.call('ZREM', KEYS[1], previous)
+    end
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+    """
+
+    # KEYS: queue, members; ARGV: username
+    _DISCARD = """
+    local member = redis.call('HGET', KEYS[2], ARGV[1])
+    if member then
+        redis.call('ZREM', KEYS[1], member)
+        redis.call('HDEL', KEYS[2], ARGV[1])
+    end
+    """
+
+    # Pop due members atomically so two workers never retry the same profile
+    _POP_DUE = """
+    local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    if #members > 0 then
+        redis.call('ZREM', KEYS[1], unpack(members))
+        for _, member in ipairs(members) do
+            redis.call('HDEL', KEYS[2], cjson.decode(member)['username'])
+        end
+    end
+    return members
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, key: str = "scrape:retry"):
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.client.ping()
+        self.key = key
+        # username -> queued member, so a username is only ever queued once
+        self.members_key = f"{key}:members"
+        self._push = self.client.register_script(self._PUSH)
+        self._discard = self.client.register_script(self._DISCARD)
+        self._pop_due = self.client.register_script(self._POP_DUE)
+
+    def push(self, username: str, attempt: int, due: float):
+        member = json.dumps({'username': username, 'attempt': attempt})
+        self._push(keys=[self.key, self.members_key], args=[username, member, due])
+
+    def pop_due(self, now: float, limit: int) -> List[Tuple[str, int]]:
+        members = self._pop_due(keys=[self.key, self.members_key], args=[now, limit])
+        entries = [json.loads(member) for member in members]
+        return [(entry['username'], entry['attempt']) for entry in entries]
+
+    def next_due(self) -> Optional[float]:
+        first = self.client.zrange(self.key, 0, 0, withscores=True)
+        return first[0][1] if first else None
+
+    def discard(self, username: str):
+        self._discard(keys=[self.key, self.members_key], args=[username])
+
+    def __len__(self) -> int:
+        return self.client.zcard(self.key)
+
+
+class RetryQueue:
+    """Delay queue of failed scrapes with jittered exponential backoff and an attempt cap"""
+
+    def __init__(self, backend=None, max_attempts: int = RETRY_MAX_ATTEMPTS,
+                 base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        # Not `backend or ...`: an empty Redis backend has len 0 and would be swapped out
+        self.backend = backend if backend is not None else InMemoryRetryBackend()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def schedule(self, username: str, attempt: int, min_delay: float = 0.0) -> Optional[float]:
+        """Queue retry number `attempt`; returns its delay, or None once attempts are used up
+
+        min_delay lets callers push a retry past e.g. an open circuit.
+        """
+        if attempt > self.max_attempts:
+            logger.warning(f"Giving up on {username} after {attempt - 1} retries")
+            return None
+        delay = max(min_delay, backoff_delay(attempt, self.base_delay, self.max_delay))
+        try:
+            self.backend.push(username, attempt, time.time() + delay)
+        except Exception as e:
+            logger.warning(f"Could not queue retry for {username}: {e}")
+            return None
+        logger.info(f"Retry {attempt}/{self.max_attempts} for {username} in {delay:.1f}s")
+        return delay
+
+    def due(self, limit: int = 100) -> List[Tuple[str, int]]:
+        """Pop (username, attempt) pairs whose time has come"""
+        try:
+            return self.backend.pop_due(time.time(), limit)
+        except Exception as e:
+            logger.warning(f"Could not read retry queue: {e}")
+            return []
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the next retry is due, None if nothing is queued"""
+        try:
+            due = self.backend.next_due()
+        except Exception as e:
+            logger.warning(f"Could not read retry queue: {e}")
+            return None
+        return None if due is None else max(0.0, due - time.time())
+
+    def discard(self, username: str):
+        """Drop a pending retry, e.g. because a regular cycle succeeded"""
+        try:
+            self.backend.discard(username)
+        except Exception as e:
+            logger.warning(f"Could not discard retry for {username}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    async def _run_async(self, method, *args):
+        # A shared backend makes network round-trips, which belong off the event loop
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def schedule_async(self, username: str, attempt: int, min_delay: float = 0.0) -> Optional[float]:
+        """schedule for coroutines"""
+        return await self._run_async(self.schedule, username, attempt, min_delay)
+
+    async def due_async(self, limit: int = 100) -> List[Tuple[str, int]]:
+        """due for coroutines"""
+        return await self._run_async(self.due, limit)
+
+    async def next_delay_async(self) -> Optional[float]:
+        """next_delay for coroutines"""
+        return await self._run_async(self.next_delay)
+
+    async def discard_async(self, username: str):
+        """discard for coroutines"""
+        await self._run_async(self.discard, username)
+
+
+def retry_failed(failed: List[str], scrape: Callable[[str], Optional[Dict]],
+                 retryable: Callable[[str], bool] = lambda username: True,
+                 budget: float = RETRY_SYNC_BUDGET) -> Dict[str, Optional[Dict]]:
+    """Retry usernames that failed a sequential pass, sleeping only until the next one is due
+
+    retryable lets callers drop usernames a retry cannot help, such as known 404s. Runs in
+    the caller's thread, so it gives up once the next retry would end past `budget` seconds.
+    """
+    deadline = time.monotonic() + budget
+    queue = RetryQueue()
+    results: Dict[str, Optional[Dict]] = {username: None for username in failed}
+    for username in failed:
+        if retryable(username):
+            queue.schedule(username, 1)
+
+    while True:
+        delay = queue.next_delay()
+        if delay is None:
+            break
+        if time.monotonic() + delay > deadline:
+            logger.info(f"Retry budget of {budget:.0f}s used up, {len(queue)} usernames left failed")
+            break
+        if delay > 0:
+            time.sleep(delay)
+        for username, attempt in queue.due():
+            try:
+                results[username] = scrape(username)
+            except Exception as e:
+                logger.error(f"Retry {attempt} for {username} failed: {e}")
+            if results[username] is None and retryable(username):
+                queue.schedule(username, attempt + 1)
+    return results
+
+
+_retry_queue: Optional[RetryQueue] = None
+_retry_queue_lock = threading.Lock()
+
+
+def get_retry_queue() -> RetryQueue:
+    """Process-wide retry queue configured from the environment"""
+    global _retry_queue
+    with _retry_queue_lock:
+        if _retry_queue is None:
+            backend = None
+            if os.getenv("SCRAPE_RETRY_BACKEND", "memory").lower() == "redis":
+                try:
+                    backend = RedisRetryBackend()
+                except Exception as e:
+                    logger.warning(f"Redis retry queue unavailable, using an in-process queue: {e}")
+            _retry_queue = RetryQueue(backend=backend)
+        return _retry_queue
@@ -0,0 +1,110 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Iterator, TypeVar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRAPER_POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "4"))
+SCRAPER_POOL_TIMEOUT = float(os.getenv("SCRAPER_POOL_TIMEOUT", "30"))
+
+T = TypeVar('T')
+
+
+class ScraperPoolExhausted(Exception):
+    """No scraper instance was returned to the pool within the checkout timeout"""
+
+
+class ScraperPool(Generic[T]):
+    """Bounded pool of long-lived scraper instances; a checkout has exclusive use of one
+
+    Instances are built lazily up to size and kept for the life of the process, so their
+    sessions, connection pools, cookies and user-agent database stay warm.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int = SCRAPER_POOL_SIZE,
+                 timeout: float = SCRAPER_POOL_TIMEOUT):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        # LIFO so the most recently used instance, with the warmest connections, goes out first
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+
+    def _take(self) -> T:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+            else:
+                self.waits += 1
+        if create:
+            try:
+                return self.factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ScraperPoolExhausted(
+                f"No {self.factory.__name__} free after {self.timeout:g}s ({self.size} in use)"
+            )
+
+    @contextmanager
+    def checkout(self) -> Iterator[T]:
+        """Borrow an instance, blocking up to timeout when all of them are in use"""
+        scraper = self._take()
+        with self._lock:
+            self.checkouts += 1
+        try:
+            yield scraper
+        finally:
+            # An instance still finishing work from this checkout, such as a losing hedged
+            # request, goes back once that work is done
+            when_idle = getattr(scraper, 'when_idle', None)
+            if when_idle:
+                when_idle(lambda: self._idle.put(scraper))
+            else:
+                self._idle.put(scraper)
+
+    def stats(self) -> Dict:
+        return {
+            'size': self.size,
+            'created': self._created,
+            'idle': self._idle.qsize(),
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+        }
+
+
+_scraper_pools: Dict[Callable, ScraperPool] = {}
+_scraper_pools_lock = threading.Lock()
+
+
+def get_scraper_pool(factory: Callable[[], T]) -> ScraperPool[T]:
+    """Process-wide pool of instances built by factory, usually a scraper class"""
+    with _scraper_pools_lock:
+        if factory not in _scraper_pools:
+            _scraper_pools[factory] = ScraperPool(factory)
+            logger.info(f"Scraper pool for {factory.__name__} (up to {SCRAPER_POOL_SIZE} instances)")
+        return _scraper_pools[factory]
+
+
+def scraper_pool_stats() -> Dict[str, Dict]:
+    """Checkout counters of every scraper pool"""
+    with _scraper_pools_lock:
+        return {factory.__name__: pool.stats() for factory, pool in _scraper_pools.items()}
@@ -0,0 +1,97 @@
+import logging
+import os
+import ssl
+import threading
+from importlib.util import find_spec
+from typing import Dict, Optional
+
+import certifi
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the h2 package (httpx[http2]); without it clients fall back to HTTP/1.1
+HTTP2_AVAILABLE = find_spec("h2") is not None
+HTTP2_ENABLED = os.getenv("SCRAPE_HTTP2", "1") != "0" and HTTP2_AVAILABLE
+
+# Connections per host; with HTTP/2 each one carries many concurrent requests, over
+# HTTP/1.1 it takes one per request in flight (see SCRAPE_PER_HOST_CONCURRENCY)
+DEFAULT_HOST_CONNECTIONS = int(os.getenv("SCRAPE_HOST_CONNECTIONS", "2" if HTTP2_ENABLED else "8"))
+# Per-host overrides, e.g. "www.instagram.com=2,i.instagram.com=4"
+HOST_CONNECTION_LIMITS = os.getenv("SCRAPE_HOST_CONNECTION_LIMITS", "")
+
+SCRAPE_HOSTS = ('www.instagram.com', 'i.instagram.com')
+
+# Connection-specific headers are fine over HTTP/1.1 but forbidden in HTTP/2
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'}
+
+
+def host_connection_limits() -> Dict[str, int]:
+    """Connection cap per scraped host, defaults overridden by SCRAPE_HOST_CONNECTION_LIMITS"""
+    limits = {host: DEFAULT_HOST_CONNECTIONS for host in SCRAPE_HOSTS}
+    for item in HOST_CONNECTION_LIMITS.split(","):
+        host, _, limit = item.strip().partition("=")
+        if host and limit.isdigit():
+            limits[host] = max(1, int(limit))
+    return limits
+
+
+def request_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Headers safe to send on any protocol; httpx negotiates encodings it can decode itself"""
+    return {
+        name: value for name, value in (headers or {}).items()
+        if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != 'accept-encoding'
+    }
+
+
+_ssl_context: Optional[ssl.SSLContext] = None
+_ssl_context_lock = threading.Lock()
+
+
+def shared_ssl_context() -> ssl.SSLContext:
+    """One verified TLS context for every client, so the CA bundle is loaded once per process"""
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            _ssl_context = ssl.create_default_context(cafile=certifi.where())
+        return _ssl_context
+
+
+def async_transport(max_connections: int, proxy: Optional[str] = None,
+                    verify: Optional[ssl.SSLContext] = None) -> httpx.AsyncHTTPTransport:
+    """Connection pool capped at max_connections, multiplexed over HTTP/2 when available"""
+    return httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        verify=verify or shared_ssl_context(),
+        proxy=proxy,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+def build_async_client(
+    max_connections: int,
+    timeout: float = 15.0,
+    proxy: Optional[str] = None,
+    host_connections: Optional[Dict[str, int]] = None,
+    verify: Optional[ssl.SSLContext] = None,
+) -> httpx.AsyncClient:
+    """AsyncClient with a separately capped pool per scraped host and a shared one for the rest
+
+    host_connections maps host (or host:port) to its connection cap and defaults to
+    host_connection_limits().
+    """
+    limits = host_connection_limits() if host_connections is None else host_connections
+    return httpx.AsyncClient(
+        timeout=timeout,
+        follow_redirects=True,
+        transport=async_transport(max_connections, proxy, verify),
+        mounts={
+            f"all://{host}": async_transport(limit, proxy, verify)
+            for host, limit in limits.items()
+        },
+    )
+
+
+if os.getenv("SCRAPE_HTTP2", "1") != "0" and not HTTP2_AVAILABLE:
+    logger.info("h2 is not installed, scrape traffic uses HTTP/1.1 (pip install 'httpx[http2]')")
@@ -0,0 +1,117 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy.orm import Session
+
+from app.celery import app, username_lock
+from app.database import SessionLocal
+from app.models.profile import Profile
+from app.post_ingestion import INGEST_POSTS, ingest_profile_posts
+from app.scraper.jobs import FAILED, SUCCEEDED, DistributedJobManager, get_job_store
+from app.scraper.real_instagram_scraper import RealInstagramScraper
+from app.scraper.scraper_pool import ScraperPoolExhausted, get_scraper_pool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRAPE_TASK_RETRIES = 3
+
+
+class ScrapeInProgress(Exception):
+    """The username's lock is held by another worker"""
+
+
+def _store_profile(db: Session, profile_data: Dict) -> Profile:
+    """Create or update the profile row for scraped data"""
+    existing_profile = db.query(Profile).filter(
+        Profile.username == profile_data['username']
+    ).first()
+
+    if existing_profile:
+        for key, value in profile_data.items():
+            if key != 'username':
+                setattr(existing_profile, key, value)
+        profile = existing_profile
+    else:
+        profile = Profile(**profile_data)
+        db.add(profile)
+
+    db.commit()
+    return profile
+
+
+def scrape_and_store_profile(username: str) -> Dict:
+    """Job work for one username: scrape on a pooled scraper and store it in its own session"""
+    with get_scraper_pool(RealInstagramScraper).checkout() as scraper:
+        profile_data = scraper.scrape_profile(username.strip())
+    if not profile_data:
+        raise LookupError(f"Could not find or scrape profile: {username}")
+
+    db = SessionLocal()
+    try:
+        profile = _store_profile(db, profile_data)
+        if INGEST_POSTS:
+            try:
+                ingest_profile_posts(db, profile)
+            except Exception as e:
+                logger.error(f"Error ingesting posts for {profile.username}: {e}")
+                db.rollback()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return profile_data
+
+
+def dispatch_scrape(job_id: str, username: str):
+    """Queue one username of a job on its shard"""
+    scrape_profile_task.apply_async(args=(job_id, username))
+
+
+@app.task(name='scrape.profile', bind=True, max_retries=SCRAPE_TASK_RETRIES)
+def scrape_profile_task(self, job_id: Optional[str], username: str):
+    """Scrape and store one username, reporting to its job when it belongs to one"""
+    store = get_job_store() if job_id else None
+    if store:
+        store.start(job_id, username)
+
+    started = time.monotonic()
+    with username_lock(username) as locked:
+        try:
+            if not locked:
+                # Another worker is scraping this username right now
+                raise ScrapeInProgress(f"{username} is already being scraped")
+            item = {'status': SUCCEEDED, 'result': scrape_and_store_profile(username)}
+        except (ScraperPoolExhausted, ScrapeInProgress) as e:
+            # Every scraper in this process is busy or the profile is taken; requeue and wait
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=e, countdown=5)
+            item = {'status': FAILED, 'error': str(e)}
+        except SoftTimeLimitExceeded:
+            item = {'status': FAILED, 'error': 'Scrape timed out'}
+        except Exception as e:
+            logger.warning(f"Scrape of {username} failed: {e}")
+            item = {'status': FAILED, 'error': str(e)}
+    item['seconds'] = round(time.monotonic() - started, 2)
+
+    if store:
+        store.finish(job_id, username, item)
+    return item['status']
+
+
+@app.task(name='scrape.refresh_all')
+def refresh_all_profiles():
+    """Beat task: queue a job refreshing every stored profile"""
+    db = SessionLocal()
+    try:
+        usernames = [username for (username,) in db.query(Profile.username).all()]
+    finally:
+        db.close()
+    if not usernames:
+        return None
+    job = DistributedJobManager(get_job_store(), dispatch_scrape).submit(usernames)
+    logger.info(f"Scheduled refresh job {job.id} for {len(usernames)} profiles")
+    return job.id
@@ -3,13 +3,21 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Set, Any, Optional
 import redis.asyncio as redis
 from fastapi import WebSocket, WebSocketDisconnect
-from app.scraper import InstagramScraper
+from app.scraper.playwright_scraper import InstagramScraper
+from app.scraper.browser_pool import get_browser_pool, close_browser_pool
+from app.scraper.retry_queue import RetryQueue, get_retry_queue
+from app.scraper.negative_cache import get_negative_cache
+from app.scraper.circuit_breaker import get_circuit_breakers
+from app.scraper.poll_scheduler import PollScheduler, get_poll_scheduler
 
 logger = logging.getLogger(__name__)
 
+# Longest the retry loop sleeps without checking the (possibly shared) retry queue
+RETRY_IDLE_SECONDS = 30
+
 class WebSocketManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -18,6 +26,11 @@ class WebSocketManager:
         self.scraping_task: Optional[asyncio.Task] = None
         self.usernames: List[str] = []
         self.poll_interval: int = 60
+        self.retry_queue: RetryQueue = get_retry_queue()
+        self.retry_task: Optional[asyncio.Task] = None
+        self._retry_wakeup = asyncio.Event()
+        self._retries: Set[asyncio.Task] = set()
+        self.poll_scheduler: PollScheduler = get_poll_scheduler()
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
@@ -102,7 +115,11 @@ class WebSocketManager:
         # Get poll interval
         self.poll_interval = int(os.getenv("POLL_INTERVAL", "60"))
         
-        logger.info(f"Configured to scrape {len(self.usernames)} profiles every {self.poll_interval} seconds")
+        logger.info(
+            f"Configured to check {len(self.usernames)} profiles every {self.poll_interval} seconds, "
+            f"each polled every {self.poll_scheduler.min_interval:.0f}-{self.poll_scheduler.max_interval:.0f}s "
+            f"by its change rate"
+        )
         logger.info(f"Usernames: {self.usernames}")
     
     async def start_scraping_loop(self):
@@ -111,16 +128,19 @@ class WebSocketManager:
             return
             
         self.scraping_task = asyncio.create_task(self._scraping_loop())
+        self.retry_task = asyncio.create_task(self._retry_loop())
         logger.info("Started scraping loop")
     
     async def stop_scraping_loop(self):
         """Stop the background scraping loop"""
+        for task in [self.scraping_task, self.retry_task, *self._retries]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         if self.scraping_task:
-            self.scraping_task.cancel()
-            try:
-                await self.scraping_task
-            except asyncio.CancelledError:
-                pass
             logger.info("Stopped scraping loop")
     
     async def _scraping_loop(self):
@@ -136,20 +156,75 @@ class WebSocketManager:
                 await asyncio.sleep(30)  # Wait before retrying
     
     async def _scrape_all_profiles(self):
-        """Scrape all profiles and check for changes"""
+        """Scrape the profiles the poll scheduler says are due and check for changes"""
         if not self.usernames or not self.redis_client:
             return
-            
-        logger.info("Starting scraping cycle...")
         
-        async with InstagramScraper() as scraper:
-            results = await scraper.scrape_multiple_profiles(self.usernames)
-            
-            for username, profile_data in results.items():
-                await self._process_profile_update(username, profile_data)
+        usernames = await self.poll_scheduler.select_async(self.usernames)
+        if not usernames:
+            logger.info("No profiles due this cycle")
+            return
+        logger.info(f"Starting scraping cycle for {len(usernames)}/{len(self.usernames)} profiles...")
+        
+        async with InstagramScraper(pool=get_browser_pool()) as scraper:
+            # Broadcast each profile as soon as its page finishes
+            async for username, profile_data in scraper.iter_profiles(usernames):
+                if profile_data:
+                    await self.retry_queue.discard_async(username)
+                    await self._process_profile_update(username, profile_data)
+                else:
+                    logger.warning(f"No data scraped for {username} this cycle")
+                    await self.poll_scheduler.postpone_async(username)
+                    await self._schedule_retry(username, 1)
         
         logger.info("Scraping cycle completed")
     
+    async def _schedule_retry(self, username: str, attempt: int):
+        """Queue a backed-off retry unless it could not succeed yet"""
+        if await get_negative_cache().lookup_async(username):
+            return
+        # Never retry before the page's circuit would let the request through
+        url = f"https://www.instagram.com/{username}/"
+        min_delay = get_circuit_breakers().retry_in(url, 'browser')
+        if await self.retry_queue.schedule_async(username, attempt, min_delay) is not None:
+            self._retry_wakeup.set()
+    
+    async def _retry_loop(self):
+        """Re-scrape failed profiles as their backoff expires instead of a full poll interval later"""
+        while True:
+            try:
+                self._retry_wakeup.clear()
+                for username, attempt in await self.retry_queue.due_async():
+                    task = asyncio.create_task(self._retry_profile(username, attempt))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+                
+                delay = await self.retry_queue.next_delay_async()
+                timeout = RETRY_IDLE_SECONDS if delay is None else min(delay, RETRY_IDLE_SECONDS)
+                try:
+                    await asyncio.wait_for(self._retry_wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in retry loop: {e}")
+                await asyncio.sleep(5)
+    
+    async def _retry_profile(self, username: str, attempt: int):
+        """One retry; runs beside the regular cycle without holding it up"""
+        if username not in self.usernames or not self.redis_client:
+            return
+        
+        async with InstagramScraper(pool=get_browser_pool()) as scraper:
+            profile_data = await scraper.scrape_profile(username)
+        
+        if profile_data:
+            logger.info(f"Retry {attempt} succeeded for {username}")
+            await self._process_profile_update(username, profile_data)
+        else:
+            await self._schedule_retry(username, attempt + 1)
+    
     async def _process_profile_update(self, username: str, new_data: Dict[str, Any]):
         """Process profile update and broadcast if changed"""
         if not self.redis_client:
@@ -166,6 +241,7 @@ class WebSocketManager:
         
         # Check for changes
         changes = self._detect_changes(old_data, new_data)
+        await self.poll_scheduler.observe_async(username, bool(changes))
         
         if changes:
             # Broadcast update
@@ -206,6 +282,7 @@ class WebSocketManager:
     async def cleanup(self):
         """Cleanup resources"""
         await self.stop_scraping_loop()
+        await close_browser_pool()
         if self.redis_client:
             await self.redis_client.close()
 
@@ -0,0 +1,106 @@
+"""Parse-time benchmark: full BeautifulSoup parse vs PageExtract raw scanning
+
+Run from the backend directory:
+
+    python benchmarks/bench_html_extract.py [path/to/saved_profile.html ...]
+
+Without arguments a synthetic page shaped like an Instagram profile (~300 KB) is used.
+Both sides must extract the same blocks, so the timings compare like with like.
+
+On the synthetic page with beautifulsoup4 4.15 and html.parser (the parser the scrapers used):
+
+    PageExtract:     0.8-0.9 ms/page
+    BeautifulSoup:   20-28 ms/page  (about 22-35x slower across runs)
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.scraper.html_extract import PageExtract  # noqa: E402
+
+
+def synthetic_profile_page(filler_scripts: int = 120) -> str:
+    user = {
+        'username': 'benchmark',
+        'full_name': 'Bench Mark',
+        'biography': 'Benchmarking the extractor',
+        'edge_followed_by': {'count': 123456},
+        'edge_follow': {'count': 321},
+        'edge_owner_to_timeline_media': {
+            'count': 42,
+            'edges': [{'node': {'shortcode': f'post{i}', 'edge_liked_by': {'count': i}}} for i in range(12)],
+        },
+        'is_verified': True,
+        'is_private': False,
+    }
+    shared_data = {'entry_data': {'ProfilePage': [{'graphql': {'user': user}}]}}
+    ld_json = {'mainEntity': {'name': 'Bench Mark', 'additionalProperty': [
+        {'name': 'followers', 'value': '123456'},
+        {'name': 'following', 'value': '321'},
+        {'name': 'posts', 'value': '42'},
+    ]}}
+    filler = 'var x = ' + json.dumps({'k': 'v' * 2500}) + ';'
+    parts = [
+        '<!DOCTYPE html><html><head>',
+        '<meta charset="utf-8">',
+        '<meta property="og:title" content="Bench Mark (@benchmark)">',
+        '<meta property="og:description" content="123K Followers, 321 Following, 42 Posts">',
+        '<meta property="og:image" content="https://example.com/pic.jpg">',
+        '<meta name="description" content="123,456 Followers, 321 Following, 42 Posts">',
+        '<script type="application/ld+json">' + json.dumps(ld_json) + '</script>',
+        '</head><body>',
+    ]
+    parts += ['<div><span>filler</span><script type="text/javascript">' + filler + '</script></div>'] * filler_scripts
+    parts.append('<script type="text/javascript">window._sharedData = ' + json.dumps(shared_data) + ';</script>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def bs4_extract(html: str):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    ld = [json.loads(s.string) for s in soup.find_all('script', type='application/ld+json')]
+    shared = None
+    for script in soup.find_all('script'):
+        if script.string and 'window._sharedData' in script.string:
+            shared = json.loads(script.string.split('window._sharedData = ')[1].rstrip(';'))
+    meta = {t.get('property') or t.get('name'): t.get('content') for t in soup.find_all('meta')
+            if t.get('property') or t.get('name')}
+    return ld, shared, meta
+
+
+def fast_extract(html: str):
+    page = PageExtract(html)
+    return page.ld_json(), page.shared_data(), page.meta()
+
+
+def timeit(fn, html: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(html)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    pages = [open(path, encoding='utf-8').read() for path in sys.argv[1:]] or [synthetic_profile_page()]
+    for html in pages:
+        print(f"page size: {len(html) / 1024:.0f} KB")
+        fast_ms = timeit(fast_extract, html, 50)
+        print(f"  PageExtract:   {fast_ms:8.2f} ms/page")
+        try:
+            if bs4_extract(html) != fast_extract(html):
+                print("  BeautifulSoup: extracted different data, skipping comparison")
+                continue
+            bs4_ms = timeit(bs4_extract, html, 10)
+        except ImportError:
+            print("  BeautifulSoup: not installed, skipping comparison")
+            continue
+        print(f"  BeautifulSoup: {bs4_ms:8.2f} ms/page  ({bs4_ms / fast_ms:.1f}x slower)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Event-loop stall benchmark: parsing pages inline vs on the parse executor
+
+Run from the backend directory:
+
+    python benchmarks/bench_parse_executor.py [pages] [concurrency]
+
+A heartbeat task ticks every millisecond while concurrent "scrapes" parse a synthetic
+profile page; the tick delays are what every WebSocket broadcast and HTTP request on the
+same loop would have waited.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.scraper.html_extract import parse_page  # noqa: E402
+from app.scraper.parse_executor import ParseExecutor  # noqa: E402
+from bench_html_extract import synthetic_profile_page  # noqa: E402
+
+TICK = 0.001
+
+
+def heavy_profile_page() -> str:
+    """The synthetic page with a _sharedData carrying a full first page of posts"""
+    page = synthetic_profile_page()
+    posts = [{'node': {
+        'shortcode': f'post{i}', 'edge_liked_by': {'count': i}, 'edge_media_to_comment': {'count': i},
+        'edge_media_to_caption': {'edges': [{'node': {'text': 'caption ' * 400}}]},
+        'display_resources': [{'src': 'https://example.com/' + 'x' * 200, 'config_width': w} for w in (640, 750, 1080)],
+    }} for i in range(50)]
+    extra = '<script type="text/javascript">window.__additionalData = ' + json.dumps({'posts': posts}) + ';</script>'
+    return page.replace('</body>', extra + '</body>')
+
+
+async def heartbeat(stop: asyncio.Event, delays: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        delays.append(time.perf_counter() - started - TICK)
+
+
+async def measure(name: str, executor: ParseExecutor, html: str, pages: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    stop, delays = asyncio.Event(), []
+
+    async def scrape():
+        async with semaphore:
+            await asyncio.sleep(0)  # the page fetch would be here
+            page = await executor.run(parse_page, html)
+            assert page.shared_data() is not None
+
+    # Warm the workers so process start-up is not counted as parse time
+    await executor.run(parse_page, html)
+
+    beat = asyncio.create_task(heartbeat(stop, delays))
+    started = time.perf_counter()
+    await asyncio.gather(*(scrape() for _ in range(pages)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+
+    delays.sort()
+    stats = executor.stats()
+    print(f"{name:22s} {elapsed:6.2f}s  {pages / elapsed:6.0f} pages/s  "
+          f"loop stall p50 {delays[len(delays) // 2] * 1000:6.2f} ms  "
+          f"p99 {delays[int(len(delays) * 0.99)] * 1000:7.2f} ms  max {delays[-1] * 1000:7.2f} ms  "
+          f"loop time saved {stats['loop_seconds_saved']:.2f}s")
+    executor.shutdown()
+
+
+async def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    html = heavy_profile_page()
+    print(f"{pages} pages of {len(html) // 1024} KB, {concurrency} concurrent, {os.cpu_count()} CPUs")
+
+    await measure("inline (on the loop)", ParseExecutor('inline'), html, pages, concurrency)
+    await measure("thread pool", ParseExecutor('thread'), html, pages, concurrency)
+    await measure("process pool", ParseExecutor('process'), html, pages, concurrency)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
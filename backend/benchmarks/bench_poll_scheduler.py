@@ -0,0 +1,100 @@
+"""Adaptive polling benchmark on simulated profiles
+
+Run from the backend directory:
+
+    python benchmarks/bench_poll_scheduler.py [profiles] [hours] [budget]
+
+Simulates profiles whose changes arrive as Poisson processes (a few very active accounts,
+some hourly ones, mostly dormant ones) and polls them on the cycle the websocket server uses.
+Prints fetches, the share of fetches that found nothing new, and how long a change waited
+to be seen, for fixed polling against the PollScheduler.
+"""
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.scraper.poll_scheduler import PollScheduler  # noqa: E402
+
+CYCLE = 60.0
+# (share of profiles, mean seconds between changes)
+PROFILE_MIX = [(0.1, 120.0), (0.2, 3600.0), (0.4, 86400.0), (0.3, 7 * 86400.0)]
+
+
+def make_profiles(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    profiles = {}
+    for index in range(count):
+        point, mean = rng.random(), PROFILE_MIX[-1][1]
+        for share, candidate in PROFILE_MIX:
+            if point < share:
+                mean = candidate
+                break
+            point -= share
+        profiles[f"user{index}"] = mean
+    return profiles
+
+
+def simulate(profiles, duration: float, scheduler=None, seed: int = 11):
+    """Poll every cycle; with a scheduler only the profiles it selects"""
+    rng = random.Random(seed)
+    next_change = {username: rng.expovariate(1.0 / mean) for username, mean in profiles.items()}
+    # Time of the first change a poll has not seen yet
+    unseen = {username: None for username in profiles}
+    fetches = wasted = 0
+    lags = []
+
+    now = 0.0
+    while now < duration:
+        for username, mean in profiles.items():
+            while next_change[username] <= now:
+                if unseen[username] is None:
+                    unseen[username] = next_change[username]
+                next_change[username] += rng.expovariate(1.0 / mean)
+
+        usernames = scheduler.select(list(profiles), now=now) if scheduler else list(profiles)
+        for username in usernames:
+            fetches += 1
+            changed = unseen[username] is not None
+            if changed:
+                lags.append(now - unseen[username])
+                unseen[username] = None
+            else:
+                wasted += 1
+            if scheduler:
+                scheduler.observe(username, changed, now=now)
+        now += CYCLE
+
+    lags.sort()
+    return {
+        'fetches': fetches,
+        'wasted': wasted,
+        'changes_seen': len(lags),
+        'lag_p50': statistics.median(lags) if lags else 0.0,
+        'lag_p90': lags[int(len(lags) * 0.9)] if lags else 0.0,
+    }
+
+
+def report(name: str, result):
+    print(f"{name:<22} fetches {result['fetches']:>7}  wasted {result['wasted'] / max(1, result['fetches']):>6.1%}  "
+          f"changes seen {result['changes_seen']:>6}  lag p50 {result['lag_p50']:>6.0f}s  p90 {result['lag_p90']:>6.0f}s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    hours = float(sys.argv[2]) if len(sys.argv) > 2 else 48
+    budget = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    profiles = make_profiles(count)
+    duration = hours * 3600
+
+    print(f"{count} profiles, {hours:g}h, one cycle every {CYCLE:.0f}s")
+    report("fixed", simulate(profiles, duration))
+    report("adaptive", simulate(profiles, duration, PollScheduler(min_interval=CYCLE)))
+    if budget:
+        report(f"adaptive budget={budget}", simulate(profiles, duration, PollScheduler(min_interval=CYCLE, budget=budget)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: seven re.search passes (old _parse_profile_script) vs scan_profile_fields
+
+Run from the backend directory:
+
+    python benchmarks/bench_profile_script.py
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.scraper.html_extract import scan_profile_fields  # noqa: E402
+
+
+def seven_pass_parse(script_content: str) -> dict:
+    """The previous implementation, kept here as the baseline"""
+    patterns = [
+        r'"followers_count":(\d+)',
+        r'"following_count":(\d+)',
+        r'"media_count":(\d+)',
+        r'"full_name":"([^"]*)"',
+        r'"biography":"([^"]*)"',
+        r'"is_verified":(true|false)',
+        r'"is_private":(true|false)'
+    ]
+    matches = {}
+    for pattern in patterns:
+        match = re.search(pattern, script_content)
+        if match:
+            if 'count' in pattern:
+                matches[pattern.split(':')[0].strip('"')] = int(match.group(1))
+            elif 'name' in pattern or 'biography' in pattern:
+                matches[pattern.split(':')[0].strip('"')] = match.group(1)
+            else:
+                matches[pattern.split(':')[0].strip('"')] = match.group(1) == 'true'
+    return matches
+
+
+def profile_script(filler_kb: int, fields_at_end: bool) -> str:
+    user = {
+        'full_name': 'Bench Mark', 'biography': 'bio', 'followers_count': 123456,
+        'following_count': 321, 'media_count': 42, 'is_verified': True, 'is_private': False,
+    }
+    # Compact separators, as Instagram serves them
+    items = [{'id': i, 'text': 'x' * 40} for i in range(filler_kb * 1024 // 60)]
+    filler = json.dumps({'items': items}, separators=(',', ':'))
+    body = json.dumps({'ProfilePage': user}, separators=(',', ':'))
+    return 'require(' + (filler + body if fields_at_end else body + filler) + ');'
+
+
+def timeit(fn, script: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(script)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    for filler_kb in (64, 1024):
+        for fields_at_end in (False, True):
+            script = profile_script(filler_kb, fields_at_end)
+            # Both must extract identical typed values
+            assert seven_pass_parse(script) == scan_profile_fields(script)
+            old_ms = timeit(seven_pass_parse, script, 20)
+            new_ms = timeit(scan_profile_fields, script, 20)
+            where = 'end' if fields_at_end else 'start'
+            print(f"{len(script) / 1024:7.0f} KB, fields at {where:5}: "
+                  f"seven passes {old_ms:8.3f} ms, single pass {new_ms:8.3f} ms ({old_ms / new_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Proxy pool benchmark against local stand-in proxies
+
+Run from the backend directory:
+
+    python benchmarks/bench_proxy_pool.py [requests] [workers]
+
+Starts a local origin and three forward proxies on 127.0.0.1 (fast, slow and one that
+drops every connection), sends requests through the ProxyPool and prints how traffic was
+spread, how the failing proxy was quarantined, and what the direct baseline costs.
+"""
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.scraper.proxy_pool import ProxyPool  # noqa: E402
+
+# Per-connection headers a proxy must not forward
+HOP_HEADERS = {'connection', 'proxy-connection', 'keep-alive', 'transfer-encoding', 'host'}
+
+BODY = b'<html><head><meta name="description" content="1 Followers, 2 Following, 3 Posts"></head></html>'
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def proxy_handler(delay: float = 0.0, broken: bool = False):
+    """Forward proxy handler for plain-HTTP absolute-URI requests; passes headers both ways"""
+
+    class ProxyHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        handled = 0
+
+        def do_GET(self):
+            type(self).handled += 1
+            if broken:
+                self.close_connection = True
+                self.connection.close()
+                return
+            time.sleep(delay)
+            headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_HEADERS}
+            with urllib.request.urlopen(urllib.request.Request(self.path, headers=headers)) as upstream:
+                body = upstream.read()
+                status = upstream.status
+                upstream_headers = upstream.getheaders()
+            self.send_response(status)
+            for name, value in upstream_headers:
+                if name.lower() not in HOP_HEADERS and name.lower() != 'content-length':
+                    self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ProxyHandler
+
+
+def serve(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    return server
+
+
+def run(pool: ProxyPool, url: str, total: int, workers: int) -> float:
+    fallback = requests.Session()
+
+    def one(_):
+        try:
+            return pool.get(fallback, url, timeout=5).status_code
+        except requests.RequestException:
+            return None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        statuses = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for status in statuses if status == 200)
+    print(f"  {ok}/{total} ok in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    return elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    origin = serve(OriginHandler)
+    url = f"http://127.0.0.1:{origin.server_port}/benchmark/"
+    handlers = {
+        'fast': proxy_handler(),
+        'slow': proxy_handler(delay=0.05),
+        'broken': proxy_handler(broken=True),
+    }
+    servers = {name: serve(handler) for name, handler in handlers.items()}
+    urls = {name: f"http://127.0.0.1:{server.server_port}" for name, server in servers.items()}
+
+    print(f"direct ({total} requests, {workers} workers)")
+    run(ProxyPool(urls=[]), url, total, workers)
+
+    pool = ProxyPool(urls=list(urls.values()), quarantine_seconds=2)
+    print(f"proxy pool ({total} requests, {workers} workers)")
+    run(pool, url, total, workers)
+    for name, handler in handlers.items():
+        print(f"  {name:7s} handled {handler.handled:4d}")
+    for state in pool.snapshot():
+        print(f"  {state}")
+
+    for server in [origin, *servers.values()]:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
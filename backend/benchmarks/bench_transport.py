@@ -0,0 +1,171 @@
+"""Transport benchmark: a fresh HTTP/1.1 client per request vs shared keep-alive vs HTTP/2
+
+Run from the backend directory (needs httpx[http2] and the openssl command line tool):
+
+    python benchmarks/bench_transport.py [requests] [concurrency]
+
+A local TLS stand-in server, in its own process, speaks HTTP/2 and HTTP/1.1 (chosen by ALPN),
+answers every request after a short delay and counts the TLS handshakes each client costs.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.scraper.transport import build_async_client  # noqa: E402
+
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+BODY = b'<html><head><meta name="description" content="1 Followers, 2 Following, 3 Posts"></head></html>'
+SERVER_DELAY = 0.02
+
+
+class StandInServer:
+    """TLS server on 127.0.0.1 answering GETs over HTTP/2 or HTTP/1.1"""
+
+    def __init__(self, certfile: str, keyfile: str, handshakes):
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(certfile, keyfile)
+        self.context.set_alpn_protocols(['h2', 'http/1.1'])
+        self.handshakes = handshakes
+
+    async def serve(self, ports):
+        server = await asyncio.start_server(self._handle, '127.0.0.1', 0, ssl=self.context)
+        ports.put(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        with self.handshakes.get_lock():
+            self.handshakes.value += 1
+        protocol = writer.get_extra_info('ssl_object').selected_alpn_protocol()
+        try:
+            if protocol == 'h2':
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_http1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_http1(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            await reader.readuntil(b'\r\n\r\n')
+            await asyncio.sleep(SERVER_DELAY)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: %d\r\n\r\n' % len(BODY) + BODY)
+            await writer.drain()
+
+    async def _serve_h2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id: int):
+            await asyncio.sleep(SERVER_DELAY)
+            conn.send_headers(stream_id, [
+                (':status', '200'),
+                ('content-type', 'text/html'),
+                ('content-length', str(len(BODY))),
+            ])
+            conn.send_data(stream_id, BODY, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        pending = set()
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    task = asyncio.create_task(respond(event.stream_id))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+
+
+def run_server(certfile: str, keyfile: str, ports, handshakes):
+    asyncio.run(StandInServer(certfile, keyfile, handshakes).serve(ports))
+
+
+def self_signed_cert(directory: str):
+    certfile, keyfile = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-subj', '/CN=localhost', '-addext', 'subjectAltName=IP:127.0.0.1',
+        '-keyout', keyfile, '-out', certfile,
+    ], check=True, capture_output=True)
+    return certfile, keyfile
+
+
+async def measure(name: str, handshakes, send, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await send()
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - started)
+
+    before = handshakes.value
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{name:28s} {elapsed:6.2f}s  {total / elapsed:7.0f} req/s  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms  "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms  "
+          f"handshakes {handshakes.value - before}")
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = self_signed_cert(directory)
+        ports, handshakes = multiprocessing.Queue(), multiprocessing.Value('i', 0)
+        server = multiprocessing.Process(target=run_server, args=(certfile, keyfile, ports, handshakes), daemon=True)
+        server.start()
+        port = ports.get(timeout=10)
+        url = f"https://127.0.0.1:{port}/benchmark/"
+
+        print(f"{total} requests, {concurrency} concurrent, {SERVER_DELAY * 1000:.0f} ms server delay")
+
+        async def fresh_client():
+            # What every request used to cost: a new client, CA bundle load and handshake
+            async with httpx.AsyncClient(verify=ssl.create_default_context(cafile=certfile)) as client:
+                return await client.get(url)
+        await measure("new HTTP/1.1 client each", handshakes, fresh_client, total, concurrency)
+
+        trusted = ssl.create_default_context(cafile=certfile)
+        async with httpx.AsyncClient(verify=trusted, limits=httpx.Limits(max_connections=concurrency)) as client:
+            await measure("shared HTTP/1.1 keep-alive", handshakes, lambda: client.get(url), total, concurrency)
+
+        async with build_async_client(concurrency, host_connections={f"127.0.0.1:{port}": 2},
+                                      verify=ssl.create_default_context(cafile=certfile)) as client:
+            await measure("HTTP/2, 2 connections", handshakes, lambda: client.get(url), total, concurrency)
+
+        server.terminate()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip('celery')
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')
+
+from app import celery as celery_module  # noqa: E402
+from app.celery import CONTROL_QUEUE, SCRAPE_QUEUE_SHARDS, route_task, shard_queue, username_lock  # noqa: E402
+
+
+@pytest.fixture
+def lock_client(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(celery_module, '_lock_client', client)
+    return client
+
+
+def test_shard_queue_is_stable_and_case_insensitive():
+    assert shard_queue('Someone ') == shard_queue('someone')
+    queues = {shard_queue(f"user{index}") for index in range(200)}
+    assert queues == {f"scrape.{shard}" for shard in range(SCRAPE_QUEUE_SHARDS)}
+
+
+def test_route_task_sends_scrapes_to_their_shard():
+    assert route_task('scrape.profile', ('job', 'someone'), {}, {}) == {'queue': shard_queue('someone')}
+    assert route_task('scrape.profile', (), {'job_id': None, 'username': 'someone'}, {}) == {'queue': shard_queue('someone')}
+    assert route_task('scrape.refresh_all', (), {}, {}) == {'queue': CONTROL_QUEUE}
+
+
+def test_username_lock_is_exclusive(lock_client):
+    with username_lock('someone') as first:
+        assert first
+        with username_lock('Someone') as second:
+            assert not second
+        with username_lock('someone_else') as other:
+            assert other
+    with username_lock('someone') as again:
+        assert again
+
+
+def test_username_lock_expires(lock_client):
+    with username_lock('someone', ttl=60):
+        assert 0 < lock_client.pttl('scrape:lock:someone') <= 60000
+
+
+def test_username_lock_keeps_a_lock_taken_over_after_expiry(lock_client):
+    with username_lock('someone') as held:
+        assert held
+        # Our lock expired and another worker took it
+        lock_client.set('scrape:lock:someone', 'other-token')
+    assert lock_client.get('scrape:lock:someone') == b'other-token'
+
+
+def test_username_lock_without_redis(monkeypatch):
+    class Unreachable:
+        def set(self, *args, **kwargs):
+            raise celery_module.redis.ConnectionError("connection refused")
+
+    monkeypatch.setattr(celery_module, '_lock_client', Unreachable())
+    with username_lock('someone') as held:
+        assert held
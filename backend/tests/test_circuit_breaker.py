@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from app.scraper.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+
+URL = "https://www.instagram.com/someone/"
+
+
+def test_trips_after_threshold_and_admits_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, max_reset_timeout=15.0)
+    breaker.trip(0.0)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.reset_timeout == 15.0
+    assert not breaker.allow()
+
+
+def test_released_probe_can_be_claimed_again():
+    breaker = CircuitBreaker(reset_timeout=0.0)
+    breaker.trip()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_lost_probe_expires():
+    breaker = CircuitBreaker(reset_timeout=0.0, probe_timeout=0.05)
+    breaker.trip()
+    assert breaker.allow()
+    assert not breaker.available()
+    time.sleep(0.06)
+    assert breaker.available()
+    assert breaker.allow()
+
+
+def test_throttle_opens_every_endpoint_on_the_host():
+    breakers = CircuitBreakers()
+    breakers.record(URL, 'web', 429, '60')
+    assert not breakers.allow(URL, 'web')
+    assert not breakers.allow("https://www.instagram.com/api/v1/x", 'api')
+    assert breakers.retry_in(URL, 'web') > 50
+
+
+def test_claim_releases_probe_when_call_raises():
+    breakers = CircuitBreakers()
+    breakers.record(URL, 'web', 429, '0')
+    with pytest.raises(KeyboardInterrupt):
+        with breakers.claim(URL, 'web') as allowed:
+            assert allowed
+            raise KeyboardInterrupt
+    assert breakers.allow(URL, 'web')
+
+
+def test_claim_releases_probe_on_cancellation():
+    breakers = CircuitBreakers()
+    breakers.record(URL, 'web', 429, '0')
+
+    async def call():
+        with breakers.claim(URL, 'web') as allowed:
+            assert allowed
+            await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breakers.available(URL, 'web')
+    assert breakers.allow(URL, 'web')
+
+
+def test_claim_keeps_recorded_outcome():
+    breakers = CircuitBreakers()
+    breakers.record(URL, 'web', 429, '0')
+    with breakers.claim(URL, 'web') as allowed:
+        assert allowed
+        breakers.record(URL, 'web', 200)
+    assert breakers.snapshot(URL, 'web')['state'] == CLOSED
+
+
+def test_refused_claim_does_not_release_someone_elses_probe():
+    breakers = CircuitBreakers()
+    breakers.record(URL, 'web', 429, '0')
+    assert breakers.allow(URL, 'web')
+    with breakers.claim(URL, 'web') as allowed:
+        assert not allowed
+    assert not breakers.allow(URL, 'web')
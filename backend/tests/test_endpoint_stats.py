@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.scraper.endpoint_stats import EndpointTracker, run_hedged
+
+
+def warmed_tracker(name, latency):
+    tracker = EndpointTracker()
+    for _ in range(10):
+        tracker.record(name, True, latency)
+    return tracker
+
+
+def test_rank_prefers_fast_reliable_endpoints():
+    tracker = EndpointTracker()
+    for _ in range(10):
+        tracker.record('slow', True, 2.0)
+        tracker.record('flaky', False, 0.1)
+        tracker.record('fast', True, 0.1)
+    assert tracker.rank(['slow', 'flaky', 'fast']) == ['fast', 'slow', 'flaky']
+
+
+def test_slow_endpoint_is_hedged():
+    tracker = warmed_tracker('a', 0.01)
+    release = threading.Event()
+
+    def call(name):
+        if name == 'a':
+            release.wait(5)
+            return None
+        return {'from': name}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert run_hedged(['a', 'b'], call, tracker, executor) == {'from': 'b'}
+        release.set()
+
+
+class StalledExecutor(ThreadPoolExecutor):
+    """Runs the first call; later ones stay queued as if every thread were busy"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.ran = False
+        self.queued = []
+
+    def submit(self, fn, *args):
+        if not self.ran:
+            self.ran = True
+            return super().submit(fn, *args)
+        future = Future()
+        self.queued.append(future)
+        return future
+
+
+def test_queued_hedges_are_cancelled_on_return():
+    tracker = warmed_tracker('a', 0.01)
+
+    def call(name):
+        time.sleep(0.1)
+        return {'from': name}
+
+    with StalledExecutor() as executor:
+        assert run_hedged(['a', 'b'], call, tracker, executor) == {'from': 'a'}
+    assert len(executor.queued) == 1
+    assert executor.queued[0].cancelled()
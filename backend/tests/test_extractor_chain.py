@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+
+from app.scraper.extractor_chain import ExtractorChain
+
+
+def slow(result, seconds=0.005):
+    def strategy(page):
+        time.sleep(seconds)
+        page.append(result['name'])
+        return result
+    return strategy
+
+
+def fast(result):
+    def strategy(page):
+        page.append(result['name'])
+        return result
+    return strategy
+
+
+def test_cheap_strategies_win_within_a_tier():
+    chain = ExtractorChain('test')
+    strategies = [('slow', slow({'name': 'slow'}), 0), ('fast', fast({'name': 'fast'}), 0)]
+    for _ in range(3):
+        chain.run(strategies, [])
+    calls = []
+    assert chain.run(strategies, calls)['name'] == 'fast'
+    assert calls == ['fast']
+
+
+def test_cheaper_poorer_tier_never_overtakes_richer_one():
+    chain = ExtractorChain('test')
+    strategies = [
+        ('shared_data', slow({'name': 'shared_data'}), 0),
+        ('meta_tags', fast({'name': 'meta_tags'}), 1),
+    ]
+    for _ in range(10):
+        calls = []
+        assert chain.run(strategies, calls)['name'] == 'shared_data'
+        assert calls == ['shared_data']
+
+
+def test_falls_through_tiers_when_richer_strategies_miss():
+    chain = ExtractorChain('test')
+
+    def missing(page):
+        page.append('shared_data')
+        return None
+
+    calls = []
+    strategies = [('shared_data', missing, 0), ('meta_tags', fast({'name': 'meta_tags'}), 1)]
+    assert chain.run(strategies, calls)['name'] == 'meta_tags'
+    assert calls == ['shared_data', 'meta_tags']
+
+
+def test_partial_result_returned_when_nothing_is_accepted():
+    chain = ExtractorChain('test')
+
+    def broken(page):
+        raise ValueError("layout changed")
+
+    strategies = [('broken', broken), ('partial', fast({'name': 'partial', 'followers': 0}))]
+    result = chain.run(strategies, [], accept=lambda profile: profile['followers'] > 0)
+    assert result['name'] == 'partial'
+    assert chain.stats()['broken']['hit_rate'] < 0.5
+
+
+def test_run_async_respects_tiers():
+    chain = ExtractorChain('test')
+
+    async def rich(page):
+        await asyncio.sleep(0.005)
+        return {'name': 'rich'}
+
+    async def poor(page):
+        return {'name': 'poor'}
+
+    strategies = [('rich', rich, 0), ('poor', poor, 1)]
+    for _ in range(5):
+        assert asyncio.run(chain.run_async(strategies, None))['name'] == 'rich'
+
+
+def test_real_web_chain_moves_past_a_dead_shared_data_block():
+    pytest.importorskip('requests')
+    pytest.importorskip('fake_useragent')
+    from app.scraper.html_extract import PageExtract
+    from app.scraper.real_instagram_scraper import RealInstagramScraper
+
+    scraper = object.__new__(RealInstagramScraper)
+    scraper.extractor_chain = ExtractorChain('real_web_test')
+    # The shared data block is gone but the ProfilePage script still has the profile
+    page = PageExtract(
+        '<html><head><meta name="description" content="5 Followers, 1 Following, 2 Posts"></head><body>'
+        '<script>{"ProfilePage": {"full_name":"Some One","followers_count":5,"following_count":1,'
+        '"media_count":2}}</script></body></html>'
+    )
+    names = [('shared_data', None, 0), ('profile_script', None, 0), ('meta_tags', None, 1)]
+    assert [name for name, *_ in scraper.extractor_chain.order(names)][0] == 'shared_data'
+    for _ in range(8):
+        assert scraper._extract_from_page(page, 'someone')['profile_name'] == 'Some One'
+    order = [name for name, *_ in scraper.extractor_chain.order(names)]
+    assert order == ['profile_script', 'meta_tags', 'shared_data']
+
+
+def test_dead_strategy_drops_below_poorer_tier_and_is_probed(monkeypatch):
+    from app.scraper import extractor_chain
+
+    monkeypatch.setattr(extractor_chain, 'EXTRACTOR_PROBE_EVERY', 10)
+    chain = ExtractorChain('test')
+
+    def dead(page):
+        page.append('dead')
+        return None
+
+    strategies = [('dead', dead, 0), ('poor', fast({'name': 'poor'}), 1)]
+    orders = []
+    for _ in range(20):
+        calls = []
+        chain.run(strategies, calls)
+        orders.append(calls)
+    assert orders[9] == ['dead', 'poor'] and orders[19] == ['dead', 'poor']
+    assert orders[18] == ['poor']
+    assert chain.stats()['dead']['dead']
@@ -0,0 +1,74 @@
+import json
+
+from app.scraper.html_extract import PageExtract, StreamingPageReader, read_stream
+
+SHARED_DATA = {'entry_data': {'ProfilePage': [{'graphql': {'user': {'full_name': 'Some One'}}}]}}
+
+HEAD = (
+    '<html><head><title>x</title>'
+    '<meta name="description" content="1,234 Followers, 56 Following, 7 Posts">'
+    '</head>'
+)
+SHARED_SCRIPT = f'<script>window._sharedData = {json.dumps(SHARED_DATA)};</script>'
+PAGE = HEAD + '<body>' + 'x' * 5000 + SHARED_SCRIPT + '<div>' + 'y' * 50000 + '</div></body></html>'
+
+
+def chunks(text: str, size: int = 97):
+    data = text.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def has_counts(page: PageExtract) -> bool:
+    return 'Followers' in page.meta().get('description', '')
+
+
+def has_shared_data(page: PageExtract) -> bool:
+    return page.shared_data() is not None
+
+
+def test_head_only_stop_when_head_is_enough():
+    reader = StreamingPageReader(has_counts)
+    html = read_stream(chunks(PAGE), reader)
+    assert reader.stopped_early
+    assert '</head>' in html
+    assert reader.bytes_read < len(PAGE) // 10
+
+
+def test_reads_on_to_the_shared_data_script():
+    reader = StreamingPageReader(has_shared_data)
+    html = read_stream(chunks(PAGE), reader)
+    assert reader.stopped_early
+    assert PageExtract(html).shared_data() == SHARED_DATA
+    assert reader.bytes_read < len(PAGE.encode())
+
+
+def test_reads_whole_page_without_the_marker():
+    page = HEAD + '<body>' + 'z' * 20000 + '</body></html>'
+    reader = StreamingPageReader(has_shared_data)
+    assert read_stream(chunks(page), reader) == page
+    assert not reader.stopped_early
+
+
+def test_reads_whole_page_without_body_marker():
+    reader = StreamingPageReader(has_shared_data, body_marker=None)
+    assert read_stream(chunks(PAGE), reader) == PAGE
+    assert not reader.stopped_early
+
+
+def test_split_tags_and_multibyte_text_survive_chunking():
+    page = HEAD.replace('x</title>', 'é✓</title>') + '<body>' + SHARED_SCRIPT + 'tail'
+    for size in (1, 2, 3, 7):
+        reader = StreamingPageReader(has_shared_data)
+        html = read_stream(chunks(page, size), reader)
+        assert reader.stopped_early
+        assert 'é✓' in html
+        assert PageExtract(html).shared_data() == SHARED_DATA
+
+
+def test_failing_completeness_check_keeps_reading():
+    def broken(page):
+        raise ValueError("bad page")
+
+    reader = StreamingPageReader(broken)
+    html = read_stream(chunks(PAGE), reader)
+    assert PageExtract(html).shared_data() == SHARED_DATA
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+from app.scraper import http_cache
+from app.scraper.http_cache import HTTPCache, SQLiteCacheStore
+
+URL = "https://www.instagram.com/someone/"
+PROFILE = {'username': 'someone', 'followers_count': 10}
+
+
+def test_validators_and_not_modified(tmp_path):
+    cache = HTTPCache(SQLiteCacheStore(str(tmp_path / 'cache.sqlite3')))
+    assert cache.conditional_headers(URL) == {}
+    cache.store_response(URL, {'ETag': '"abc"', 'Last-Modified': 'Mon'}, PROFILE)
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"abc"', 'If-Modified-Since': 'Mon'}
+    assert cache.not_modified(URL) == PROFILE
+    assert cache.hits == 1
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = HTTPCache(SQLiteCacheStore(str(tmp_path / 'cache.sqlite3')))
+    cache.store_response(URL, {}, PROFILE)
+    assert cache.not_modified(URL) is None
+
+
+def test_reads_do_not_commit(tmp_path):
+    store = SQLiteCacheStore(str(tmp_path / 'cache.sqlite3'))
+    store.set('a', {'etag': 'x'})
+    changes = store._conn.total_changes
+    for _ in range(10):
+        assert store.get('a') == {'etag': 'x'}
+    assert store._conn.total_changes == changes
+
+
+def test_recent_reads_survive_eviction(tmp_path, monkeypatch):
+    store = SQLiteCacheStore(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    times = iter(range(100))
+    monkeypatch.setattr(http_cache.time, 'time', lambda: next(times))
+    store.set('a', {})
+    store.set('b', {})
+    store.get('a')
+    store.set('c', {})
+    assert store.get('a') == {}
+    assert store.get('b') is None
+
+
+def test_async_variants_run_store_calls_off_the_loop(tmp_path, monkeypatch):
+    store = SQLiteCacheStore(str(tmp_path / 'cache.sqlite3'))
+    threads = []
+    get = store.get
+    monkeypatch.setattr(store, 'get', lambda key: (threads.append(threading.current_thread()), get(key))[1])
+    cache = HTTPCache(store)
+
+    async def main():
+        await cache.store_response_async(URL, {'ETag': '"abc"'}, PROFILE)
+        assert await cache.conditional_headers_async(URL) == {'If-None-Match': '"abc"'}
+        return await cache.not_modified_async(URL)
+
+    assert asyncio.run(main()) == PROFILE
+    assert threads and threading.main_thread() not in threads
+
+
+def test_no_store_is_a_no_op():
+    cache = HTTPCache()
+    assert asyncio.run(cache.conditional_headers_async(URL)) == {}
+    assert asyncio.run(cache.not_modified_async(URL)) is None
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.scraper.jobs import (
+    COMPLETED, FAILED, QUEUED, RUNNING, SUCCEEDED, DistributedJobManager, JobManager, RedisJobStore, ScrapeJob,
+)
+
+
+def test_local_job_streams_progress_and_completion():
+    manager = JobManager(workers=2)
+
+    def work(username):
+        if username == 'bad':
+            raise ValueError("not found")
+        return {'username': username}
+
+    async def main():
+        release = threading.Event()
+
+        def gated(username):
+            release.wait(5)
+            return work(username)
+
+        job = manager.submit(['a', 'bad', 'a'], gated)
+        queue = manager.subscribe(job.id)
+        release.set()
+        events = []
+        while not events or events[-1]['type'] != COMPLETED:
+            events.append(await asyncio.wait_for(queue.get(), 5))
+        manager.unsubscribe(job.id, queue)
+        return job, events, await manager.snapshot_async(job.id)
+
+    job, events, snapshot = asyncio.run(main())
+    assert job.usernames == ['a', 'bad']
+    assert snapshot['status'] == COMPLETED
+    assert snapshot['completed'] == 2 and snapshot['failed'] == 1
+    assert snapshot['items']['a']['status'] == SUCCEEDED
+    assert snapshot['items']['a']['result'] == {'username': 'a'}
+    assert snapshot['items']['bad']['status'] == FAILED
+    assert events[-1]['completed'] == 2
+    assert manager.stats()['active_jobs'] == 0
+
+
+def test_unknown_job_has_no_snapshot():
+    assert asyncio.run(JobManager(workers=1).snapshot_async('missing')) is None
+
+
+@pytest.fixture
+def store():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    return RedisJobStore(client=fakeredis.FakeRedis())
+
+
+def test_redis_store_counts_each_username_once(store):
+    job = ScrapeJob(['a', 'b'])
+    store.create(job)
+    assert store.snapshot(job.id)['status'] == QUEUED
+
+    store.start(job.id, 'a')
+    assert store.snapshot(job.id)['items']['a'] == {'status': RUNNING}
+    store.finish(job.id, 'a', {'status': SUCCEEDED, 'result': {}})
+    store.finish(job.id, 'a', {'status': FAILED, 'error': 'redelivered'})
+    store.start(job.id, 'a')
+    snapshot = store.snapshot(job.id)
+    assert snapshot['status'] == RUNNING
+    assert snapshot['completed'] == 1 and snapshot['failed'] == 0
+    assert snapshot['items']['a']['status'] == SUCCEEDED
+
+    store.finish(job.id, 'b', {'status': FAILED, 'error': 'gone'})
+    snapshot = store.snapshot(job.id)
+    assert snapshot['status'] == COMPLETED
+    assert snapshot['failed'] == 1
+    assert snapshot['finished_at'] is not None
+
+
+def test_distributed_snapshot_runs_off_the_event_loop(store, monkeypatch):
+    dispatched = []
+    manager = DistributedJobManager(store, lambda job_id, username: dispatched.append(username))
+    job = manager.submit(['a', 'b', 'a'])
+    assert dispatched == ['a', 'b']
+
+    threads = []
+    snapshot = store.snapshot
+
+    def tracked(job_id):
+        threads.append(threading.current_thread())
+        return snapshot(job_id)
+
+    monkeypatch.setattr(store, 'snapshot', tracked)
+    result = asyncio.run(manager.snapshot_async(job.id))
+    assert result['total'] == 2 and result['status'] == QUEUED
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from app.scraper.negative_cache import (
+    BLOCKED, NOT_FOUND, PRIVATE, InMemoryNegativeBackend, NegativeCache, classify_response,
+)
+
+
+def test_classify_response():
+    assert classify_response(404) == NOT_FOUND
+    assert classify_response(403) == BLOCKED
+    assert classify_response(200, 'https://www.instagram.com/accounts/login/?next=/x/') == BLOCKED
+    assert classify_response(429) is None
+    assert classify_response(200, 'https://www.instagram.com/x/') is None
+
+
+def test_repeat_misses_double_the_ttl():
+    cache = NegativeCache(ttls={NOT_FOUND: 10}, max_ttl=25)
+    assert cache.record('Someone', NOT_FOUND) == 10
+    assert cache.record('someone', NOT_FOUND) == 20
+    assert cache.record('someone', NOT_FOUND) == 25
+    assert cache.lookup('SOMEONE')['strikes'] == 3
+
+
+def test_record_result_keeps_private_payload_and_clears_public():
+    cache = NegativeCache()
+    cache.record_result('someone', {'username': 'someone', 'is_private': 1})
+    assert cache.lookup('someone')['payload']['is_private'] == 1
+    cache.record_result('someone', {'username': 'someone', 'is_private': 0})
+    assert cache.lookup('someone') is None
+
+
+class ThreadRecordingBackend(InMemoryNegativeBackend):
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, username):
+        self.threads.add(threading.get_ident())
+        return super().get(username)
+
+    def strike(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().strike(*args)
+
+
+def test_async_calls_leave_the_loop_for_blocking_backends():
+    backend = ThreadRecordingBackend()
+    cache = NegativeCache(backend=backend)
+
+    async def main():
+        assert await cache.record_async('someone', PRIVATE) > 0
+        assert (await cache.lookup_async('someone'))['outcome'] == PRIVATE
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert backend.threads and loop_thread not in backend.threads
+
+
+def test_async_calls_stay_inline_for_memory_backend():
+    cache = NegativeCache()
+
+    async def main():
+        await cache.record_async('someone', BLOCKED)
+        return await cache.lookup_async('someone')
+
+    assert asyncio.run(main())['outcome'] == BLOCKED
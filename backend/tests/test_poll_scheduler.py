@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from app.scraper.poll_scheduler import InMemoryPollBackend, PollScheduler
+
+
+def scheduler(**kwargs):
+    return PollScheduler(**{'min_interval': 60, 'max_interval': 3600, **kwargs})
+
+
+def test_new_profiles_are_due_immediately():
+    polls = scheduler()
+    assert polls.select(['a', 'b'], now=0) == ['a', 'b']
+
+
+def test_static_profiles_back_off_to_max_and_busy_ones_stay_at_min():
+    polls = scheduler()
+    for username in ('busy', 'static'):
+        polls.observe(username, False, now=0)
+    now = 0
+    while now < 24 * 3600:
+        now += 60
+        for username in polls.select(['busy', 'static'], now=now):
+            polls.observe(username, username == 'busy', now=now)
+    stats = polls.stats(['busy', 'static'], now=now)['profiles']
+    assert stats['busy']['interval'] == 60
+    assert stats['static']['interval'] == 3600
+
+
+def test_budget_goes_to_the_likeliest_changes():
+    polls = scheduler(budget=1)
+    polls.observe('quiet', False, now=0)
+    polls.observe('quiet', False, now=1000)
+    polls.observe('lively', False, now=0)
+    polls.observe('lively', True, now=60)
+    selected = polls.select(['quiet', 'lively'], now=5000)
+    assert selected == ['lively']
+    assert polls.stats([], now=5000)['deferred'] == 1
+
+
+def test_profiles_past_max_interval_beat_the_budget():
+    polls = scheduler(budget=1)
+    polls.observe('lively', False, now=0)
+    polls.observe('lively', True, now=60)
+    polls.observe('forgotten', False, now=0)
+    assert polls.select(['lively', 'forgotten'], now=3650) == ['forgotten']
+
+
+def test_postpone_does_not_learn():
+    polls = scheduler()
+    polls.observe('a', False, now=0)
+    polls.postpone('a', now=100)
+    profile = polls.stats(['a'], now=100)['profiles']['a']
+    assert profile['checks'] == 1
+    assert profile['due_in'] == 60
+
+
+def test_async_variants_leave_the_loop_for_blocking_backends():
+    class Blocking(InMemoryPollBackend):
+        blocking = True
+        threads = set()
+
+        def get_many(self, usernames):
+            self.threads.add(threading.get_ident())
+            return super().get_many(usernames)
+
+    polls = scheduler(backend=Blocking())
+
+    async def main():
+        assert await polls.select_async(['a']) == ['a']
+        await polls.observe_async('a', False)
+        return threading.get_ident()
+
+    assert asyncio.run(main()) not in Blocking.threads
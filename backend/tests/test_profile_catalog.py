@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from app.scraper.profile_catalog import ProfileCatalog, normalize_username
+
+ENTRIES = [
+    {'username': 'cristiano', 'followers': 3},
+    {'username': 'leo.messi', 'followers': 2},
+    {'username': 'natgeo', 'followers': 1},
+    {'username': 'nat', 'followers': 0},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    source = tmp_path / 'profiles.jsonl'
+    source.write_text(''.join(json.dumps(entry) + '\n' for entry in ENTRIES))
+    return ProfileCatalog(str(source), index_path=str(tmp_path / 'index' / 'profiles.sqlite3'))
+
+
+def test_normalize_username():
+    assert normalize_username(' Leo_Messi.10 ') == 'leomessi10'
+
+
+def test_exact_and_normalized_lookups(catalog):
+    assert catalog.get('Cristiano')['followers'] == 3
+    assert catalog.get('leomessi') is None
+    assert catalog.get_normalized('Leo_Messi')['followers'] == 2
+    assert len(catalog) == len(ENTRIES)
+
+
+def test_search_finds_name_inside_key(catalog):
+    assert catalog.search('cristian')['username'] == 'cristiano'
+
+
+def test_search_finds_key_inside_name_earliest_wins(catalog):
+    # Both natgeo and nat are inside the name; natgeo comes first in the catalog
+    assert catalog.search('the_natgeo_fan')['username'] == 'natgeo'
+    assert catalog.search('xx') is None
+
+
+def test_search_survives_very_long_input(catalog):
+    assert catalog.search('a' * 20000) is None
+    assert catalog.search('z' * 5000 + 'cristiano' + 'z' * 5000)['username'] == 'cristiano'
+
+
+def test_search_reports_database_errors_as_no_match(catalog, monkeypatch):
+    def broken(username):
+        raise sqlite3.OperationalError("too many SQL variables")
+
+    monkeypatch.setattr(catalog, '_search', broken)
+    assert catalog.search('anyone') is None
+
+
+def test_index_is_rebuilt_when_source_changes(catalog, tmp_path):
+    assert catalog.get('newcomer') is None
+    source = tmp_path / 'profiles.jsonl'
+    with open(source, 'a') as f:
+        f.write(json.dumps({'username': 'newcomer', 'followers': 9}) + '\n')
+    fresh = ProfileCatalog(str(source), index_path=catalog.index_path)
+    os.utime(source, (os.path.getmtime(catalog.index_path) + 10,) * 2)
+    assert fresh.get('newcomer')['followers'] == 9
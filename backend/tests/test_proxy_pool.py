@@ -0,0 +1,122 @@
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from app.scraper.proxy_pool import ProxyPool  # noqa: E402
+from benchmarks.bench_proxy_pool import OriginHandler, proxy_handler, serve  # noqa: E402
+
+
+class CookieOriginHandler(BaseHTTPRequestHandler):
+    """Echoes the Cookie header and sets a cookie of its own"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode()
+        self.send_response(200)
+        self.send_header('Set-Cookie', 'seen=1; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(handler):
+        server = serve(handler)
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+
+
+def proxy_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def origin_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_port}/profile/"
+
+
+def test_fails_over_to_a_healthy_proxy(servers):
+    origin = servers(OriginHandler)
+    broken, healthy = proxy_handler(broken=True), proxy_handler()
+    pool = ProxyPool(urls=[proxy_url(servers(broken)), proxy_url(servers(healthy))])
+    session = requests.Session()
+    for _ in range(10):
+        assert pool.get(session, origin_url(origin), timeout=5).status_code == 200
+    assert healthy.handled == 10
+
+
+def test_broken_proxy_is_quarantined_then_evicted(servers):
+    origin = servers(OriginHandler)
+    broken, healthy = proxy_handler(broken=True), proxy_handler()
+    pool = ProxyPool(urls=[proxy_url(servers(broken)), proxy_url(servers(healthy))],
+                     failure_threshold=1, quarantine_seconds=0.05, evict_after=2)
+    session = requests.Session()
+
+    for _ in range(20):
+        pool.get(session, origin_url(origin), timeout=5)
+        if broken.handled:
+            break
+    bad = pool.proxies[0]
+    assert bad.quarantines == 1 and not bad.available(time.monotonic())
+
+    handled = broken.handled
+    pool.get(session, origin_url(origin), timeout=5)
+    assert broken.handled == handled
+
+    time.sleep(0.06)
+    for _ in range(40):
+        pool.get(session, origin_url(origin), timeout=5)
+        if bad.evicted:
+            break
+    assert bad.evicted
+    # The remaining proxy carries everything from now on
+    handled = broken.handled
+    for _ in range(5):
+        assert pool.get(session, origin_url(origin), timeout=5).status_code == 200
+    assert broken.handled == handled
+    assert pool.snapshot()[0]['evicted']
+
+
+def test_faster_proxy_gets_more_traffic(servers):
+    origin = servers(OriginHandler)
+    fast, slow = proxy_handler(), proxy_handler(delay=0.05)
+    pool = ProxyPool(urls=[proxy_url(servers(fast)), proxy_url(servers(slow))])
+    session = requests.Session()
+    for _ in range(40):
+        assert pool.get(session, origin_url(origin), timeout=5).status_code == 200
+    assert fast.handled > 3 * slow.handled
+
+
+def test_every_proxy_down_goes_direct(servers):
+    origin = servers(OriginHandler)
+    pool = ProxyPool(urls=[proxy_url(servers(proxy_handler()))])
+    pool.proxies[0].evicted = True
+    assert pool.acquire() is None
+    assert pool.get(requests.Session(), origin_url(origin), timeout=5).status_code == 200
+
+
+def test_caller_cookies_go_through_the_proxy_and_stay_with_the_caller(servers):
+    origin = servers(CookieOriginHandler)
+    pool = ProxyPool(urls=[proxy_url(servers(proxy_handler()))])
+    session = requests.Session()
+    session.cookies.set('sessionid', 'secret')
+
+    response = pool.get(session, origin_url(origin), timeout=5)
+    assert 'sessionid=secret' in response.text
+    assert session.cookies.get('seen') == '1'
+    # The proxy's session is shared by every scraper, so it keeps no cookies of its own
+    assert len(pool.proxies[0].session.cookies) == 0
+    assert 'sessionid' not in pool.get(requests.Session(), origin_url(origin), timeout=5).text
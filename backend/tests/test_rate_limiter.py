@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.scraper import rate_limiter
+from app.scraper.rate_limiter import DEFAULT_LIMITS, InMemoryBucketBackend, RateLimiter, _parse_limits, host_of
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock)
+    return clock
+
+
+def test_burst_then_refill_at_rate(clock):
+    backend = InMemoryBucketBackend()
+    assert [backend.reserve('k', 0.5, 2) for _ in range(2)] == [0.0, 0.0]
+    # Empty bucket: each further caller queues one token interval behind the last
+    assert backend.reserve('k', 0.5, 2) == pytest.approx(2.0)
+    assert backend.reserve('k', 0.5, 2) == pytest.approx(4.0)
+    clock.now += 10
+    assert backend.reserve('k', 0.5, 2) == 0.0
+
+
+def test_refill_is_capped_at_capacity(clock):
+    backend = InMemoryBucketBackend()
+    backend.reserve('k', 1.0, 3)
+    clock.now += 1000
+    assert [backend.reserve('k', 1.0, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.reserve('k', 1.0, 3) == pytest.approx(1.0)
+
+
+def test_buckets_are_per_host_and_class(clock):
+    limiter = RateLimiter(limits={'web': (1.0, 1), 'api': (1.0, 1)})
+    assert limiter.reserve('https://www.instagram.com/a/', 'web') == 0.0
+    assert limiter.reserve('https://www.instagram.com/b/', 'web') == pytest.approx(1.0)
+    assert limiter.reserve('https://www.instagram.com/a/', 'api') == 0.0
+    assert limiter.reserve('https://i.instagram.com/a/', 'web') == 0.0
+    # Unknown classes share the web limits under their own key
+    assert limiter.reserve('https://www.instagram.com/a/', 'other') == 0.0
+
+
+def test_parse_limits():
+    limits = _parse_limits("web=1/4, api=2,bogus,browser=x/2")
+    assert limits['web'] == (1.0, 4.0)
+    assert limits['api'] == (2.0, 1.0)
+    assert limits['browser'] == DEFAULT_LIMITS['browser']
+    assert _parse_limits("") == DEFAULT_LIMITS
+
+
+@pytest.mark.parametrize('spec', ["web=0/3", "web=-1/3", "web=nan/3", "web=1/0"])
+def test_parse_limits_rejects_non_positive_rates(spec):
+    assert _parse_limits(spec)['web'] == DEFAULT_LIMITS['web']
+
+
+def test_backend_failure_falls_back_to_the_bucket_pace():
+    class Broken:
+        blocking = False
+
+        def reserve(self, key, rate, capacity):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter(backend=Broken(), limits={'web': (0.25, 1)})
+    assert limiter.reserve('https://www.instagram.com/a/') == 4.0
+
+
+def test_acquire_async_sleeps_for_the_reserved_wait(monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, 'sleep', fake_sleep)
+    limiter = RateLimiter(limits={'web': (2.0, 1)})
+
+    async def main():
+        await limiter.acquire_async('https://www.instagram.com/a/')
+        await limiter.acquire_async('https://www.instagram.com/a/')
+
+    asyncio.run(main())
+    assert len(waits) == 1 and 0.4 < waits[0] <= 0.5
+
+
+def test_redis_backend_shares_one_bucket(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, 'from_url', classmethod(lambda cls, url: fakeredis.FakeRedis(server=server)))
+    first, second = rate_limiter.RedisBucketBackend(), rate_limiter.RedisBucketBackend()
+    assert first.reserve('k', 0.5, 1) == 0.0
+    assert 1.9 < second.reserve('k', 0.5, 1) <= 2.0
+
+
+def test_host_of():
+    assert host_of('https://www.instagram.com/a/?x=1') == 'www.instagram.com'
+    assert host_of('www.instagram.com') == 'www.instagram.com'
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.scraper import retry_queue
+from app.scraper.retry_queue import InMemoryRetryBackend, RetryQueue, backoff_delay, retry_failed
+
+
+@pytest.fixture
+def instant_backoff(monkeypatch):
+    monkeypatch.setattr(retry_queue, 'backoff_delay', lambda attempt, base, cap: 0.01)
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt, base=1.0, cap=8.0)
+        full = min(8.0, 2 ** (attempt - 1))
+        assert full / 2 <= delay <= full
+
+
+def test_schedule_due_and_discard():
+    queue = RetryQueue(base_delay=0.0, max_delay=0.0)
+    assert queue.schedule('a', 1) == 0.0
+    assert queue.schedule('b', 1) == 0.0
+    queue.discard('b')
+    assert queue.due() == [('a', 1)]
+    assert queue.due() == []
+    assert queue.next_delay() is None
+
+
+def test_schedule_gives_up_after_max_attempts():
+    queue = RetryQueue(max_attempts=2)
+    assert queue.schedule('a', 3) is None
+    assert len(queue) == 0
+
+
+def test_min_delay_pushes_retry_back():
+    queue = RetryQueue(base_delay=0.0, max_delay=0.0)
+    queue.schedule('a', 1, min_delay=60)
+    assert queue.due() == []
+    assert 55 < queue.next_delay() <= 60
+
+
+def test_rescheduling_supersedes_the_earlier_entry():
+    backend = InMemoryRetryBackend()
+    backend.push('a', 1, 0.0)
+    backend.push('a', 2, 0.0)
+    assert backend.pop_due(time.time(), 10) == [('a', 2)]
+    assert len(backend) == 0
+
+
+def test_retry_failed_retries_until_success(instant_backoff):
+    calls = {'a': 0}
+
+    def scrape(username):
+        calls[username] += 1
+        return {'username': username} if calls[username] == 3 else None
+
+    assert retry_failed(['a'], scrape) == {'a': {'username': 'a'}}
+    assert calls['a'] == 3
+
+
+def test_retry_failed_skips_unretryable(instant_backoff):
+    def scrape(username):
+        raise AssertionError("should not be retried")
+
+    assert retry_failed(['gone'], scrape, retryable=lambda username: False) == {'gone': None}
+
+
+def test_retry_failed_stays_within_budget():
+    def scrape(username):
+        raise AssertionError("first retry is due after the budget")
+
+    started = time.monotonic()
+    assert retry_failed(['a', 'b'], scrape, budget=0.5) == {'a': None, 'b': None}
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, 'from_url', classmethod(lambda cls, url: fakeredis.FakeRedis(server=server)))
+    return retry_queue.RedisRetryBackend()
+
+
+def test_redis_backend(redis_backend):
+    backend = redis_backend
+    backend.push('a', 1, 10.0)
+    backend.push('a', 2, 20.0)
+    backend.push('b', 1, 30.0)
+    assert len(backend) == 2
+    assert backend.next_due() == 20.0
+    assert backend.pop_due(25.0, 10) == [('a', 2)]
+    backend.discard('b')
+    assert len(backend) == 0
+
+
+def test_redis_push_replaces_queued_member(redis_backend):
+    redis_backend.push('a', 1, 10.0)
+    redis_backend.push('a', 2, 5.0)
+    assert redis_backend.client.zcard(redis_backend.key) == 1
+    assert redis_backend.client.hlen(redis_backend.members_key) == 1
+    redis_backend.discard('a')
+    redis_backend.discard('a')
+    assert len(redis_backend) == 0
+    assert redis_backend.client.hlen(redis_backend.members_key) == 0
+
+
+def test_async_variants_run_redis_calls_off_the_loop(redis_backend, monkeypatch):
+    threads = []
+    push = redis_backend.push
+    monkeypatch.setattr(redis_backend, 'push', lambda *args: (threads.append(threading.current_thread()), push(*args)))
+    queue = RetryQueue(backend=redis_backend, base_delay=0.0, max_delay=0.0)
+
+    async def main():
+        assert await queue.schedule_async('a', 1) == 0.0
+        assert await queue.schedule_async('b', 1) == 0.0
+        await queue.discard_async('b')
+        assert await queue.next_delay_async() == 0.0
+        assert await queue.due_async() == [('a', 1)]
+        assert await queue.next_delay_async() is None
+
+    asyncio.run(main())
+    assert threads and threading.main_thread() not in threads
+
+
+def test_async_variants_with_memory_backend():
+    queue = RetryQueue(base_delay=0.0, max_delay=0.0)
+
+    async def main():
+        await queue.schedule_async('a', 1)
+        return await queue.due_async()
+
+    assert asyncio.run(main()) == [('a', 1)]
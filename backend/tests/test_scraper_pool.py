@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from app.scraper.scraper_pool import ScraperPool, ScraperPoolExhausted
+
+
+class Scraper:
+    pass
+
+
+class BusyScraper:
+    """Stands in for a scraper whose losing hedged request outlives the checkout"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+    def when_idle(self, callback):
+        threading.Thread(target=lambda: (self.done.wait(5), callback())).start()
+
+
+def test_instances_are_reused():
+    pool = ScraperPool(Scraper, size=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        assert second is first
+    assert pool.stats()['created'] == 1
+
+
+def test_exhausted_pool_times_out():
+    pool = ScraperPool(Scraper, size=1, timeout=0.05)
+    with pool.checkout():
+        with pytest.raises(ScraperPoolExhausted):
+            with pool.checkout():
+                pass
+
+
+def test_busy_instance_returns_once_idle():
+    pool = ScraperPool(BusyScraper, size=1, timeout=2)
+    with pool.checkout() as scraper:
+        pass
+    assert pool.stats()['idle'] == 0
+
+    threading.Timer(0.1, scraper.done.set).start()
+    started = time.monotonic()
+    with pool.checkout() as again:
+        assert again is scraper
+    assert time.monotonic() - started >= 0.05